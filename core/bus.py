@@ -0,0 +1,452 @@
+# core/bus.py
+"""
+Süreçler arası piyasa verisi dağıtımı (Redis streams).
+• Ayrı bir ingest süreci (ingest.py) borsa soketlerinin sahibidir: istenen her
+  (borsa, sembol) için yerel bir Feed açar ve olaylarını tek bir Redis
+  stream’ine (md:<borsa>:<sembol>) sırayla yazar:
+    k=t  trade çerçevesi   – ikili (ts i8, price f8, qty f8, side i1) = 25 B/trade
+    k=b  kapanan bar       – ikili (epoch, o, h, l, c, v) = 48 B; worker’lar
+         barı aynı noktada kapatır (trade gelmeyen dakikalar da)
+    k=s  anlık görüntü     – 1m mumlar (+ kısmi) ve son tick’ler; başlangıçta,
+         Feed.version değişince (geçmiş yükleme / boşluk dolumu) ve her
+         SNAP_ENTRIES kayıtta (kırpma hep bir görüntü bıraksın)
+  Her kayıtta yayıncı kimliği (e) ve ardışık sayaç (n) bulunur.
+• Dashboard worker’ları (MARKET_BUS ayarlıysa) open_feed’de RemoteFeed alır:
+  hiçbir borsaya bağlanmaz; en son anlık görüntüden itibaren XRANGE ile
+  yetişir, sonra XREAD ile izler ve yerel salt-okunur tamponları (ticks,
+  candles) aynı Feed kodu ile besler. Sayaçta boşluk (trim, ingest yeniden
+  başlatıldı) → yeniden yetişme; Redis hatasında geri çekilip yeniden dener.
+  `ready` ilk yetişme denemesinden sonra kurulur: hata olsa da, akışta henüz
+  anlık görüntü yoksa da (ingest kapalı / sembolü daha açmadı) oturumlar
+  beklemede kalmaz; görüntü gelince izleme döngüsü onu uygular.
+• Worker’lar istedikleri akışları md:want hash’ine kalp atışıyla yazar;
+  ingest taze istekleri açar, kimsenin istemediklerini kapatır.
+• Redis opsiyoneldir: "memory://" aynı süreç içinde çalışan bir yedek
+  (MemoryBus) kullanır ve ingest’i de aynı süreçte başlatır (deneme için).
+˓→  enable(url)                    # worker: open_feed → RemoteFeed
+˓→  await ingest(connect(url))     # ingest süreci
+"""
+
+import asyncio, itertools, os, socket, time, uuid
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+from core import data_streams
+from core.candles import TF_SECONDS
+from core.data_streams import Feed
+from core.reconnect import supervise
+
+TICK_DT = np.dtype([("ts", "<i8"), ("price", "<f8"), ("qty", "<f8"), ("side", "i1")])
+BAR_DT  = np.dtype([("epoch", "<i8"), ("open", "<f8"), ("high", "<f8"),
+                    ("low", "<f8"), ("close", "<f8"), ("vol", "<f8")])
+MAXLEN = 50_000                      # stream başına (yaklaşık kırpma)
+SNAP_ENTRIES = MAXLEN // 4           # bu kadar kayıtta bir anlık görüntü: kırpılan
+                                     # stream’de (ne kadar yoğun olursa olsun) hep biri kalır
+SNAP_TICKS = 2_000
+PAGE = 1_000
+WANT_KEY = "md:want"
+WANT_EVERY, WANT_STALE = 10, 30      # sn
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def stream_key(exchange: str, symbol: str) -> str:
+    return f"md:{exchange}:{symbol}"
+
+
+# ........................ ikili kodlama
+def pack_trades(ts, px, qty, side) -> bytes:
+    a = np.empty(len(ts), TICK_DT)
+    a["ts"], a["price"], a["qty"], a["side"] = ts, px, qty, side
+    return a.tobytes()
+
+def unpack_trades(raw: bytes):
+    a = np.frombuffer(raw, TICK_DT)
+    return a["ts"].tolist(), a["price"].tolist(), a["qty"].tolist(), a["side"].tolist()
+
+def pack_bars(epoch, o, h, l, c, v) -> bytes:
+    a = np.empty(len(epoch), BAR_DT)
+    for name, col in zip(BAR_DT.names, (epoch, o, h, l, c, v)):
+        a[name] = col
+    return a.tobytes()
+
+def unpack_bars(raw: bytes) -> tuple:
+    a = np.frombuffer(raw, BAR_DT)
+    return tuple(a[name].copy() for name in BAR_DT.names)
+
+
+# ........................ arka uçlar (kullanılan birkaç komut)
+class RedisBus:
+    """Thin async wrapper over the Redis commands the bus needs."""
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("MARKET_BUS=redis://… için 'redis' paketi gerekli")
+        self.r = aioredis.from_url(url)
+
+    async def xadd_many(self, key, items, maxlen=MAXLEN):
+        async with self.r.pipeline(transaction=False) as p:
+            for fields in items:
+                p.xadd(key, fields, maxlen=maxlen, approximate=True)
+            return await p.execute()
+
+    async def xrange(self, key, min="-", max="+", count=None):
+        return await self.r.xrange(key, min, max, count)
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        return await self.r.xrevrange(key, max, min, count)
+
+    async def xread(self, key, last_id, block=None, count=None):
+        res = await self.r.xread({key: last_id}, count=count, block=block)
+        return res[0][1] if res else []
+
+    async def hset(self, key, field, value):
+        await self.r.hset(key, field, value)
+
+    async def hgetall(self, key) -> dict:
+        return await self.r.hgetall(key)
+
+    async def hdel(self, key, field):
+        await self.r.hdel(key, field)
+
+    async def aclose(self):
+        await self.r.aclose()
+
+
+def _b(v) -> bytes:
+    return v if isinstance(v, bytes) else str(v).encode()
+
+def _id(s) -> tuple:
+    s = s.decode() if isinstance(s, bytes) else s
+    if s in ("-", "+"):
+        return (-1, -1) if s == "-" else (1 << 62, 0)
+    ms, _, seq = s.lstrip("(").partition("-")
+    return int(ms), int(seq or 0)
+
+
+class MemoryBus:
+    """In-process stand-in for RedisBus (same calls, bytes in/out)."""
+
+    def __init__(self):
+        self._streams: dict = {}                         # key → [(id, alanlar)]
+        self._ids: dict = {}                             # key → [(ms, seq)] (sıralı)
+        self._hashes: dict = {}
+        self._changed = None
+        self._last = (0, 0)
+
+    def _event(self):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def _next_id(self):
+        ms, seq = int(time.time() * 1000), 0
+        if ms <= self._last[0]:
+            ms, seq = self._last[0], self._last[1] + 1
+        self._last = ms, seq
+        return f"{ms}-{seq}".encode()
+
+    async def xadd_many(self, key, items, maxlen=MAXLEN):
+        s, order = self._streams.setdefault(key, []), self._ids.setdefault(key, [])
+        ids = []
+        for fields in items:
+            ids.append(self._next_id())
+            s.append((ids[-1], {_b(k): _b(v) for k, v in fields.items()}))
+            order.append(_id(ids[-1]))
+        if maxlen and len(s) > maxlen:
+            del s[:len(s) - maxlen], order[:len(order) - maxlen]
+        ev, self._changed = self._event(), None
+        ev.set()
+        return ids
+
+    def _range(self, key, lo, hi):
+        lo, hi = (x.decode() if isinstance(x, bytes) else x for x in (lo, hi))
+        lo_x, hi_x = lo.startswith("("), hi.startswith("(")
+        order = self._ids.get(key, [])
+        a = (bisect_right if lo_x else bisect_left)(order, _id(lo))
+        b = (bisect_left if hi_x else bisect_right)(order, _id(hi))
+        return self._streams.get(key, [])[a:b]
+
+    async def xrange(self, key, min="-", max="+", count=None):
+        return self._range(key, min, max)[:count]
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        return self._range(key, min, max)[::-1][:count]
+
+    async def xread(self, key, last_id, block=None, count=None):
+        out = self._range(key, f"({_b(last_id).decode()}", "+")[:count]
+        if not out and block is not None:
+            try:
+                await asyncio.wait_for(self._event().wait(), block / 1000 or None)
+            except asyncio.TimeoutError:
+                return []
+            out = self._range(key, f"({_b(last_id).decode()}", "+")[:count]
+        return out
+
+    async def hset(self, key, field, value):
+        self._hashes.setdefault(key, {})[_b(field)] = _b(value)
+
+    async def hgetall(self, key) -> dict:
+        return dict(self._hashes.get(key, {}))
+
+    async def hdel(self, key, field):
+        self._hashes.get(key, {}).pop(_b(field), None)
+
+    async def aclose(self):
+        pass
+
+
+_MEMORY = None
+
+
+def connect(url: str):
+    """"redis://…" → RedisBus, "memory://" → süreç içi ortak MemoryBus."""
+    global _MEMORY
+    if url.startswith("memory://"):
+        if _MEMORY is None:
+            _MEMORY = MemoryBus()
+        return _MEMORY
+    return RedisBus(url)
+
+
+# ........................ yayıncı (ingest tarafı)
+class Publisher:
+    """Mirrors one local Feed into its market stream, batching XADDs."""
+
+    def __init__(self, bus, feed: Feed):
+        self.bus, self.feed = bus, feed
+        self.key = stream_key(*feed.key)
+        self.epoch = uuid.uuid4().hex[:8]                # yayıncı kimliği
+        self.n = itertools.count(1)
+        self.queue: list = []
+        self.version = None
+        self.since_snap = 0                              # son anlık görüntüden beri kayıt
+        self.sent = 0
+        self.task = None
+        self._wake = asyncio.Event()
+
+    def start(self):
+        self.feed.subscribe(on_tick=self._on_tick, on_bar=self._on_bar)
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        self.feed.unsubscribe(on_tick=self._on_tick, on_bar=self._on_bar)
+        if self.task is not None:
+            self.task.cancel()
+
+    def _push(self, fields):
+        fields["e"], fields["n"] = self.epoch, next(self.n)
+        self.since_snap = 0 if fields["k"] == "s" else self.since_snap + 1
+        self.queue.append(fields)
+        self._wake.set()
+
+    def _on_tick(self, ts, px, qty, side):
+        self._push({"k": "t", "d": pack_trades(ts, px, qty, side)})
+
+    def _on_bar(self, tf, bar):
+        self._push({"k": "b", "tf": tf, "d": pack_bars(*([x] for x in bar))})
+
+    def _snapshot(self):
+        """Feed’in şu anki durumu; kuyruktaki her şey zaten uygulanmış durumda."""
+        feed = self.feed
+        bars = feed.candles["1m"].last()
+        cols = [bars[name] for name in BAR_DT.names]
+        part = feed.agg.partial("1m")
+        if part is not None:
+            cols = [np.append(c, x) for c, x in zip(cols, part)]
+        t = feed.ticks.last(SNAP_TICKS)
+        return {"k": "s", "v": feed.version, "bars": pack_bars(*cols),
+                "ticks": pack_trades(t["ts"], t["price"], t["qty"], t["side"])}
+
+    async def _run(self):
+        await self.feed.ready.wait()
+        while True:
+            self._wake.clear()
+            if self.feed.version != self.version or self.since_snap >= SNAP_ENTRIES:
+                self.version = self.feed.version
+                self._push(self._snapshot())
+            if self.queue:
+                items, self.queue = self.queue, []
+                try:
+                    await self.bus.xadd_many(self.key, items)
+                    self.sent += len(items)
+                except Exception as e:
+                    print(f"[WARN] bus publish {self.key}:", e)
+                    self.version = None                  # sayaç boşluğu → yeni anlık görüntü
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def ingest(bus, every: float = 1.0, stale: float = WANT_STALE, feed_cls=Feed):
+    """İstenen akışları aç ve yayınla; kimse istemeyince kapat (süreç ömrü boyunca)."""
+    pubs: dict = {}
+    try:
+        while True:
+            now = time.time()
+            want = set()
+            for field, ts in (await bus.hgetall(WANT_KEY)).items():
+                ex, sym, _ = field.decode().split("|", 2)
+                if now - float(ts) < stale:
+                    want.add((ex, sym))
+                else:
+                    await bus.hdel(WANT_KEY, field)     # ölü worker
+            for key in want - pubs.keys():
+                feed = feed_cls(*key)
+                try:
+                    feed.start()
+                except ValueError as e:
+                    print("[WARN] ingest:", e)
+                    continue
+                pubs[key] = Publisher(bus, feed)
+                pubs[key].start()
+                print(f"[BUS] publishing {key}")
+            for key in pubs.keys() - want:
+                pub = pubs.pop(key)
+                pub.stop()
+                pub.feed.stop()
+                print(f"[BUS] closed {key}")
+            for pub in pubs.values():                    # trade gelmese de barlar kapansın
+                pub.feed.agg.close_until(now)
+            await asyncio.sleep(every)
+    finally:
+        for pub in pubs.values():
+            pub.stop()
+            pub.feed.stop()
+
+
+# ........................ worker tarafı
+_BUS = None
+_LOCAL_INGEST = None
+
+
+class RemoteFeed(Feed):
+    """Read-only Feed mirrored from the bus; opens no exchange connections."""
+
+    close_on_clock = False         # barları ingest’in "b" kayıtları kapatır (saat kayması yok)
+
+    def start(self):
+        global _LOCAL_INGEST
+        if isinstance(_BUS, MemoryBus) and _LOCAL_INGEST is None:
+            _LOCAL_INGEST = asyncio.create_task(ingest(_BUS))
+        self._field = f"{self.exchange}|{self.symbol}|{WORKER_ID}"
+        self._src = None                                 # (yayıncı, son n)
+        self.task = asyncio.create_task(self._run())
+        self._want = asyncio.create_task(self._want_loop())
+
+    def stop(self):
+        for t in (self.task, self._want):
+            if t is not None:
+                t.cancel()
+        self.task = None
+        asyncio.create_task(_BUS.hdel(WANT_KEY, self._field))
+
+    async def _want_loop(self):
+        while True:
+            try:
+                await _BUS.hset(WANT_KEY, self._field, int(time.time()))
+            except Exception as e:
+                print("[WARN] bus want:", e)
+            await asyncio.sleep(WANT_EVERY)
+
+    def _on_bar(self, tf, bar):                          # disk deposu ingest’in işi
+        for cb in self._bar_subs:
+            try:
+                cb(tf, bar)
+            except Exception as e:
+                print("[WARN] bar subscriber:", e)
+
+    # ........................ uygulama
+    def _apply(self, f) -> bool:
+        """Bir kaydı uygula; sayaç kopmuşsa False (yeniden yetişilmeli)."""
+        kind, src = f[b"k"], (f[b"e"], int(f[b"n"]))
+        if kind == b"s":
+            self.ticks.clear()
+            self.ticks.extend_columns(*unpack_trades(f[b"ticks"]))
+            self.agg.backfill(*unpack_bars(f[b"bars"]))
+            self.version += 1
+        elif self._src is None or src[0] != self._src[0] or src[1] != self._src[1] + 1:
+            return False
+        elif kind == b"t":
+            self.on_trades(*unpack_trades(f[b"d"]))
+        elif kind == b"b":                               # ingest bu barı burada kapattı
+            epoch = int(np.frombuffer(f[b"d"], BAR_DT)["epoch"][0])
+            self.agg.close_until(epoch + TF_SECONDS[f[b"tf"].decode()])
+        self._src = src
+        return True
+
+    async def _latest_snap(self, key):
+        top = "+"
+        while True:
+            page = await _BUS.xrevrange(key, max=top, count=PAGE)
+            for i, f in page:
+                if f[b"k"] == b"s":
+                    return i
+            if len(page) < PAGE:
+                return None
+            top = "(" + page[-1][0].decode()
+
+    async def _catch_up(self, key):
+        """En son anlık görüntüden bugüne XRANGE ile yetiş; son kimliği döndür."""
+        warned = False
+        while True:
+            snap = await self._latest_snap(key)
+            if snap is None:
+                self.ready.set()                         # boş akışla devam; görüntü beklenir
+                if not warned and time.time() - self._t0 > 10:
+                    print(f"[BUS] {self.key}: anlık görüntü yok – ingest çalışıyor mu?")
+                    warned = True
+                await asyncio.sleep(0.5)
+                continue
+            self._src, lo, last, ok = None, snap, None, True
+            while ok:
+                page = await _BUS.xrange(key, min=lo, count=PAGE)
+                for i, f in page:
+                    if not self._apply(f):
+                        ok = False
+                        break
+                    last = i
+                if len(page) < PAGE:
+                    break
+                lo = "(" + last.decode()
+            if ok:
+                return last
+            await asyncio.sleep(0.5)                     # yayıncı değişti: yeni görüntüyü bekle
+
+    async def _run(self):
+        self._t0 = time.time()
+        await supervise(self._follow, f"bus {self.key}")
+
+    async def _follow(self):
+        """Yetiş, sonra izle; Redis hatası yukarı çıkar → supervise geri çekilip
+        baştan (yeniden yetişerek) çağırır."""
+        key = stream_key(*self.key)
+        try:
+            last = await self._catch_up(key)
+        finally:
+            self.ready.set()                             # hata olsa da oturumlar beklemesin
+        while True:
+            entries = await _BUS.xread(key, last, block=5_000, count=PAGE)
+            for i, f in entries:
+                if not self._apply(f):
+                    print(f"[BUS] {self.key}: sequence break → catch up")
+                    i = await self._catch_up(key)
+                    last = i
+                    break
+                last = i
+
+
+def enable(url: str):
+    """Bu süreçte open_feed artık RemoteFeed döndürür (veri `url`deki bus’tan)."""
+    global _BUS
+    if _BUS is None:
+        _BUS = connect(url)
+        data_streams.FEED_FACTORY = RemoteFeed
+    return _BUS
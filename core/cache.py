@@ -0,0 +1,67 @@
+# core/cache.py
+"""
+Küçük, bağımlılıksız TTL + LRU önbellek.
+• `maxsize` aşılınca en az yakın zamanda kullanılan girdi atılır.
+• Her girdinin kendi son kullanma süresi vardır; süresi dolmuş girdiler
+  `lookup` ile "bayat" olarak okunabilir (stale-while-revalidate için).
+"""
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()      # key → (stored_at, ttl, value)
+        self.hits = self.misses = 0
+
+    def lookup(self, key):
+        """(value, fresh) döndürür; girdi yoksa (None, False)."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+        self._data.move_to_end(key)
+        stored, ttl, value = entry
+        fresh = time.time() - stored < ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value, fresh
+
+    def peek(self, key, default=None):
+        """Tazelik/LRU/istatistiğe dokunmadan (bayat olsa da) değeri oku."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[2]
+
+    def get(self, key, default=None):
+        value, fresh = self.lookup(key)
+        return value if fresh else default
+
+    def set(self, key, value, ttl: float | None = None, stored_at: float | None = None):
+        self._data[key] = (stored_at or time.time(), self.ttl if ttl is None else ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self):
+        """(key, stored_at, value) üçlüleri – anlık görüntü almak için."""
+        return [(k, s, v) for k, (s, _, v) in self._data.items()]
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[2]
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,108 @@
+# core/candle_store.py
+"""
+Diskte kalıcı mum deposu.
+• Anahtar: exchange / symbol / timeframe  →  data/candles/<ex>/<sym>/<tf>.bin
+• Biçim: epoch’a göre sıralı, sabit boyutlu (48 bayt) little-endian kayıtlar
+  (epoch:i8, open, high, low, close, vol: f8). Başlık yok; dosya = dizi.
+• Okuma np.memmap ile kopyasız; yazma sadece sona ekleme (yeni epoch’lar).
+  Daha eski veri gelirse dosya birleştirilip atomik olarak yeniden yazılır
+  (aynı epoch’ta yeni gelen kazanır → REST teyidi eksik barı düzeltir).
+• Yazma hataları (disk dolu, izin …) uyarı basılıp yutulur; depo sadece
+  hızlandırıcıdır, veri REST’ten yeniden gelir.
+Dizin CANDLE_STORE_DIR ile değiştirilebilir, "off" verilirse depo kapalıdır.
+"""
+
+import os, pathlib
+import numpy as np
+
+DTYPE = np.dtype([("epoch", "<i8"), ("open", "<f8"), ("high", "<f8"),
+                  ("low", "<f8"), ("close", "<f8"), ("vol", "<f8")])
+FIELDS = DTYPE.names
+
+_DEFAULT_DIR = pathlib.Path(__file__).resolve().parent.parent / "data" / "candles"
+
+
+class CandleStore:
+    """Append-only, memory-mapped candle files keyed by exchange/symbol/tf."""
+
+    def __init__(self, root=_DEFAULT_DIR):
+        self.root = pathlib.Path(root)
+
+    def path(self, exchange, symbol, tf) -> pathlib.Path:
+        safe = symbol.replace("/", "_")
+        return self.root / exchange / safe / f"{tf}.bin"
+
+    # ........................ okuma
+    def read(self, exchange, symbol, tf, start=None, end=None) -> np.ndarray:
+        """[start, end) aralığındaki kayıtlar – kopyasız memmap dilimi.
+        Çağrıdan sonra tutulacaksa np.array ile kopyalanmalı: eşleme açıkken
+        put() dosyayı Windows’ta değiştiremez."""
+        p = self.path(exchange, symbol, tf)
+        if not p.exists() or p.stat().st_size < DTYPE.itemsize:
+            return np.empty(0, DTYPE)
+        rec = np.memmap(p, dtype=DTYPE, mode="r",
+                        shape=(p.stat().st_size // DTYPE.itemsize,))
+        ep = rec["epoch"]
+        i = 0 if start is None else int(np.searchsorted(ep, start))
+        j = len(rec) if end is None else int(np.searchsorted(ep, end))
+        return rec[i:j]
+
+    def last_epoch(self, exchange, symbol, tf):
+        p = self.path(exchange, symbol, tf)
+        n = p.stat().st_size // DTYPE.itemsize if p.exists() else 0
+        if n == 0:
+            return None
+        with open(p, "rb") as f:
+            f.seek((n - 1) * DTYPE.itemsize)
+            return int(np.frombuffer(f.read(DTYPE.itemsize), DTYPE)["epoch"][0])
+
+    # ........................ yazma
+    def put(self, exchange, symbol, tf, cols):
+        """(epoch, o, h, l, c, v) sütunlarını depoya işle (sıralı kabul edilir)."""
+        if len(cols[0]) == 0:
+            return
+        new = np.empty(len(cols[0]), DTYPE)
+        for name, c in zip(FIELDS, cols):
+            new[name] = c
+        p = self.path(exchange, symbol, tf)
+        tmp = p.with_suffix(".tmp")
+        try:
+            last = self.last_epoch(exchange, symbol, tf)
+            if last is None or new["epoch"][0] > last:        # hızlı yol: sona ekle
+                p.parent.mkdir(parents=True, exist_ok=True)
+                with open(p, "ab") as f:
+                    f.write(new.tobytes())
+                return
+            old = np.array(self.read(exchange, symbol, tf))
+            i = np.searchsorted(old["epoch"], new["epoch"])
+            if (i < len(old)).all() and (old[np.minimum(i, len(old) - 1)] == new).all():
+                return                                        # hepsi zaten aynen depoda
+            both = np.concatenate([old, new])
+            order = np.argsort(both["epoch"], kind="stable")
+            both = both[order]
+            keep = np.r_[both["epoch"][1:] != both["epoch"][:-1], True]   # yeni kazanır
+            with open(tmp, "wb") as f:
+                f.write(both[keep].tobytes())
+            os.replace(tmp, p)
+        except OSError as e:
+            print(f"[WARN] candle store {exchange} {symbol} {tf}:", e)
+            tmp.unlink(missing_ok=True)
+
+    def append_bar(self, exchange, symbol, tf, bar):
+        """Canlı akıştan kapanan tek bar; sadece depodaki son bardan yeniyse."""
+        last = self.last_epoch(exchange, symbol, tf)
+        if last is not None and bar[0] <= last:
+            return
+        p = self.path(exchange, symbol, tf)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, "ab") as f:
+            f.write(np.array([tuple(bar)], DTYPE).tobytes())
+
+
+def columns(rec: np.ndarray) -> tuple:
+    """Kayıt dizisinden (epoch, o, h, l, c, v) görünümleri (kopyasız)."""
+    return tuple(rec[name] for name in FIELDS)
+
+
+_dir = os.getenv("CANDLE_STORE_DIR", "")
+STORE = None if _dir.lower() == "off" else CandleStore(_dir or _DEFAULT_DIR)
@@ -0,0 +1,102 @@
+# core/candles.py
+"""
+Akışkan (streaming) çoklu zaman dilimi mum toplayıcısı.
+• Her zaman dilimi için çalışan bir O/H/L/C/V tutulur; her güncelleme O(1).
+• Kovalar duvar saatine (epoch sınırlarına) hizalıdır: 5m → :00, :05 …,
+  1d → UTC 00:00. Tampon uzunluğuna bağlı kayma olmaz.
+• Oluşmakta olan (kısmi) bar `partial(tf)` ile okunur, kapanan barlar
+  ilgili RingBuffer’a eklenir.
+• REST geçmişi `backfill` ile vektörel (reduceat) olarak toplanır.
+"""
+
+import numpy as np
+
+TF_SECONDS = {"1m": 60, "5m": 300, "15m": 900,
+              "1h": 3_600, "4h": 14_400, "1d": 86_400}
+
+
+def resample(epoch, o, h, l, c, v, sec):
+    """1m sütunlarını `sec` saniyelik epoch kovalarına topla (vektörel)."""
+    b = epoch - epoch % sec
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    ends = np.r_[starts[1:], len(b)] - 1
+    return (b[starts], o[starts],
+            np.maximum.reduceat(h, starts), np.minimum.reduceat(l, starts),
+            c[ends], np.add.reduceat(v, starts))
+
+
+class CandleAggregator:
+    """Keeps one running bar per timeframe and flushes closed bars to `store`."""
+
+    def __init__(self, store: dict, on_close=None):
+        self.store = store                                   # {tf: RingBuffer}
+        self.on_close = on_close                             # cb(tf, bar)
+        self._cur = {tf: None for tf in store}               # [t0,o,h,l,c,v]
+        self._closed = {tf: -1 for tf in store}              # son kapanan t0
+
+    def reset(self):
+        for tf in self._cur:
+            self._cur[tf] = None
+            self._closed[tf] = -1
+
+    # ........................ canlı güncelleme
+    def add(self, ts, o, h, l, c, v):
+        """Bir trade’i ya da alt zaman dilimi barını tüm dilimlere işle."""
+        for tf, bar in self._cur.items():
+            sec = TF_SECONDS[tf]
+            t0 = ts - ts % sec
+            if bar is not None and t0 == bar[0]:
+                if h > bar[2]: bar[2] = h
+                if l < bar[3]: bar[3] = l
+                bar[4] = c
+                bar[5] += v
+            elif t0 > self._closed[tf] and (bar is None or t0 > bar[0]):
+                if bar is not None:
+                    self._close(tf)
+                self._cur[tf] = [t0, o, h, l, c, v]
+            # daha eski (geç gelen) veri: kapanmış bara dokunulmaz
+
+    def add_trade(self, ts, px, qty):
+        self.add(ts, px, px, px, px, qty)
+
+    def close_until(self, now) -> list:
+        """Süresi `now` itibarıyla dolmuş kısmi barları kapat."""
+        closed = []
+        for tf, bar in self._cur.items():
+            if bar is not None and bar[0] + TF_SECONDS[tf] <= now:
+                self._close(tf)
+                closed.append(tf)
+        return closed
+
+    def _close(self, tf):
+        bar = self._cur[tf]
+        self.store[tf].append(bar)
+        self._closed[tf] = bar[0]
+        self._cur[tf] = None
+        if self.on_close is not None:
+            self.on_close(tf, tuple(bar))
+
+    def partial(self, tf):
+        bar = self._cur[tf]
+        return tuple(bar) if bar is not None else None
+
+    # ........................ REST geçmişi
+    def backfill(self, epoch, o, h, l, c, v):
+        """1m sütunlarından tüm dilimleri yeniden kur; son kova kısmi kalır."""
+        self.reset()
+        for tf in self.store:
+            self.store[tf].clear()
+        if len(epoch) == 0:
+            return
+        epoch = np.asarray(epoch).astype(np.int64)
+        order = np.argsort(epoch, kind="stable")            # OKX yeni → eski
+        keep = np.r_[epoch[order][1:] != epoch[order][:-1], True]
+        idx = order[keep]                                   # tekrarlarda sonuncusu
+        cols = [epoch[idx]] + [np.asarray(x, dtype=float)[idx]
+                               for x in (o, h, l, c, v)]
+        for tf in self.store:
+            res = resample(*cols, TF_SECONDS[tf])
+            self.store[tf].extend_columns(*(x[:-1] for x in res))
+            self._cur[tf] = [x[-1].item() for x in res]
+            if len(res[0]) > 1:
+                self._closed[tf] = res[0][-2].item()
@@ -1,281 +1,352 @@
 # core/data_streams.py
 # ────────────────────  (yalın – sadece websocket+history görevleri)
 
-import asyncio, json, time, requests, websockets, pandas as pd
+import asyncio, math, time, numpy as np, pandas as pd
 from collections import deque
 
-# ........................ global tamponlar
-TICKS: deque = deque(maxlen=6_000)                    # (ts, price, qty, side)
-CANDLES = {tf: deque(maxlen=1_500) for tf in
-           ("1m", "5m", "15m", "1h", "4h", "1d")}
-_WS_TASKS = []
-
-# ........................ yardımcılar
-_MINUTES = {"5m": 5, "15m": 15, "1h": 60, "4h": 240, "1d": 1_440}
-
-def _aggregate_last(tf):
-    m = _MINUTES[tf]
-    chunk = list(CANDLES["1m"])[-m:]
-    if len(chunk) < m:
-        return
-    t0, o, *_ = chunk[0]
-    *_, c = chunk[-1]
-    hi = max(r[2] for r in chunk)
-    lo = min(r[3] for r in chunk)
-    vol = sum(r[5] for r in chunk)
-    CANDLES[tf].append((t0, o, hi, lo, c, vol))
-
-def _backfill_higher_tfs():
-    for tf in _MINUTES:
-        CANDLES[tf].clear()
-    for i in range(len(CANDLES["1m"])):
-        if (i + 1) % _MINUTES["5m"]  == 0: _aggregate_last("5m")
-        if (i + 1) % _MINUTES["15m"] == 0: _aggregate_last("15m")
-        if (i + 1) % _MINUTES["1h"]  == 0: _aggregate_last("1h")
-        if (i + 1) % _MINUTES["4h"]  == 0: _aggregate_last("4h")
-        if (i + 1) % _MINUTES["1d"]  == 0: _aggregate_last("1d")
-
-# ........................ REST geçmiş (1000 × 1 dak.)
-def _fetch_history_1m(exchange, symbol):
-    if exchange == "Binance":
-        url = "https://fapi.binance.com/fapi/v1/klines"
-        r = requests.get(url, params={"symbol":symbol, "interval":"1m", "limit":1440}, timeout=8)
-        r.raise_for_status()
-        rows = [(k[0]//1000, *map(float, k[1:6])) for k in r.json()]
-
-    elif exchange == "Bybit":
-        url = "https://api.bybit.com/v5/market/kline"
-        r = requests.get(url, params={
-            "category":"linear",
-            "symbol":symbol,
-            "interval":"1",
-            "limit":1440
-        }, timeout=8)
-        r.raise_for_status()
-        rows = [
-            (int(k[0])//1000,
-             float(k[1]), float(k[2]), float(k[3]),
-             float(k[4]), float(k[5]))
-            for k in reversed(r.json()["result"]["list"])
-        ]
-
-    elif exchange == "OKX":
-        url = "https://www.okx.com/api/v5/market/history-candles"
-        r = requests.get(url, params={
-            "instType":"UMCBL",
-            "instId":symbol,
-            "bar":"1m",
-            "limit":1440
-        }, timeout=8)
-        r.raise_for_status()
-        data = r.json().get("data", [])
-        rows = [
-            (int(k[0])//1000,
-             float(k[1]), float(k[2]), float(k[3]),
-             float(k[4]), float(k[5]))
-            for k in data
-        ]
-
-    else:
-        raise ValueError(f"Unsupported exchange for history fetch: {exchange}")
-
-    CANDLES["1m"].extend(rows)
+from core import metrics, rest, history, ws_mux
+from core.decode import BUY, SELL
+from core.ringbuffer import RingBuffer, TickBuffer, CANDLE_COLUMNS
+from core.candles import CandleAggregator, TF_SECONDS
+from core.candle_store import STORE
+
+TIMEFRAMES = tuple(TF_SECONDS)                         # ("1m" … "1d")
+
+HISTORY_SECONDS = metrics.histogram("feed_history_seconds",
+                                    "REST/disk history backfill when a feed starts", ("exchange",))
+GAP_FILLS = metrics.counter("feed_gap_fills_total", "REST gap backfills after WS gaps",
+                            ("exchange",))
+
+# ........................ REST geçmiş (1440 × 1 dak.; disk deposu + eksik kuyruk)
+async def _fetch_history_1m(exchange, symbol, bars=1_440):
+    return await history.load_klines(exchange, symbol, "1m", bars=bars)
+
 # ........................ WebSocket toplama
-async def _binance_stream(sym):
-    uri = f"wss://stream.binance.com/stream?streams={sym.lower()}@trade"
-    async with websockets.connect(uri) as ws:
-        async for msg in ws:
-            d = json.loads(msg)["data"]
-            TICKS.append((d["T"]//1000, float(d["p"]), float(d["q"]),
-                          "sell" if d["m"] else "buy"))
-
-async def _bybit_stream(sym):
-    uri = "wss://stream.bybit.com/v5/public/linear"
-    sub = json.dumps({"op":"subscribe", "args":[f"publicTrade.{sym}"]})
-    async with websockets.connect(uri) as ws:
-        await ws.send(sub)
-        async for msg in ws:
-            m = json.loads(msg)
-            if m.get("topic","").startswith("publicTrade"):
-                for tr in m["data"]:
-                    TICKS.append((tr["T"]//1000, float(tr["p"]), float(tr["v"]),
-                                   "sell" if tr["S"] == "Sell" else "buy"))
-
-# ........................ 1-dakikalık mum üreticisi
-async def _candle_worker():
-    while True:
-        nxt = (int(time.time()) // 60 + 1) * 60
-        cur = []
-        while time.time() < nxt:
-            while TICKS and TICKS[0][0] < nxt:
-                cur.append(TICKS.popleft())
-            await asyncio.sleep(0.25)
-
-        if cur:
-            prices = [p for _, p, *_ in cur]
-            vol    = sum(q for *_, q, _ in cur)
-            CANDLES["1m"].append((nxt-60, prices[0], max(prices),
-                                   min(prices), prices[-1], vol))
-            if len(CANDLES["1m"]) > 1_500:
-                CANDLES["1m"].popleft()
-
-            for tf in _MINUTES:
-                if len(CANDLES["1m"]) % _MINUTES[tf] == 0:
-                    _aggregate_last(tf)
-
-asyncio.create_task(_candle_worker())
+# Binance/Bybit/OKX/Bitget/HTX/KuCoin trade’leri core.ws_mux üzerinden borsa
+# başına birkaç paylaşılan sokette akar; çerçevenin trade’leri `on_trades(ts, px,
+# qty, side)` ile (sütun listeleri, side = ±1) feed’e iner. Soket açılamadığı
+# sürece `_POLLERS`taki REST poll devreye girer; çoklanamayan kaynaklar
+# `_STREAMS` handler’larıyla çalışır.
+# Kopma/kimlik boşluğu olunca ws_mux `on_gap(since)` çağırır → kaçan dakikalar
+# REST’ten yeniden çekilip mumlara yamanır (restart gerekmez).
+# Disk deposuna yalnızca REST’in teyit ettiği ya da tamamen canlı akışla
+# kurulmuş 1m barlar yazılır: abonelik/dolum anındaki sınır dakikası (yarısı
+# REST, yarısı canlı) kapanınca REST’ten teyit edilir; boşluk beklerken ve
+# teyit gelene dek canlı barlar yazılmaz (depoda delik ya da eksik bar kalmaz).
 
-# ........................ herkese açık API
-def restart_stream(exchange, symbol):
-    """REST+WS akışını sıfırla, son kapanışı anında fiyat tamponuna koy."""
-    # WS’leri kes
-    for t in _WS_TASKS: t.cancel()
-    _WS_TASKS.clear()
-
-    # tamponları sıfırla
-    TICKS.clear()
-    for dq in CANDLES.values(): dq.clear()
-
-    # REST geçmiş + son fiyatı dummy tick olarak ekle
-    _fetch_history_1m(exchange, symbol)
-    if CANDLES["1m"]:
-        ts, *_, close, _ = CANDLES["1m"][-1]
-        TICKS.append((ts, close, 0, ""))
-
-    _backfill_higher_tfs()
-
-    # yeni WS görevi
-    stream_fn = _STREAMS.get(exchange)
-    if stream_fn is None:
-        raise ValueError(f"No WS stream found for exchange: {exchange}")
-    _WS_TASKS.append(asyncio.create_task(stream_fn(symbol)))
-
-def df_candles(tf="1m") -> pd.DataFrame:
-    raw = pd.DataFrame(list(CANDLES[tf]),
-                       columns=["epoch","open","high","low","close","vol"])
-    if raw.empty:
-        return raw
-    raw["time"] = pd.to_datetime(raw["epoch"], unit="s", utc=True)
-    return raw.set_index("time")
-# ────────────────────────────── BITGET WS ────────────────────────────────
-async def _bitget_stream(sym: str):
-    """Bitget USDT-perp trades"""
-    uri = "wss://ws.bitget.com/mix/v1/stream"
-    sub = json.dumps({
-        "op": "subscribe",
-        "args": [{"channel": "trade", "instId": sym}]
-    })
-    while True:
+# ........................ (borsa, sembol) başına ortak akış
+class Feed:
+    """One market feed: tick/candle buffers, aggregator, WS task, subscribers.
+
+    Aynı (exchange, symbol) için tüm Panel oturumları tek bir Feed’i paylaşır;
+    referans sayısı sıfıra inince WS kapatılır.
+    """
+
+    close_on_clock = True          # süresi dolan barları yerel dakika zamanlayıcısı kapatır
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange, self.symbol = exchange, symbol
+        self.ticks   = TickBuffer(6_000)                  # (ts, price, qty, side)
+        self.candles = {tf: RingBuffer(1_500) for tf in TIMEFRAMES}
+        self.agg     = CandleAggregator(self.candles, on_close=self._on_bar)
+        self.refs    = 0
+        self.task    = None
+        self.ready   = asyncio.Event()                    # REST geçmişi yüklendi
+        self.version = 0                                  # her tam yeniden kurulumda artar
+        self._tick_subs = []                              # cb(ts, px, qty, side) – toplu
+        self._bar_subs  = []                              # cb(tf, bar)
+        self._day_close = {}                              # (offset, gün başı) → kapanış
+        self._gap_since = None                            # bekleyen boşluk başlangıcı
+        self._persist_from = math.inf                     # bu epoch’tan itibaren canlı barlar diske
+        self._confirm_at = None                           # bekleyen REST teyidinin sınır dakikası
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol
+
+    # ........................ olay güdümlü tick → mum hattı
+    def on_trades(self, ts, px, qty, side):
+        """Stream handler’ların tek giriş noktası: bir çerçevenin trade’leri
+        sütun olarak tampona yazılır, mumlara işlenir, abonelere toplu iletilir."""
+        self.ticks.extend_columns(ts, px, qty, side)
+        add = self.agg.add_trade
+        for t, p, q in zip(ts, px, qty):
+            add(t, p, q)
+        for cb in self._tick_subs:
+            try:
+                cb(ts, px, qty, side)
+            except Exception as e:
+                print("[WARN] tick subscriber:", e)
+
+    def _on_bar(self, tf, bar):
+        if (STORE is not None and tf == "1m" and self._gap_since is None
+                and bar[0] >= self._persist_from):
+            try:
+                STORE.append_bar(self.exchange, self.symbol, tf, bar)
+            except OSError as e:
+                print("[WARN] candle store:", e)
+        for cb in self._bar_subs:
+            try:
+                cb(tf, bar)
+            except Exception as e:
+                print("[WARN] bar subscriber:", e)
+
+    # ........................ boşluk doldurma
+    def on_gap(self, since: float):
+        """Akış `since`ten (duvar saati) beri veri kaçırmış olabilir."""
+        if self._gap_since is not None:                   # dolum zaten sırada
+            self._gap_since = min(self._gap_since, since)
+            return
+        self._gap_since = since
+        self._persist_from = math.inf                     # dolum + teyide dek canlı barlar yazılmaz
+        asyncio.create_task(self._fill_gap())
+
+    async def _fill_gap(self):
+        await asyncio.sleep(1)                            # aynı anda gelenleri birleştir
+        since, self._gap_since = self._gap_since, None
+        start = int(since) - int(since) % 60
+        GAP_FILLS.labels(self.exchange).inc()
         try:
-            async with websockets.connect(uri, ping_interval=20) as ws:
-                await ws.send(sub)
-                async for msg in ws:
-                    m = json.loads(msg)
-                    if m.get("action") != "push":
-                        continue
-                    for d in m.get("data", []):
-                        TICKS.append((
-                            d["ts"] // 1000,
-                            float(d["price"]),
-                            float(d["size"]),
-                            "sell" if d["side"] == "sell" else "buy"
-                        ))
+            fresh = await history.fetch_klines(self.exchange, self.symbol, "1m", start=start)
         except Exception as e:
-            print("[WS] Bitget reconnect:", e)
-            await asyncio.sleep(5)
+            print(f"[WARN] gap backfill fail {self.key} → {e} (30 sn sonra tekrar)")
+            if self.task is not None:                     # akış hâlâ açıksa yeniden dene
+                asyncio.get_running_loop().call_later(30, self.on_gap, since)
+            return
+        if not len(fresh[0]):
+            self._confirm_after(int(time.time()))
+            return
+        if STORE is not None:                             # kesinti boyunca yazılmış eksik barlar
+            closed = fresh[0] + 60 <= time.time()         # da burada REST’inkilerle değişir
+            STORE.put(self.exchange, self.symbol, "1m", tuple(c[closed] for c in fresh))
+        self._confirm_after(int(fresh[0][-1]))
+        have = self.candles["1m"].last()
+        keep = have["epoch"] < fresh[0][0]
+        self.agg.backfill(*(np.concatenate([have[name][keep], f])
+                            for (name, _), f in zip(CANDLE_COLUMNS, fresh)))
+        self.version += 1
+        print(f"[WS] {self.key} gap filled from {start} ({len(fresh[0])} bars)")
 
+    # ........................ depo teyidi
+    def _confirm_after(self, boundary: int):
+        """`boundary` dakikası (kısmen REST, kısmen canlı) kapanınca REST’ten
+        teyit et; sonraki barlar tamamen canlıdır ve doğrudan yazılabilir."""
+        if STORE is not None:
+            self._confirm_at = boundary - boundary % 60   # sadece en son teyit kapıyı açar
+            asyncio.create_task(self._confirm(self._confirm_at))
 
-# ─────────────────────────────── HTX / HUOBI ─────────────────────────────
-async def _htx_stream(sym: str):
-    """HTX (Huobi) linear-swap trades"""
-    uri = "wss://api.huobi.pro/ws"
-    ch = f"market.{sym.lower()}.trade.detail"
-    sub = json.dumps({"sub": ch, "id": "id1"})
-    while True:
+    async def _confirm(self, boundary: int, tries: int = 5):
+        await asyncio.sleep(max(0.0, boundary + 62 - time.time()))
+        if self.task is None:                             # akış kapandı
+            return
+        last = STORE.last_epoch(self.exchange, self.symbol, "1m")
+        start = boundary if last is None else min(boundary, last + 60)
+        for attempt in range(tries):
+            try:
+                fresh = await history.fetch_klines(self.exchange, self.symbol, "1m",
+                                                   start=start, end=boundary + 60)
+                break
+            except Exception as e:
+                print(f"[WARN] candle confirm fail {self.key} → {e}")
+                await asyncio.sleep(10 * (attempt + 1))
+        else:
+            return                                        # depo kuyruğu bir sonraki açılışta REST’ten
+        STORE.put(self.exchange, self.symbol, "1m", fresh)
+        if self._gap_since is None and self._confirm_at == boundary:   # arada yeni boşluk yoksa
+            self._persist_from = boundary + 60
+
+    def subscribe(self, on_tick=None, on_bar=None):
+        if on_tick: self._tick_subs.append(on_tick)
+        if on_bar:  self._bar_subs.append(on_bar)
+
+    def unsubscribe(self, on_tick=None, on_bar=None):
+        if on_tick in self._tick_subs: self._tick_subs.remove(on_tick)
+        if on_bar in self._bar_subs:   self._bar_subs.remove(on_bar)
+
+    # ........................ yaşam döngüsü
+    def start(self):
+        """Arka planda: REST geçmişi yükle, son kapanışı fiyat tamponuna koy,
+        ardından WS’e abone ol. Çağıran beklemek isterse `ready`’yi bekler."""
+        if not ws_mux.supports(self.exchange) and self.exchange not in _STREAMS:
+            raise ValueError(f"No WS stream found for exchange: {self.exchange}")
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
         try:
-            async with websockets.connect(uri, ping_interval=20) as ws:
-                await ws.send(sub)
-                async for raw in ws:
-                    if isinstance(raw, bytes):
-                        raw = zlib.decompress(raw, 31).decode()
-                    msg = json.loads(raw)
-                    if "ping" in msg:
-                        await ws.send(json.dumps({"pong": msg["ping"]}))
-                        continue
-                    if msg.get("ch") != ch:
-                        continue
-                    for td in msg["tick"]["data"]:
-                        TICKS.append((
-                            td["ts"] // 1000,
-                            float(td["price"]),
-                            float(td["amount"]),
-                            "sell" if td["direction"] == "sell" else "buy"
-                        ))
+            with HISTORY_SECONDS.labels(self.exchange).time():
+                rows = await _fetch_history_1m(self.exchange, self.symbol)
+            self.agg.backfill(*rows)
+            self.version += 1
         except Exception as e:
-            print("[WS] HTX reconnect:", e)
-            await asyncio.sleep(5)
+            print(f"[WARN] REST history fail {self.key} → {e} (live WS ile devam)")
+        finally:
+            self.ready.set()
+        last = self.agg.partial("1m") or (self.candles["1m"][-1]
+                                          if self.candles["1m"] else None)
+        if last:
+            ts, *_, close, _ = last
+            self.ticks.append((ts, close, 0, ""))     # mumlara girmez, sadece fiyat
+        if ws_mux.supports(self.exchange):
+            ws_mux.subscribe(self.exchange, self.symbol, self.on_trades,
+                             on_gap=self.on_gap)
+            self._confirm_after(int(time.time()))
+            if self.exchange in _POLLERS:
+                await self._fallback(_POLLERS[self.exchange])
+        else:
+            await _STREAMS[self.exchange](self.symbol, self.on_trades)
+
+    async def _fallback(self, poll, grace=10):
+        """Soket `grace` sn’den uzun kapalı kalırsa, açılana dek REST poll."""
+        down = 0.0
+        while True:
+            await asyncio.sleep(1)
+            if ws_mux.connected(self.exchange, self.symbol):
+                down = 0.0
+                continue
+            down += 1
+            if down < grace:
+                continue
+            print(f"[WS] {self.key} socket down → REST poll")
+            task = asyncio.create_task(poll(self.symbol, self.on_trades, self.on_gap))
+            try:
+                while not ws_mux.connected(self.exchange, self.symbol):
+                    await asyncio.sleep(1)
+            finally:
+                task.cancel()
+            down = 0.0
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if ws_mux.supports(self.exchange):
+            ws_mux.unsubscribe(self.exchange, self.symbol, self.on_trades,
+                               on_gap=self.on_gap)
+
+    def day_close(self, offset: int, now: float | None = None):
+        """Yerel (UTC+offset) gün başındaki 1m mumun kapanışı; yoksa None.
+
+        Gün başına bir kez searchsorted ile bulunur, sonra sözlükten O(1) okunur.
+        """
+        now = time.time() if now is None else now
+        day = int((now + offset) // 86_400 * 86_400 - offset)
+        key = (offset, day)
+        px = self._day_close.get(key)
+        if px is None:
+            ep = self.candles["1m"].view("epoch")
+            i = int(np.searchsorted(ep, day))
+            if i < len(ep) and ep[i] == day:
+                px = self._day_close[key] = float(self.candles["1m"].view("close")[i])
+                for k in [k for k in self._day_close if k[1] < day]:
+                    del self._day_close[k]                 # eski günleri at
+        return px
+
+    def df_candles(self, tf="1m", partial=False) -> pd.DataFrame:
+        raw = pd.DataFrame(self.candles[tf].last())
+        bar = self.agg.partial(tf) if partial else None
+        if bar is not None:
+            raw.loc[len(raw)] = bar
+            raw["epoch"] = raw["epoch"].astype("int64")
+        if raw.empty:
+            return raw
+        raw["time"] = pd.to_datetime(raw["epoch"], unit="s", utc=True)
+        return raw.set_index("time")
+
 
+_FEEDS: dict = {}                  # {(exchange, symbol): Feed}
+FEED_FACTORY = Feed                # core.bus.enable() → RemoteFeed (veri Redis’ten)
+_CLOSE_TIMER = None
+metrics.gauge("feeds_open", "Shared (exchange, symbol) feeds in this process").set_function(
+    lambda: len(_FEEDS))
+
+def _close_bars():
+    """Dakika sınırında çalışır; trade gelmese de süresi dolan barları kapatır."""
+    global _CLOSE_TIMER
+    now = time.time()
+    for feed in _FEEDS.values():
+        if feed.close_on_clock:
+            feed.agg.close_until(now)
+    nxt = (int(now) // 60 + 1) * 60
+    loop = asyncio.get_running_loop()
+    _CLOSE_TIMER = loop.call_at(loop.time() + nxt - time.time(), _close_bars)
+
+# ........................ herkese açık API
+def open_feed(exchange: str, symbol: str) -> Feed:
+    """(exchange, symbol) akışına abone ol; yoksa oluşturup başlat."""
+    feed = _FEEDS.get((exchange, symbol))
+    if feed is None:
+        feed = FEED_FACTORY(exchange, symbol)
+        feed.start()
+        _FEEDS[feed.key] = feed
+        if _CLOSE_TIMER is None and feed.close_on_clock:
+            _close_bars()
+    feed.refs += 1
+    return feed
+
+def close_feed(feed: Feed):
+    """Aboneliği bırak; son izleyici ayrılınca WS’i kapat."""
+    feed.refs -= 1
+    if feed.refs <= 0 and _FEEDS.get(feed.key) is feed:
+        feed.stop()
+        del _FEEDS[feed.key]
 
 # ─────────────────────────────── KUCOIN (poll) ───────────────────────────
-async def _kucoin_stream(sym: str):
-    """KuCoin futures REST-poll every second (skips WS auth handshake)"""
-    url = f"https://api.kucoin.com/api/v1/contracts/{sym}/trades"
-    last_seq = None
+async def _kucoin_poll(sym: str, on_trades, on_gap, fast=0.25, slow=5.0, seen_max=2_000,
+                       gap_every=30.0):
+    """KuCoin futures REST poll – WS yokken yedek.
+
+    Aralık uyarlanır: sayfanın yarısından fazlası yeniyse yarıya iner, yeni
+    trade yoksa 1.5 katına çıkar. Görülen sequence’ler sınırlı bir kümede
+    tutulur. Sayfanın tamamı yeniyse sayfa yine işlenir; yalnızca önceki
+    sayfanın sonu ile bu sayfanın başı arası kaçmış olabilir → o aralığın
+    başı biriktirilir ve en fazla `gap_every` sn’de bir `on_gap` ile doldurulur
+    (patlamalarda her poll’da REST dolumu yapılmaz).
+    İlk sayfa yalnızca kümeyi doldurur, içeriği kline dolumuyla gelir.
+    """
+    url = "https://api-futures.kucoin.com/api/v1/trade/history"
+    seen, order = set(), deque()
+    last_ts, delay = None, 1.0
+    gap, gap_at = None, 0.0                               # bekleyen boşluk başı, son dolum
     while True:
         try:
-            r = requests.get(url, timeout=5)
-            r.raise_for_status()
-            for tr in reversed(r.json()["data"]):
-                seq = tr["sequence"]
-                if last_seq is None or seq > last_seq:
-                    TICKS.append((
-                        int(tr["time"]) // 1000,
-                        float(tr["price"]),
-                        float(tr["size"]),
-                        "sell" if tr["side"] == "sell" else "buy"
-                    ))
-                    last_seq = seq
+            data = (await rest.get_json(url, params={"symbol": sym},
+                                        timeout=5, retries=0))["data"] or []
         except Exception as e:
             print("[WS] KuCoin poll err:", e)
-        await asyncio.sleep(1)
+            delay = slow
+        else:
+            new = sorted((tr for tr in data if tr["sequence"] not in seen),
+                         key=lambda tr: tr["sequence"])
+            if new and last_ts is None:
+                on_gap(new[0]["ts"] / 1e9)
+            elif new:
+                if len(new) == len(data) and gap is None:
+                    gap = last_ts                         # [last_ts, new[0]) kapsanamadı
+                on_trades([tr["ts"] // 1_000_000_000 for tr in new],
+                          [float(tr["price"]) for tr in new],
+                          [float(tr["size"]) for tr in new],
+                          [SELL if tr["side"] == "sell" else BUY for tr in new])
+            for tr in new:
+                seen.add(tr["sequence"])
+                order.append(tr["sequence"])
+                if len(order) > seen_max:
+                    seen.discard(order.popleft())
+            if new:
+                last_ts = new[-1]["ts"] / 1e9
+            if len(new) * 2 > len(data):
+                delay = max(fast, delay / 2)
+            elif not new:
+                delay = min(slow, delay * 1.5)
+        if gap is not None and time.monotonic() - gap_at >= gap_every:
+            on_gap(gap)
+            gap, gap_at = None, time.monotonic()
+        await asyncio.sleep(delay)
 
 
-# ────────────────────────────── OKX WS ──────────────────────────────────
-async def _okx_stream(sym: str):
-    """OKX USDT perpetual trade stream"""
-    uri = "wss://ws.okx.com:8443/ws/v5/public"
-    sub = json.dumps({
-        "op": "subscribe",
-        "args": [{"channel": "trades", "instId": sym}]
-    })
-    while True:
-        try:
-            async with websockets.connect(uri, ping_interval=20) as ws:
-                await ws.send(sub)
-                async for msg in ws:
-                    m = json.loads(msg)
-                    # sadece 'trades' kanalı
-                    args = m.get("arg", {})
-                    if args.get("channel") != "trades":
-                        continue
-                    for d in m.get("data", []):
-                        # timestamp ms cinsinden geldi, string formatında:
-                        ts = int(d["ts"]) // 1000
-                        px = float(d["px"])
-                        sz = float(d["sz"])
-                        side = "sell" if d["side"] == "sell" else "buy"
-                        TICKS.append((ts, px, sz, side))
-        except Exception as e:
-            print("[WS] OKX reconnect:", e)
-            await asyncio.sleep(5)
-
-# ────────────── Son olarak, _STREAMS sözlüğünüze ekleyin ────────────────
-_STREAMS = {
-    "Binance":  _binance_stream,
-    "Bybit":    _bybit_stream,
-    "OKX":      _okx_stream,
-    "Bitget":   _bitget_stream,
-    "HTX":      _htx_stream,
-    "KuCoin":   _kucoin_stream,
+# WS’i olan ama soket açılamadığında REST’e düşülebilen borsalar
+_POLLERS = {
+    "KuCoin":   _kucoin_poll,
 }
 
+# ────────────── Çoklanmayan (tek sembollük) akışlar ────────────────
+_STREAMS: dict = {}                # exchange → async handler(symbol, on_trades)
@@ -0,0 +1,136 @@
+# core/decode.py
+"""
+WebSocket mesaj çözümleme katmanı.
+• `loads`: orjson kuruluysa onu, değilse stdlib json’u kullanır
+  (JSON_BACKEND=json ile zorlanabilir).
+• Borsa başına `trades_*` fonksiyonları bir çerçevedeki tüm trade’leri
+  tek geçişte sütun listelerine çevirir: (ts, price, qty, side)
+  – ara tuple/dict üretilmez, side doğrudan int8 kodu (1 alış, -1 satış).
+  Çerçeve trade içermiyorsa None döner.
+• `SEQ[ex](m)` çerçevedeki trade kimliklerinin (ilk, son) aralığı; yeniden
+  bağlanınca tekrar gelen trade’leri elemek ve boşluk tespiti için.
+  CONTIGUOUS’taki borsalarda kimlikler ardışıktır (son+1 ≠ ilk → boşluk).
+• HTX gzip çerçeveleri için `gunzip`.
+"""
+
+import json, os, zlib
+
+try:
+    if os.getenv("JSON_BACKEND", "").lower() == "json":
+        raise ImportError
+    import orjson
+    loads = orjson.loads
+    dumps = lambda o: orjson.dumps(o).decode()
+    BACKEND = "orjson"
+except ImportError:
+    loads = json.loads
+    dumps = json.dumps
+    BACKEND = "json"
+
+BUY, SELL = 1, -1
+
+
+def gunzip(raw: bytes) -> bytes:
+    return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+
+
+def trades_binance(m):
+    d = m.get("data", m)
+    if d.get("e") not in ("aggTrade", "trade"):
+        return None
+    return ([d["T"] // 1000], [float(d["p"])], [float(d["q"])],
+            [SELL if d["m"] else BUY])
+
+
+def trades_bybit(m):
+    if not m.get("topic", "").startswith("publicTrade"):
+        return None
+    data = m["data"]
+    return ([tr["T"] // 1000 for tr in data], [float(tr["p"]) for tr in data],
+            [float(tr["v"]) for tr in data],
+            [SELL if tr["S"] == "Sell" else BUY for tr in data])
+
+
+def trades_okx(m):
+    if m.get("arg", {}).get("channel") != "trades" or "data" not in m:
+        return None
+    data = m["data"]
+    return ([int(d["ts"]) // 1000 for d in data], [float(d["px"]) for d in data],
+            [float(d["sz"]) for d in data],
+            [SELL if d["side"] == "sell" else BUY for d in data])
+
+
+def trades_bitget(m):
+    # v2: ilk "snapshot" geçmiş trade’lerdir (REST ile zaten gelir) → atla
+    if m.get("action") != "update" or m.get("arg", {}).get("channel") != "trade":
+        return None
+    data = m["data"]
+    return ([int(d["ts"]) // 1000 for d in data], [float(d["price"]) for d in data],
+            [float(d["size"]) for d in data],
+            [SELL if d["side"] == "sell" else BUY for d in data])
+
+
+def trades_htx(m):
+    tick = m.get("tick")
+    if tick is None or not m.get("ch", "").endswith(".trade.detail"):
+        return None
+    data = tick["data"]
+    return ([d["ts"] // 1000 for d in data], [float(d["price"]) for d in data],
+            [float(d.get("quantity", d["amount"])) for d in data],
+            [SELL if d["direction"] == "sell" else BUY for d in data])
+
+
+def trades_kucoin(m):
+    # /contractMarket/execution: çerçeve başına tek trade, ts nanosaniye
+    if m.get("subject") != "match":
+        return None
+    d = m["data"]
+    return ([d["ts"] // 1_000_000_000], [float(d["price"])], [float(d["size"])],
+            [SELL if d["side"] == "sell" else BUY])
+
+
+DECODERS = {
+    "Binance": trades_binance,
+    "Bybit":   trades_bybit,
+    "OKX":     trades_okx,
+    "Bitget":  trades_bitget,
+    "HTX":     trades_htx,
+    "KuCoin":  trades_kucoin,
+}
+
+
+# ........................ trade kimlikleri (ilk, son)
+def _span(ids):
+    return (min(ids), max(ids)) if ids else None
+
+def seq_binance(m):
+    a = m.get("data", m).get("a")
+    return None if a is None else (a, a)
+
+def seq_bybit(m):
+    return _span([tr["seq"] for tr in m["data"] if "seq" in tr])
+
+def seq_okx(m):
+    return _span([int(d["tradeId"]) for d in m["data"]])
+
+def seq_bitget(m):
+    return _span([int(d["tradeId"]) for d in m["data"] if "tradeId" in d])
+
+def seq_htx(m):
+    return _span([d["id"] for d in m["tick"]["data"]])
+
+
+def seq_kucoin(m):
+    q = m["data"].get("sequence")
+    return None if q is None else (q, q)
+
+
+SEQ = {
+    "Binance": seq_binance,
+    "Bybit":   seq_bybit,
+    "OKX":     seq_okx,
+    "Bitget":  seq_bitget,
+    "HTX":     seq_htx,
+    "KuCoin":  seq_kucoin,
+}
+CONTIGUOUS = {"Binance"}          # aggTrade kimliği "a" kesintisiz artar
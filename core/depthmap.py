@@ -0,0 +1,143 @@
+# core/depthmap.py
+"""
+Emir defteri likidite haritası kaydedicisi.
+• Bir L2 defterden (core.orderbook) her `every` saniyede bir kesit alınır:
+  fiyat kovası başına toplam derinlik → (zaman × fiyat kovası) float32
+  halka dizisine tek satır olarak yazılır. Bellek sabittir: slices × width.
+• Kova ızgarası sabit bir orijine bağlıdır; fiyat pencerenin kenarına
+  yaklaşınca ızgara kaydırılır (geçmiş satırlar da, pencere dışı kalan atılır).
+• Kesit, defterin en iyi seviyesinden başlayıp pencere dışına çıkınca durur.
+˓→  dm = open_depthmap(exchange, symbol); dm.subscribe(cb); dm.frame() → (t, prices, grid)
+"""
+
+import asyncio, math, time
+
+import numpy as np
+
+from core.orderbook import open_book, close_book
+
+
+def nice_step(mid: float, rel: float = 2e-4) -> float:
+    """mid × rel’e en yakın 1/2/5 × 10^k adım."""
+    raw = mid * rel
+    k = math.floor(math.log10(raw))
+    return min((m * 10 ** k for m in (1, 2, 5, 10)), key=lambda s: abs(s - raw))
+
+
+class DepthMap:
+    """Rolling time × price-bucket depth raster sampled from one shared book."""
+
+    def __init__(self, exchange: str, symbol: str, width: int = 400,
+                 slices: int = 3_600, every: float = 1.0):
+        self.exchange, self.symbol = exchange, symbol
+        self.width, self.slices, self.every = width, slices, every
+        self.grid = np.zeros((slices, width), np.float32)
+        self.times = np.zeros(slices, np.int64)          # ms
+        self.pos = self.count = 0
+        self.step = self.origin = None                   # fiyat = origin + k × step
+        self.refs = 0
+        self.book = None
+        self.task = None
+        self._subs: list = []
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol
+
+    # ........................ yaşam döngüsü
+    def start(self):
+        self.book = open_book(self.exchange, self.symbol)
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.book is not None:
+            close_book(self.book)
+            self.book = None
+
+    def subscribe(self, cb):
+        self._subs.append(cb)
+
+    def unsubscribe(self, cb):
+        if cb in self._subs:
+            self._subs.remove(cb)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.every - time.time() % self.every)
+            if self.book.synced and self.sample(time.time()):
+                for cb in self._subs:
+                    try:
+                        cb()
+                    except Exception as e:
+                        print("[WARN] depthmap subscriber:", e)
+
+    # ........................ kesit
+    def _recenter(self, mid):
+        new = mid - self.width / 2 * self.step
+        new = math.floor(new / self.step) * self.step
+        if self.origin is not None:
+            shift = int(round((new - self.origin) / self.step))
+            if shift >= self.width or -shift >= self.width:
+                self.grid[:] = 0
+            elif shift > 0:
+                self.grid[:, :-shift] = self.grid[:, shift:]
+                self.grid[:, -shift:] = 0
+            elif shift < 0:
+                self.grid[:, -shift:] = self.grid[:, :shift]
+                self.grid[:, :-shift] = 0
+        self.origin = new
+
+    def sample(self, now: float) -> bool:
+        book = self.book.book
+        mid = book.mid()
+        if mid is None:
+            return False
+        if self.step is None:
+            self.step = nice_step(mid)
+        lo, hi = self.origin, None
+        if lo is not None:
+            hi = lo + self.width * self.step
+        if lo is None or not lo + self.width * self.step / 4 < mid < hi - self.width * self.step / 4:
+            self._recenter(mid)
+            lo, hi = self.origin, self.origin + self.width * self.step
+        row = self.grid[self.pos]
+        row[:] = 0
+        for side in (book.bids, book.asks):
+            for k in side.keys:
+                p = side.sign * k
+                if not lo <= p < hi:
+                    break
+                row[int((p - lo) / self.step)] += side.qty[k]
+        self.times[self.pos] = int(round(now / self.every) * self.every * 1000)
+        self.pos = (self.pos + 1) % self.slices
+        self.count = min(self.count + 1, self.slices)
+        return True
+
+    def frame(self):
+        """(zamanlar ms, kova alt fiyatları, grid[zaman, kova]) – eski → yeni (kopya)."""
+        n, p = self.count, self.pos
+        idx = np.arange(p - n, p) % self.slices
+        prices = (self.origin if self.origin is not None else 0) + np.arange(self.width) * (self.step or 0)
+        return self.times[idx], prices, self.grid[idx]
+
+
+_MAPS: dict = {}
+
+
+def open_depthmap(exchange: str, symbol: str) -> DepthMap:
+    dm = _MAPS.get((exchange, symbol))
+    if dm is None:
+        dm = DepthMap(exchange, symbol)
+        dm.start()
+        _MAPS[dm.key] = dm
+    dm.refs += 1
+    return dm
+
+
+def close_depthmap(dm: DepthMap):
+    dm.refs -= 1
+    if dm.refs <= 0 and _MAPS.get(dm.key) is dm:
+        dm.stop()
+        del _MAPS[dm.key]
@@ -0,0 +1,288 @@
+# core/derivs.py
+"""
+Open interest + funding oranı toplayıcısı (tüm borsalar, tüm perpetual’lar).
+• Tek zamanlayıcı: her INTERVAL saniyede bir tüm borsalar eşzamanlı
+  yoklanır; sembol kümesi core.symbols.fetch_symbols’tan gelir.
+• Mümkün olan her yerde toplu uç noktalar (tek istek → tüm semboller):
+    Binance  premiumIndex (funding)              · OI sembol başına
+    Bybit    tickers (linear)                    · funding + OI
+    OKX      open-interest (SWAP)                · funding sembol başına
+    Bitget   tickers (usdt-futures)              · funding + OI
+    HTX      swap_batch_funding_rate + swap_open_interest
+    KuCoin   contracts/active                    · funding + OI
+  Toplu karşılığı olmayanlar (Binance OI, OKX funding) borsanın istek
+  bütçesi (rest.RateLimiter) içinde eşzamanlı, tur başına sınırlı sayıda
+  sembolle dönüşümlü çekilir; izlenen semboller her tur önce gelir.
+• Sonuçlar borsa başına (zaman × sembol) float32 matrislerine yazılır
+  (halka; sembol sütunu ilk görüldüğünde eklenir). OI USD cinsindendir.
+˓→  d = open_derivs(); d.watch(ex, sym); d.store(ex).series(sym); close_derivs(d)
+"""
+
+import asyncio, time
+
+import numpy as np
+
+from core import rest
+from core.symbols import fetch_symbols
+
+INTERVAL = 60                        # sn; bir tur
+SLOTS = 1_440                        # tur; 60 sn’de 24 saat
+RATE = {"Binance": 10, "Bybit": 5, "OKX": 8, "Bitget": 5, "HTX": 4, "KuCoin": 3}
+PER_ROUND = {"Binance": 200, "OKX": 120}      # sembol başına uç nokta: tur bütçesi
+
+_LIMITERS: dict = {}
+
+
+def _limiter(exchange):
+    lim = _LIMITERS.get(exchange)
+    if lim is None:
+        lim = _LIMITERS[exchange] = rest.RateLimiter(RATE[exchange])
+    return lim
+
+
+async def _get(exchange, url, params=None):
+    await _limiter(exchange).acquire()
+    return await rest.get_json(url, params=params, timeout=8)
+
+
+async def _each(fn, symbols) -> dict:
+    """fn(sym) → değer; hatalı olanlar atlanır."""
+    res = await asyncio.gather(*(fn(s) for s in symbols), return_exceptions=True)
+    return {s: v for s, v in zip(symbols, res) if not isinstance(v, BaseException)}
+
+
+# ........................ borsa toplayıcıları → {sym: (oi_usd, funding)}
+async def _binance(pick):
+    idx = await _get("Binance", "https://fapi.binance.com/fapi/v1/premiumIndex")
+    mark = {d["symbol"]: float(d["markPrice"]) for d in idx}
+
+    async def oi(s):
+        d = await _get("Binance", "https://fapi.binance.com/fapi/v1/openInterest", {"symbol": s})
+        return float(d["openInterest"]) * mark.get(s, np.nan)
+    ois = await _each(oi, pick(PER_ROUND["Binance"]))
+    return {d["symbol"]: (ois.get(d["symbol"], np.nan), float(d["lastFundingRate"] or "nan"))
+            for d in idx}
+
+async def _bybit(pick):
+    js = await _get("Bybit", "https://api.bybit.com/v5/market/tickers", {"category": "linear"})
+    return {d["symbol"]: (float(d.get("openInterestValue") or "nan"),
+                          float(d.get("fundingRate") or "nan"))
+            for d in js["result"]["list"]}
+
+async def _okx(pick):
+    js = await _get("OKX", "https://www.okx.com/api/v5/public/open-interest",
+                    {"instType": "SWAP"})
+    ois = {d["instId"]: float(d.get("oiUsd") or "nan") for d in js.get("data", [])}
+
+    async def fr(s):
+        d = await _get("OKX", "https://www.okx.com/api/v5/public/funding-rate", {"instId": s})
+        return float(d["data"][0]["fundingRate"])
+    frs = await _each(fr, pick(PER_ROUND["OKX"]))
+    return {s: (v, frs.get(s, np.nan)) for s, v in ois.items()}
+
+async def _bitget(pick):
+    js = await _get("Bitget", "https://api.bitget.com/api/v2/mix/market/tickers",
+                    {"productType": "usdt-futures"})
+    return {d["symbol"]: (float(d["holdingAmount"]) * float(d["markPrice"]),
+                          float(d.get("fundingRate") or "nan"))
+            for d in js["data"]}
+
+async def _htx(pick):
+    oi, fr = await asyncio.gather(
+        _get("HTX", "https://api.hbdm.com/linear-swap-api/v1/swap_open_interest",
+             {"contract_type": "swap"}),
+        _get("HTX", "https://api.hbdm.com/linear-swap-api/v1/swap_batch_funding_rate"))
+    rates = {d["contract_code"]: float(d.get("funding_rate") or "nan") for d in fr["data"]}
+    return {d["contract_code"]: (float(d["value"]), rates.get(d["contract_code"], np.nan))
+            for d in oi["data"]}
+
+async def _kucoin(pick):
+    js = await _get("KuCoin", "https://api-futures.kucoin.com/api/v1/contracts/active")
+    return {d["symbol"]: (float(d.get("openInterest") or "nan") * d["multiplier"]
+                          * float(d.get("markPrice") or "nan"),
+                          float(d["fundingFeeRate"]) if d.get("fundingFeeRate") is not None
+                          else np.nan)
+            for d in js["data"]}
+
+_FETCHERS = {"Binance": _binance, "Bybit": _bybit, "OKX": _okx,
+             "Bitget": _bitget, "HTX": _htx, "KuCoin": _kucoin}
+
+
+# ........................ depolama
+class SeriesStore:
+    """Per-exchange ring of (time × symbol) float32 OI/funding matrices."""
+
+    def __init__(self, slots: int = SLOTS):
+        self.slots = slots
+        self.times = np.zeros(slots, np.int64)
+        self.cols: dict = {}                              # sym → sütun
+        self.oi = np.full((slots, 0), np.nan, np.float32)
+        self.funding = np.full((slots, 0), np.nan, np.float32)
+        self.last_oi = np.full(0, np.nan, np.float32)      # sütun başına son geçerli değer
+        self.last_funding = np.full(0, np.nan, np.float32)
+        self.pos = self.count = 0
+
+    def _grow(self, syms):
+        new = [s for s in syms if s not in self.cols]
+        if not new:
+            return
+        for s in new:
+            self.cols[s] = len(self.cols)
+        pad = ((0, 0), (0, len(new)))
+        self.oi = np.pad(self.oi, pad, constant_values=np.nan)
+        self.funding = np.pad(self.funding, pad, constant_values=np.nan)
+        self.last_oi = np.pad(self.last_oi, (0, len(new)), constant_values=np.nan)
+        self.last_funding = np.pad(self.last_funding, (0, len(new)), constant_values=np.nan)
+
+    def append(self, ts: int, rows: dict):
+        self._grow(rows)
+        p = self.pos
+        self.times[p] = ts
+        self.oi[p] = self.funding[p] = np.nan
+        if rows:
+            idx = np.fromiter((self.cols[s] for s in rows), np.int64, len(rows))
+            vals = np.array(list(rows.values()), np.float32).reshape(-1, 2)
+            self.oi[p, idx], self.funding[p, idx] = vals[:, 0], vals[:, 1]
+            for src, last in ((self.oi[p], self.last_oi), (self.funding[p], self.last_funding)):
+                ok = np.isfinite(src)
+                last[ok] = src[ok]
+        self.pos = (p + 1) % self.slots
+        self.count = min(self.count + 1, self.slots)
+
+    def series(self, symbol: str):
+        """(zamanlar sn, oi_usd, funding) – eski → yeni (kopya); sembol yoksa None."""
+        c = self.cols.get(symbol)
+        if c is None:
+            return None
+        idx = np.arange(self.pos - self.count, self.pos) % self.slots
+        return self.times[idx], self.oi[idx, c], self.funding[idx, c]
+
+    def latest(self, symbol: str):
+        c = self.cols.get(symbol)
+        return (None, None) if c is None else (float(self.last_oi[c]), float(self.last_funding[c]))
+
+    def ranked(self, field: str = "oi", n: int = 10, reverse: bool = True):
+        """Son değerlere göre ilk `n` (sembol, değer)."""
+        last = self.last_oi if field == "oi" else self.last_funding
+        names = list(self.cols)
+        ok = np.flatnonzero(np.isfinite(last))
+        order = ok[np.argsort(last[ok])]
+        if reverse:
+            order = order[::-1]
+        return [(names[i], float(last[i])) for i in order[:n]]
+
+
+# ........................ zamanlayıcı
+class _Rotation:
+    """Toplu karşılığı olmayan uç noktalar için dönüşümlü sembol seçimi."""
+
+    def __init__(self):
+        self.symbols: list = []
+        self._set: set = set()
+        self.cursor = 0
+
+    def pick(self, watched, n):
+        first = [s for s in watched if s in self._set]
+        syms = self.symbols
+        if not syms:
+            return first
+        k = min(max(0, n - len(first)), len(syms))
+        out = [syms[(self.cursor + i) % len(syms)] for i in range(k)]
+        self.cursor = (self.cursor + k) % len(syms)
+        return first + [s for s in out if s not in first]
+
+    def update(self, symbols):
+        self.symbols = list(symbols)
+        self._set = set(symbols)
+
+
+class DerivPoller:
+    """One scheduler polling OI/funding for every exchange into SeriesStores."""
+
+    def __init__(self, exchanges=tuple(_FETCHERS), interval: int = INTERVAL):
+        self.exchanges, self.interval = exchanges, interval
+        self.stores = {ex: SeriesStore() for ex in exchanges}
+        self.watched = {ex: {} for ex in exchanges}         # ex → {sym: ref}
+        self._rot = {ex: _Rotation() for ex in exchanges}
+        self.refs = 0
+        self.task = None
+        self.rounds = 0
+        self._subs: list = []
+
+    def store(self, exchange: str) -> SeriesStore | None:
+        return self.stores.get(exchange)
+
+    # ........................ yaşam döngüsü
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def subscribe(self, cb):
+        self._subs.append(cb)
+
+    def unsubscribe(self, cb):
+        if cb in self._subs:
+            self._subs.remove(cb)
+
+    def watch(self, exchange: str, symbol: str):
+        w = self.watched.get(exchange)
+        if w is not None:
+            w[symbol] = w.get(symbol, 0) + 1
+
+    def unwatch(self, exchange: str, symbol: str):
+        w = self.watched.get(exchange, {})
+        if w.get(symbol, 0) > 1:
+            w[symbol] -= 1
+        else:
+            w.pop(symbol, None)
+
+    # ........................ turlar
+    async def _poll(self, exchange, ts):
+        syms = await fetch_symbols(exchange)
+        rot = self._rot[exchange]
+        rot.update(syms)
+        rows = await _FETCHERS[exchange](lambda n: rot.pick(self.watched[exchange], n))
+        known = set(syms)
+        self.stores[exchange].append(ts, {s: v for s, v in rows.items() if s in known})
+
+    async def poll_once(self):
+        ts = int(time.time()) // self.interval * self.interval
+        res = await asyncio.gather(*(self._poll(ex, ts) for ex in self.exchanges),
+                                   return_exceptions=True)
+        for ex, r in zip(self.exchanges, res):
+            if isinstance(r, Exception):
+                print(f"[WARN] derivs {ex}:", r)
+        self.rounds += 1
+        for cb in self._subs:
+            try:
+                cb()
+            except Exception as e:
+                print("[WARN] derivs subscriber:", e)
+
+    async def _run(self):
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.interval - time.time() % self.interval)
+
+
+_POLLER = None
+
+
+def open_derivs() -> DerivPoller:
+    global _POLLER
+    if _POLLER is None:
+        _POLLER = DerivPoller()
+        _POLLER.start()
+    _POLLER.refs += 1
+    return _POLLER
+
+
+def close_derivs(d: DerivPoller):
+    global _POLLER
+    d.refs -= 1
+    if d.refs <= 0 and _POLLER is d:
+        d.stop()
+        _POLLER = None
@@ -2,106 +2,247 @@
 helpers_header.py
 ──────────────────────────────────────────────
 • CoinMarketCap (mcap / arz / hacim) + CoinGecko (ATH / ATL) başlığı
+• İki kaynak eşzamanlı çekilir; aynı anda istenen coin’ler tek CMC isteğinde
+  (symbol=BTC,ETH,…) birleşir. CoinGecko tarafı piyasa değerine göre ilk
+  500 coin’i tek seferde alır: hem sembol→CoinGecko-id eşlemesi hem ATH/ATL
+  oradan gelir (ticker’ı id diye göndermek çoğu zaman boş dönüyordu).
+• Sınırlı TTL/LRU önbellek (core.cache); en çok bakılan coin’ler arka
+  planda önceden yenilenir → sembol değiştiren kullanıcılar kotayı yemez.
 • Dışa aktardığı öğeler:
-    - header_row  (Panel Row, doğrudan layout’a eklenir)
-    - update_header(symbol)  → header bilgilerini yeniler
+    - HeaderView(render=None)  (oturum başına; `.row` layout’a eklenir)
+    - await view.update(symbol, exchange=None) → header bilgilerini yeniler
+    - await header_data(symbol, exchange=None) → (coin, cmc dict, (ath, atl))
+• Coin adı core.symbols’ün kanonik eşlemesinden gelir (BTC-USDT-SWAP,
+  XBTUSDTM → BTC); liste önbellekte yoksa sembolden kaba tahmin yapılır.
 """
 
-import os, requests
-from datetime import datetime, timedelta
+import asyncio, os
+from collections import Counter
+
 import panel as pn
 from dotenv import load_dotenv
 load_dotenv()
 
+from core import metrics, rest
+from core.symbols import _ALIASES, canonical
+from core.cache import TTLCache
+
 # ── API Ayarları
 CMC_KEY   = os.getenv("CMC_KEY", "")
 CMC_URL   = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest"
 CG_MARKET = "https://api.coingecko.com/api/v3/coins/markets"
 
-# ── Pane’ler
-left_hdr  = pn.pane.Markdown()
-mid_hdr   = pn.pane.Markdown()
-right_hdr = pn.pane.Markdown()
-header_row = pn.Row(left_hdr, pn.Spacer(width=20),
-                    mid_hdr, pn.Spacer(), right_hdr)
+CMC_TTL, CG_TTL, MISS_TTL = 120, 900, 600     # sn; bulunamayan coin’ler de önbelleğe
+CG_PAGES        = 2                           # × 250 coin (piyasa değerine göre)
+PREFETCH_TOP    = 20
+PREFETCH_EVERY  = 60
 
 # ── Önbellek
-_cmc_cache = {}  # {coin: (timestamp, data_dict)}
+_CACHE  = TTLCache(maxsize=2_048, ttl=CMC_TTL)   # ("cmc", coin) / ("cg", COIN)
+metrics.watch_cache("header", _CACHE)
+HEADER_SECONDS = metrics.histogram("header_fetch_seconds", "header_data() incl. cache hits")
+_CG_IDS: dict = {}                               # "BTC" → "bitcoin"
+_VIEWS  = Counter()                              # coin → görüntülenme
+_cg_task = None
+_prefetch_task = None
 
 # ── Yardımcılar
 def _fmt(x, dec=0, unit=""):
     return f"{x:,.{dec}f}{unit}" if x else "—"
 
-def _base_coin(sym: str) -> str:
-    return sym.replace("USDT", "").replace("USDC", "")
+_QUOTES = ("USDTM", "USDT", "USDC", "USD")     # kaba tahmin için sondan atılanlar
 
-def _cmc_data(coin):
-    from datetime import datetime
-    now = datetime.utcnow()
-    if coin in _cmc_cache and now - _cmc_cache[coin][0] < timedelta(seconds=60):
-        return _cmc_cache[coin][1]
+def _base_coin(sym: str, exchange: str | None = None) -> str:
+    canon = canonical(exchange, sym) if exchange else None
+    if canon:
+        return canon.split("/")[0]
+    base = sym.replace("_", "-").split("-")[0]
+    for q in _QUOTES:
+        if base.endswith(q) and len(base) > len(q):
+            base = base[:-len(q)]
+            break
+    return _ALIASES.get(base, base)
 
-    hdr = {"X-CMC_PRO_API_KEY": CMC_KEY}
-    for sym in (coin, coin.lstrip("0123456789")):
-        r = requests.get(CMC_URL, params={"symbol": sym}, headers=hdr, timeout=8)
-        if r.status_code != 200:
-            continue
-        payload = r.json()["data"].get(sym)
+
+class _Batcher:
+    """Kısa bir pencerede istenen anahtarları tek `fetch_many` çağrısında toplar."""
+
+    def __init__(self, fetch_many, window: float = 0.05):
+        self.fetch_many, self.window = fetch_many, window
+        self._waiting: dict = {}                 # key → Future
+        self._task = None
+
+    def get(self, key):
+        fut = self._waiting.get(key)
+        if fut is None:
+            fut = self._waiting[key] = asyncio.get_running_loop().create_future()
+            if self._task is None:
+                self._task = asyncio.create_task(self._run())
+        return fut
+
+    async def _run(self):
+        await asyncio.sleep(self.window)
+        batch, self._waiting, self._task = self._waiting, {}, None
+        try:
+            res = await self.fetch_many(list(batch))
+        except Exception as e:
+            for f in batch.values():
+                if not f.done():
+                    f.set_exception(e)
+            return
+        for key, f in batch.items():
+            if not f.done():
+                f.set_result(res.get(key))
+
+
+# ── CoinMarketCap (toplu)
+async def _cmc_fetch_many(coins):
+    """{coin: data | {}}; '1000PEPE' gibi önekli adlar için rakamsız hali de sorulur."""
+    alt = {c: c.lstrip("0123456789") or c for c in coins}
+    js = await rest.get_json(CMC_URL, params={"symbol": ",".join(sorted({*coins, *alt.values()})),
+                                              "skip_invalid": "true"},
+                             headers={"X-CMC_PRO_API_KEY": CMC_KEY})
+    found = js.get("data") or {}
+    out = {}
+    for coin in coins:
+        payload = found.get(coin) or found.get(alt[coin])
         if not payload:
+            out[coin] = {}
+            _CACHE.set(("cmc", coin), {}, MISS_TTL)
             continue
         item = payload[0] if isinstance(payload, list) else payload
         q = item["quote"]["USD"]
-        data = dict(
+        out[coin] = data = dict(
             mcap=q.get("market_cap", 0),
             total=item.get("total_supply", 0),
             circul=item.get("circulating_supply", 0),
             max=item.get("max_supply", 0),
             vol24=q.get("volume_24h", 0),
         )
-        _cmc_cache[coin] = (now, data)
+        _CACHE.set(("cmc", coin), data, CMC_TTL)
+    return out
+
+_CMC_BATCH = _Batcher(_cmc_fetch_many)
+
+async def _cmc_data(coin):
+    data, fresh = _CACHE.lookup(("cmc", coin))
+    if fresh:
         return data
-    raise ValueError(f"{coin} CMC’de bulunamadı")
-
-def _cg_ath_atl(coin):
-    try:
-        r = requests.get(CG_MARKET, params={
-            "vs_currency": "usd", "ids": coin.lower()
-        }, timeout=6)
-        r.raise_for_status()
-        data = r.json()
-        if data:
-            return data[0]["ath"], data[0]["atl"]
-    except Exception:
-        pass
-    return None, None
-
-# ── Kamuya açık fonksiyon
-def update_header(symbol: str):
-    """
-    symbol = 'BTCUSDT', '1000PEPEUSDT' …
-    Pane içeriklerini günceller.
-    """
-    coin = _base_coin(symbol)
-    try:
-        cmc = _cmc_data(coin) if CMC_KEY else {}
-    except Exception as e:
-        cmc = {}
-        mid_hdr.object = f"*CMC hata: {e}*"
-
-    # CoinGecko her zaman
-    ath, atl = _cg_ath_atl(coin)
-
-    left_hdr.object = f"### **{coin}**"
-
-    mid_hdr.object = (
-        f"Piyasa Değeri: **{_fmt(cmc.get('mcap'), 0, '$')}** &nbsp;—&nbsp; "
-        f"Toplam Arz: **{_fmt(cmc.get('total'))}** &nbsp;—&nbsp; "
-        f"Dolaşımdaki Arz: **{_fmt(cmc.get('circul'))}** &nbsp;—&nbsp; "
-        f"Maks. Arz: **{_fmt(cmc.get('max'))}** &nbsp;—&nbsp; "
-        f"24 s Hacim: **{_fmt(cmc.get('vol24'), 0, '$')}**"
-    )
-
-    right_hdr.object = (
-        f"Tüm Zamanların En Düşük: **{_fmt(atl, 2, '$')}**  <br>"
-        f"Tüm Zamanların En Yüksek: **{_fmt(ath, 2, '$')}**"
-    )
+    data = await _CMC_BATCH.get(coin)
+    if not data:
+        raise ValueError(f"{coin} CMC’de bulunamadı")
+    return data
+
+# ── CoinGecko (ilk CG_PAGES×250 coin tek seferde)
+async def _cg_refresh():
+    pages = await asyncio.gather(*(rest.get_json(CG_MARKET, params={
+        "vs_currency": "usd", "order": "market_cap_desc",
+        "per_page": 250, "page": p}, timeout=6) for p in range(1, CG_PAGES + 1)))
+    ids = {}
+    for row in (r for page in pages for r in page):
+        sym = row["symbol"].upper()
+        if sym in ids:                       # aynı sembol: piyasa değeri büyük olan kalır
+            continue
+        ids[sym] = row["id"]
+        _CACHE.set(("cg", sym), (row.get("ath"), row.get("atl")), CG_TTL)
+    _CG_IDS.clear()
+    _CG_IDS.update(ids)
+
+def _start_cg_refresh():
+    global _cg_task
+    if _cg_task is None or _cg_task.done():
+        _cg_task = asyncio.create_task(_cg_refresh())
+    return _cg_task
+
+async def _cg_ath_atl(coin):
+    key = ("cg", coin.lstrip("0123456789") or coin)
+    value, fresh = _CACHE.lookup(key)
+    if fresh:
+        return value
+    if _CG_IDS and key[1] not in _CG_IDS:       # ilk CG_PAGES×250 içinde değil
+        return None, None
+    task = _start_cg_refresh()                  # bayat değer varsa arkada yenile
+    if value is None:
+        try:
+            await task
+        except Exception as e:
+            print("[WARN] CoinGecko:", e)
+        value = _CACHE.peek(key)
+    return value or (None, None)
+
+# ── Önceden yenileme
+async def _prefetch_loop():
+    while True:
+        await asyncio.sleep(PREFETCH_EVERY)
+        top = [c for c, _ in _VIEWS.most_common(PREFETCH_TOP)]
+        stale = [c for c in top if not _CACHE.get(("cmc", c))]
+        try:
+            if CMC_KEY and stale:
+                await _cmc_fetch_many(stale)
+            if any(_CACHE.get(("cg", c)) is None for c in top if c in _CG_IDS):
+                await _start_cg_refresh()
+        except Exception as e:
+            print("[WARN] header prefetch:", e)
+
+async def header_data(symbol: str, exchange: str | None = None):
+    """(coin, cmc, (ath, atl)) – iki kaynak eşzamanlı; CMC hatası istisna olarak döner."""
+    global _prefetch_task
+    if _prefetch_task is None:
+        _prefetch_task = asyncio.create_task(_prefetch_loop())
+    coin = _base_coin(symbol, exchange)
+    _VIEWS[coin] += 1
+    with HEADER_SECONDS.time():
+        cmc, cg = await asyncio.gather(_cmc_data(coin) if CMC_KEY else asyncio.sleep(0, {}),
+                                       _cg_ath_atl(coin), return_exceptions=True)
+    if isinstance(cg, BaseException):
+        cg = (None, None)
+    return coin, cmc, cg
+
+
+# ── Oturum başına başlık
+class HeaderView:
+    """Per-session header panes: coin name, CMC supply/volume, CoinGecko ATH/ATL."""
+
+    def __init__(self, render=None):
+        self.render = render
+        self._seq = 0                    # en son istenen update; eskilerin sonucu atılır
+        self.left_hdr  = pn.pane.Markdown()
+        self.mid_hdr   = pn.pane.Markdown()
+        self.right_hdr = pn.pane.Markdown()
+        self.row = pn.Row(self.left_hdr, pn.Spacer(width=20),
+                          self.mid_hdr, pn.Spacer(), self.right_hdr)
+
+    def _set(self, pane, text):
+        if self.render is not None:
+            self.render.set(pane, "object", text)
+        else:
+            pane.object = text
+
+    async def update(self, symbol: str, exchange: str | None = None):
+        """
+        symbol = 'BTCUSDT', '1000PEPEUSDT', 'BTC-USDT-SWAP' …
+        Pane içeriklerini günceller.
+        """
+        self._seq += 1
+        seq = self._seq
+        coin, cmc, (ath, atl) = await header_data(symbol, exchange)
+        if seq != self._seq:             # arada başka sembol seçildi
+            return
+
+        self._set(self.left_hdr, f"### **{coin}**")
+
+        if isinstance(cmc, BaseException):
+            self._set(self.mid_hdr, f"*CMC hata: {cmc}*")
+        else:
+            self._set(self.mid_hdr,
+                f"Piyasa Değeri: **{_fmt(cmc.get('mcap'), 0, '$')}** &nbsp;—&nbsp; "
+                f"Toplam Arz: **{_fmt(cmc.get('total'))}** &nbsp;—&nbsp; "
+                f"Dolaşımdaki Arz: **{_fmt(cmc.get('circul'))}** &nbsp;—&nbsp; "
+                f"Maks. Arz: **{_fmt(cmc.get('max'))}** &nbsp;—&nbsp; "
+                f"24 s Hacim: **{_fmt(cmc.get('vol24'), 0, '$')}**"
+            )
+
+        self._set(self.right_hdr,
+            f"Tüm Zamanların En Düşük: **{_fmt(atl, 2, '$')}**  <br>"
+            f"Tüm Zamanların En Yüksek: **{_fmt(ath, 2, '$')}**"
+        )
@@ -0,0 +1,184 @@
+# core/history.py
+"""
+Sayfalı, paralel derin geçmiş motoru (altı borsa).
+• İstenen [start, end) aralığı borsanın sayfa boyutuna göre pencerelere
+  bölünür; pencereler yeniden eskiye doğru, borsanın hız bütçesi içinde
+  eşzamanlı çekilir.
+• Sonuç zamana göre sıralanır, tekrarlar atılır ve tek bir bitişik sütun
+  dizisi döner: (epoch, open, high, low, close, vol).
+˓→  await fetch_klines(exchange, symbol, tf="1m", start=None, end=None, bars=None)
+˓→  await load_klines(...)  → aynı imza; önce disk deposu, ağdan sadece eksik kuyruk
+"""
+
+import asyncio, time
+import numpy as np
+
+from core import rest
+from core.candles import TF_SECONDS
+from core.candle_store import STORE, columns
+
+
+# ........................ borsa tarifleri
+def _rows_binance(js):
+    return [(k[0] // 1000, *k[1:6]) for k in js]
+
+def _rows_bybit(js):
+    return [(int(k[0]) // 1000, *k[1:6]) for k in js["result"]["list"]]
+
+def _rows_okx(js):
+    return [(int(k[0]) // 1000, *k[1:6]) for k in js.get("data", [])]
+
+def _rows_bitget(js):
+    return [(int(k[0]) // 1000, *k[1:6]) for k in js.get("data", [])]
+
+def _rows_htx(js):
+    return [(k["id"], k["open"], k["high"], k["low"], k["close"], k["amount"])
+            for k in js.get("data", [])]
+
+def _rows_kucoin(js):
+    return [(int(k[0]) // 1000, *k[1:6]) for k in js.get("data", [])]
+
+
+# url, sayfa boyutu, saniyede istek bütçesi, zaman dilimi kodları,
+# params(symbol, kod, start_s, end_s) ve cevap ayrıştırıcı
+_SPECS = {
+    "Binance": dict(
+        # ağırlık bütçesi: limit 1500 → istek başına 10, tavan 2400/dk;
+        # 3/s = 1800/dk, kalan pay exchangeInfo / derinlik görüntüleri için
+        url="https://fapi.binance.com/fapi/v1/klines", limit=1500, rate=3,
+        tf={"1m": "1m", "5m": "5m", "15m": "15m", "1h": "1h", "4h": "4h", "1d": "1d"},
+        params=lambda s, tf, a, b: {"symbol": s, "interval": tf, "limit": 1500,
+                                    "startTime": a * 1000, "endTime": b * 1000 - 1},
+        rows=_rows_binance),
+    "Bybit": dict(
+        url="https://api.bybit.com/v5/market/kline", limit=1000, rate=10,
+        tf={"1m": "1", "5m": "5", "15m": "15", "1h": "60", "4h": "240", "1d": "D"},
+        params=lambda s, tf, a, b: {"category": "linear", "symbol": s, "interval": tf,
+                                    "limit": 1000, "start": a * 1000, "end": b * 1000 - 1},
+        rows=_rows_bybit),
+    "OKX": dict(
+        url="https://www.okx.com/api/v5/market/history-candles", limit=100, rate=9,
+        tf={"1m": "1m", "5m": "5m", "15m": "15m", "1h": "1H", "4h": "4H", "1d": "1Dutc"},
+        # after → bu ts’den eski, before → bu ts’den yeni kayıtlar
+        params=lambda s, tf, a, b: {"instId": s, "bar": tf, "limit": 100,
+                                    "after": b * 1000, "before": a * 1000 - 1},
+        rows=_rows_okx),
+    "Bitget": dict(
+        url="https://api.bitget.com/api/v2/mix/market/history-candles", limit=200, rate=9,
+        tf={"1m": "1m", "5m": "5m", "15m": "15m", "1h": "1H", "4h": "4H", "1d": "1Dutc"},
+        params=lambda s, tf, a, b: {"symbol": s, "productType": "usdt-futures",
+                                    "granularity": tf, "limit": 200,
+                                    "startTime": a * 1000, "endTime": b * 1000 - 1},
+        rows=_rows_bitget),
+    "HTX": dict(
+        url="https://api.hbdm.com/linear-swap-ex/market/history/kline", limit=2000, rate=4,
+        tf={"1m": "1min", "5m": "5min", "15m": "15min", "1h": "60min", "4h": "4hour", "1d": "1day"},
+        params=lambda s, tf, a, b: {"contract_code": s, "period": tf,
+                                    "from": a, "to": b - 1},
+        rows=_rows_htx),
+    "KuCoin": dict(
+        url="https://api-futures.kucoin.com/api/v1/kline/query", limit=200, rate=5,
+        tf={"1m": 1, "5m": 5, "15m": 15, "1h": 60, "4h": 240, "1d": 1440},
+        params=lambda s, tf, a, b: {"symbol": s, "granularity": tf,
+                                    "from": a * 1000, "to": b * 1000 - 1},
+        rows=_rows_kucoin),
+}
+_SPECS["Huobi"] = _SPECS["HTX"]
+
+_LIMITERS: dict = {}     # exchange → rest.RateLimiter
+
+
+def _limiter(exchange):
+    lim = _LIMITERS.get(exchange)
+    if lim is None:
+        lim = _LIMITERS[exchange] = rest.RateLimiter(_SPECS[exchange]["rate"])
+    return lim
+
+
+def _span(tf, start, end, bars):
+    sec = TF_SECONDS[tf]
+    end = int(end if end is not None else time.time())
+    end = end - end % sec + sec                         # oluşan barı da kapsa
+    if start is None:
+        start = end - (bars or 1_440) * sec
+    return start - start % sec, end
+
+
+def _empty():
+    return np.empty(0, np.int64), *(np.empty(0) for _ in range(5))
+
+
+def merge(rows) -> tuple:
+    """Satırları (epoch,o,h,l,c,v) sütunlarına çevir, sırala, tekrarları at."""
+    if not rows:
+        return _empty()
+    a = np.array(rows, dtype=float).reshape(-1, 6)
+    epoch = a[:, 0].astype(np.int64)
+    order = np.argsort(epoch, kind="stable")
+    keep = np.r_[epoch[order][1:] != epoch[order][:-1], True]
+    a = a[order[keep]]
+    return (epoch[order[keep]], *(a[:, i].copy() for i in range(1, 6)))
+
+
+async def _page(exchange, symbol, tf, a, b):
+    spec = _SPECS[exchange]
+    await _limiter(exchange).acquire()
+    js = await rest.get_json(spec["url"], params=spec["params"](symbol, spec["tf"][tf], a, b))
+    return spec["rows"](js)
+
+
+async def fetch_klines(exchange: str, symbol: str, tf: str = "1m",
+                       start: int | None = None, end: int | None = None,
+                       bars: int | None = None) -> tuple:
+    """[start, end) aralığındaki (saniye) barları sayfalı ve paralel çek.
+
+    `start` verilmezse `end`’den geriye `bars` (varsayılan 1440) bar alınır.
+    Dönen değer epoch’a göre sıralı, tekrarsız 6 sütunluk NumPy dizileridir.
+    """
+    spec = _SPECS.get(exchange)
+    if spec is None:
+        raise ValueError(f"Unsupported exchange for history fetch: {exchange}")
+    sec = TF_SECONDS[tf]
+    start, end = _span(tf, start, end, bars)
+
+    step = spec["limit"] * sec
+    windows = [(max(start, b - step), b) for b in range(end, start, -step)]   # yeni → eski
+    pages = await asyncio.gather(*(_page(exchange, symbol, tf, a, b) for a, b in windows))
+    rows = [r for page in pages for r in page if start <= r[0] < end]
+    return merge(rows)
+
+
+async def load_klines(exchange: str, symbol: str, tf: str = "1m",
+                      start: int | None = None, end: int | None = None,
+                      bars: int | None = None, store=STORE) -> tuple:
+    """fetch_klines ile aynı sonuç; depoda olan kısım memmap’ten okunur,
+    borsadan sadece eksik kuyruk (ya da depodan eski baş kısım) istenir.
+    Kapanmış barlar depoya yazılır; ağ hatasında depodaki veri döner.
+    Dönen sütunlar kopyadır: memmap tutulmaz (Windows’ta eşlenmiş dosya
+    put/os.replace ile değiştirilemez)."""
+    if store is None:
+        return await fetch_klines(exchange, symbol, tf, start, end, bars)
+    sec = TF_SECONDS[tf]
+    start, end = _span(tf, start, end, bars)
+    have = store.read(exchange, symbol, tf)
+    stored = len(have)
+    if stored and have["epoch"][0] <= start:
+        a = max(start, int(have["epoch"][-1]) + sec)    # sadece kuyruk
+    else:
+        a = start                                       # depo boş / yetersiz
+    del have                                            # put dosyayı değiştirmeden eşlemeyi bırak
+    try:
+        fresh = await fetch_klines(exchange, symbol, tf, start=a, end=end - 1)
+    except Exception as e:
+        if not stored:
+            raise
+        print(f"[WARN] REST tail fail {exchange} {symbol} {tf} → {e} (disk deposu)")
+        fresh = _empty()
+    closed = fresh[0] + sec <= time.time()
+    store.put(exchange, symbol, tf, tuple(c[closed] for c in fresh))
+
+    rec = np.array(store.read(exchange, symbol, tf, start, end))
+    tail = fresh[0] > (rec["epoch"][-1] if len(rec) else start - 1)
+    if not tail.any():
+        return columns(rec)
+    return tuple(np.concatenate([c, f[tail]]) for c, f in zip(columns(rec), fresh))
@@ -0,0 +1,248 @@
+# core/liquidations.py
+"""
+Likidasyon akışı + kayan pencere toplayıcıları.
+• Akışlar core.ws_mux’un "liquidations" kanalından gelir (soketler paylaşılır):
+    Binance  <sym>@forceOrder
+    Bybit    allLiquidation.<sym>
+    OKX      liquidation-orders:SWAP (borsa geneli; sembol burada süzülür,
+             sz kontrat → ctVal ile coin miktarına çevrilir)
+• Ham olaylar sabit kapasiteli sütun tamponuna yazılır (RingBuffer).
+• Pencereler (1m/5m/1h) saniyelik kovalardan oluşan tek bir halka üzerinde
+  koşan toplamlardır: olay ekleme O(1), pencere kaydırma saniye başına O(1)
+  (çıkan kova toplamdan düşülür). Olay hızı ne olursa olsun bellek ve iş sabit.
+• Pencere başına en büyük likidasyon, monoton azalan bir deque ile tutulur
+  (kayan maksimum, amortize O(1)).
+• Geç gelen olaylar güncel saniyeye sayılır (hata ≤ iletim gecikmesi).
+˓→  lf = open_liquidations(exchange, symbol); lf.subscribe(cb); lf.stats() / close_liquidations(lf)
+"""
+
+import asyncio, time
+from collections import deque
+
+from core import rest, ws_mux
+from core.ringbuffer import RingBuffer
+
+LONG, SHORT = 1, -1                  # likide olan pozisyon yönü
+LIQ_COLUMNS = (("ts", "f8"), ("price", "f8"), ("qty", "f8"),
+               ("notional", "f8"), ("side", "i1"))
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3_600}
+
+_OKX_CT: dict = {}                   # instId → ctVal
+_okx_ct_task = None
+
+
+# ........................ çözücüler → (ts, sembol, fiyat, miktar, yön) sütunları
+def liq_binance(m):
+    d = m.get("data", m)
+    if d.get("e") != "forceOrder":
+        return None
+    o = d["o"]
+    px, qty = float(o["ap"]) or float(o["p"]), float(o["z"]) or float(o["q"])
+    return [o["T"] / 1000], [o["s"]], [px], [qty], [LONG if o["S"] == "SELL" else SHORT]
+
+def liq_bybit(m):
+    if not m.get("topic", "").startswith("allLiquidation."):
+        return None
+    data = m["data"]
+    # S: likide olan pozisyon (Buy = long)
+    return ([d["T"] / 1000 for d in data], [d["s"] for d in data],
+            [float(d["p"]) for d in data], [float(d["v"]) for d in data],
+            [LONG if d["S"] == "Buy" else SHORT for d in data])
+
+def liq_okx(m):
+    if m.get("arg", {}).get("channel") != "liquidation-orders" or "data" not in m:
+        return None
+    ts, sym, px, qty, side = [], [], [], [], []
+    for d in m["data"]:
+        ct = _OKX_CT.get(d["instId"], 1.0)
+        for x in d["details"]:
+            ts.append(int(x["ts"]) / 1000)
+            sym.append(d["instId"])
+            px.append(float(x["bkPx"]))
+            qty.append(float(x["sz"]) * ct)
+            side.append(LONG if x.get("posSide") == "long" or x["side"] == "sell" else SHORT)
+    return (ts, sym, px, qty, side) if ts else None
+
+ws_mux.CHANNELS["liquidations"] = {
+    "Binance": (lambda s: f"{s.lower()}@forceOrder", liq_binance, None),
+    "Bybit":   (lambda s: f"allLiquidation.{s}",    liq_bybit,   None),
+    "OKX":     (lambda s: "liquidation-orders:SWAP", liq_okx,    None),
+}
+
+
+async def _load_okx_contracts():
+    js = await rest.get_json("https://www.okx.com/api/v5/public/instruments",
+                             params={"instType": "SWAP"}, timeout=5)
+    _OKX_CT.update({i["instId"]: float(i["ctVal"]) for i in js.get("data", [])})
+
+
+def _start_okx_contracts():
+    global _okx_ct_task
+    if not _OKX_CT and (_okx_ct_task is None or _okx_ct_task.done()):
+        _okx_ct_task = asyncio.create_task(_load_okx_contracts())
+
+
+# ........................ kayan pencereler
+class LiqWindows:
+    """Sliding long/short notional sums and max print over per-second buckets."""
+
+    def __init__(self, windows=WINDOWS):
+        self.spans = dict(windows)
+        self.size = max(self.spans.values())
+        self.buckets = [None] * self.size               # saniye kovası: [long, short, n_long, n_short]
+        self.sums = {w: [0.0, 0.0, 0, 0] for w in self.spans}
+        self.peaks = {w: deque() for w in self.spans}   # (saniye, notional, yön, fiyat, ts)
+        self.sec = None                                  # güncel saniye
+
+    def advance(self, now: float) -> bool:
+        """Pencereleri `now`a kaydır; bir toplam değiştiyse True."""
+        sec = int(now)
+        if self.sec is None:
+            self.sec = sec
+            return False
+        if sec <= self.sec:
+            return False
+        changed = False
+        if sec - self.sec >= self.size:                  # uzun sessizlik: hepsi düşer
+            changed = any(s[2] or s[3] for s in self.sums.values())
+            self.buckets = [None] * self.size
+            self.sums = {w: [0.0, 0.0, 0, 0] for w in self.spans}
+        else:
+            buckets, size = self.buckets, self.size
+            for t in range(self.sec + 1, sec + 1):
+                for w, span in self.spans.items():
+                    out = buckets[(t - span) % size]
+                    if out is not None:
+                        s = self.sums[w]
+                        if s[2] + s[3] == out[2] + out[3]:  # boşalan pencere: kayan toplam sıfırlanır
+                            s[:] = 0.0, 0.0, 0, 0
+                        else:
+                            s[0] -= out[0]; s[1] -= out[1]; s[2] -= out[2]; s[3] -= out[3]
+                        changed = True
+                buckets[t % size] = None
+        self.sec = sec
+        for w, q in self.peaks.items():
+            while q and q[0][0] <= sec - self.spans[w]:
+                q.popleft()
+                changed = True
+        return changed
+
+    def add(self, ts: float, notional: float, side: int, price: float):
+        self.advance(ts)
+        sec = self.sec
+        i = 0 if side == LONG else 1
+        b = self.buckets[sec % self.size]
+        if b is None:
+            b = self.buckets[sec % self.size] = [0.0, 0.0, 0, 0]
+        b[i] += notional
+        b[i + 2] += 1
+        for w, s in self.sums.items():
+            s[i] += notional
+            s[i + 2] += 1
+            q = self.peaks[w]
+            while q and q[-1][1] <= notional:
+                q.pop()
+            q.append((sec, notional, side, price, ts))
+
+    def stats(self) -> dict:
+        """{pencere: dict(long, short, n_long, n_short, peak)} – hazır toplamlar."""
+        out = {}
+        for w, (lo, sh, nl, ns) in self.sums.items():
+            q = self.peaks[w]
+            out[w] = dict(long=max(lo, 0.0), short=max(sh, 0.0), n_long=nl, n_short=ns,
+                          peak=q[0][1:] if q else None)
+        return out
+
+
+# ........................ akış
+class LiqFeed:
+    """Liquidation stream of one exchange/symbol with rolling aggregates."""
+
+    def __init__(self, exchange: str, symbol: str, capacity: int = 4_096):
+        self.exchange, self.symbol = exchange, symbol
+        self.events = RingBuffer(capacity, LIQ_COLUMNS)
+        self.windows = LiqWindows()
+        self.refs = 0
+        self.task = None
+        self._subs: list = []
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol
+
+    # ........................ yaşam döngüsü
+    def start(self):
+        if not supports(self.exchange):
+            raise ValueError(f"No liquidation stream for exchange: {self.exchange}")
+        if self.exchange == "OKX":
+            _start_okx_contracts()
+        ws_mux.subscribe(self.exchange, self.symbol, self.on_liq, channel="liquidations")
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        ws_mux.unsubscribe(self.exchange, self.symbol, self.on_liq, channel="liquidations")
+        if self.task is not None:
+            self.task.cancel()
+
+    def subscribe(self, cb):
+        self._subs.append(cb)
+
+    def unsubscribe(self, cb):
+        if cb in self._subs:
+            self._subs.remove(cb)
+
+    def _notify(self):
+        for cb in self._subs:
+            try:
+                cb()
+            except Exception as e:
+                print("[WARN] liquidation subscriber:", e)
+
+    async def _run(self):
+        """Olay gelmese de pencereler kaysın (saniyede bir)."""
+        while True:
+            await asyncio.sleep(1 - time.time() % 1)
+            if self.windows.advance(time.time()):
+                self._notify()
+
+    # ........................ olaylar
+    def on_liq(self, ts, syms, px, qty, side):
+        if any(s != self.symbol for s in syms):          # borsa geneli kanal
+            keep = [i for i, s in enumerate(syms) if s == self.symbol]
+            if not keep:
+                return
+            ts, px, qty, side = ([c[i] for i in keep] for c in (ts, px, qty, side))
+        notional = [p * q for p, q in zip(px, qty)]
+        self.events.extend_columns(ts, px, qty, notional, side)
+        add = self.windows.add
+        for t, n, s, p in zip(ts, notional, side, px):
+            add(t, n, s, p)
+        self._notify()
+
+    def stats(self) -> dict:
+        self.windows.advance(time.time())
+        return self.windows.stats()
+
+
+def supports(exchange: str) -> bool:
+    return ws_mux.supports(exchange, "liquidations")
+
+
+_FEEDS: dict = {}
+
+
+def open_liquidations(exchange: str, symbol: str) -> LiqFeed:
+    lf = _FEEDS.get((exchange, symbol))
+    if lf is None:
+        lf = LiqFeed(exchange, symbol)
+        lf.start()
+        _FEEDS[lf.key] = lf
+    lf.refs += 1
+    return lf
+
+
+def close_liquidations(lf: LiqFeed):
+    lf.refs -= 1
+    if lf.refs <= 0 and _FEEDS.get(lf.key) is lf:
+        lf.stop()
+        del _FEEDS[lf.key]
@@ -1,48 +1,35 @@
 # --- core/lwc_history.py -------------------------------------------------
 """
-REST'ten (Binance / Bybit) istediğin zaman diliminde en fazla 1000 mum
-çekip Lightweight Charts için dizi üretir.
-˓→  get_klines(exchange, symbol, interval) → list[dict]
+REST'ten (altı borsa) istediğin zaman diliminde mum çekip Lightweight
+Charts için dizi üretir. Sayfalama/paralellik core.history’dedir; `start`
+verilirse o tarihe kadar geriye (haftalarca) gidilebilir; depoda olan
+kısım diskten (memmap) okunur. views.chart, Feed tamponunun (1440 × 1m)
+yetmediği üst dilimlerde eski barları `get_history` ile buradan tamamlar.
+˓→  await get_klines(exchange, symbol, interval, bars=1000, start=None, end=None)
+      → list[dict]
+˓→  await get_history(...) → (epoch, o, h, l, c, v) sütunları (hatada boş)
 """
 
-import time, requests
+from core import history
 
 INT_MAP = {"1m":"1m", "5m":"5m", "15m":"15m", "1h":"1h", "4h":"4h", "1d":"1d"}
 
-def _binance(symbol:str, interval:str):
-    url = "https://fapi.binance.com/fapi/v1/klines"
-    r = requests.get(url, params={"symbol":symbol, "interval":interval,
-                                  "limit":1000}, timeout=8)
-    r.raise_for_status()
-    return [{
-        "time": k[0]//1000,
-        "open": float(k[1]), "high": float(k[2]),
-        "low":  float(k[3]), "close":float(k[4])
-    } for k in r.json()]
+def to_lwc(cols):
+    """(epoch, o, h, l, c, v) sütunları → Lightweight Charts bar listesi."""
+    epoch, o, h, l, c, _ = cols
+    return [{"time": t, "open": a, "high": b, "low": d, "close": e}
+            for t, a, b, d, e in zip(epoch.tolist(), o.tolist(), h.tolist(),
+                                     l.tolist(), c.tolist())]
 
-def _bybit(symbol: str, interval: str):
-    url = "https://api.bybit.com/v5/market/kline"      # ← tek satır değişti
-    r = requests.get(url, params={
-        "category": "linear",
-        "symbol":   symbol,
-        "interval": INT_MAP[interval],
-        "limit":    1000
-    }, timeout=8)
-    r.raise_for_status()
-    out = []
-    for k in reversed(r.json()["result"]["list"]):        # old → new
-        out.append({
-            "time":  int(k[0]) // 1000,
-            "open":  float(k[1]),
-            "high":  float(k[2]),
-            "low":   float(k[3]),
-            "close": float(k[4])
-        })
-    return out
-
-def get_klines(exchange:str, symbol:str, interval:str):
+async def get_history(exchange:str, symbol:str, interval:str,
+                      bars:int=1000, start:int|None=None, end:int|None=None):
     try:
-        return _binance(symbol, interval) if exchange=="Binance" else _bybit(symbol, interval)
+        return await history.load_klines(exchange, symbol, INT_MAP[interval],
+                                         start=start, end=end, bars=bars)
     except Exception as e:
         print(f"[WARN] REST history fail → {e} (live WS ile devam)")
-        return []
+        return history.merge([])
+
+async def get_klines(exchange:str, symbol:str, interval:str,
+                     bars:int=1000, start:int|None=None, end:int|None=None):
+    return to_lwc(await get_history(exchange, symbol, interval, bars, start, end))
@@ -0,0 +1,340 @@
+# core/metrics.py
+"""
+Süreç içi ölçümler ve Prometheus metin formatında `/metrics` ucu.
+• Counter / Gauge / Histogram: kilitsiz, bağımlılıksız; histogram sabit
+  kovalı (bisect + liste artırımı), etiketli çocuklar bir kez alınıp
+  saklanır → sıcak yolda sözlük araması yok.
+• Gauge’lar `fn` ile kazıma anında hesaplanabilir (oturum sayısı, önbellek
+  isabet oranı, bekleyen yama sayısı …).
+• Olay döngüsü gecikmesi: `start()` ile başlayan görev `LAG_EVERY` sn uyur,
+  fazla uyuma süresini histograma yazar; oturum başına güncelleme hızı da
+  aynı görevde örneklenir.
+• `/metrics` ayrı bir tornado sunucusunda, `METRICS_PORT`ta (varsayılan 5007,
+  panel serve’ün 5006’sının yanında; "off" kapatır). Ölçümler süreç başınadır:
+  `panel serve --num-procs N` ile çatallanan i. worker METRICS_PORT + i’de
+  dinler (tornado task_id), her biri ayrı bir kazıma hedefidir.
+• İsteğe bağlı örnekleyici profil: METRICS_PROFILE=1 ise
+  `/profile?seconds=10&hz=100` ana iş parçacığının yığınlarını örnekler ve
+  flamegraph’a hazır "a;b;c sayı" satırları döndürür (kapalıyken 404).
+˓→  X = metrics.histogram("ad", "açıklama", ("exchange",)).labels("Binance");  X.observe(s)
+˓→  metrics.start()   (idempotent; dashboard.py / ingest.py)
+˓→  metrics.render() → str   (Prometheus exposition)
+"""
+
+import asyncio, os, sys, threading, time, weakref
+from bisect import bisect_left
+from collections import Counter as _Tally
+
+# saniye cinsinden kovalar: 10 µs … 10 s (çözme süresinden REST gecikmesine)
+TIME_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_EVERY = 0.5                        # olay döngüsü gecikmesi örnekleme aralığı, sn
+RATE_EVERY = 10.0                      # oturum güncelleme hızı örnekleme aralığı, sn
+
+_port = os.getenv("METRICS_PORT", "5007")
+PORT = None if _port.lower() == "off" else int(_port)
+PROFILE = os.getenv("METRICS_PROFILE", "") not in ("", "0")
+
+
+# ........................ ölçüm türleri
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, doc, labels=()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labels)
+        self._children: dict = {}
+        if not self.labelnames:
+            self._children[()] = self._child()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._child()
+        return child
+
+    def __getattr__(self, attr):                        # etiketsiz ölçümde kısayol
+        if attr.startswith("_") or self.labelnames:
+            raise AttributeError(attr)
+        return getattr(self._children[()], attr)
+
+    def _label_str(self, key, extra=""):
+        parts = [f'{n}="{v}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def expose(self):
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            out += self._lines(key, child)
+        return out
+
+
+class _Value:
+    __slots__ = ("value", "fn")
+
+    def __init__(self):
+        self.value, self.fn = 0.0, None
+
+    def inc(self, n=1):
+        self.value += n
+
+    def dec(self, n=1):
+        self.value -= n
+
+    def set(self, v):
+        self.value = v
+
+    def set_function(self, fn):
+        """Değer kazıma anında `fn()` ile okunur."""
+        self.fn = fn
+
+    def get(self):
+        if self.fn is None:
+            return self.value
+        try:
+            return float(self.fn())
+        except Exception:
+            return float("nan")
+
+
+class CounterMetric(_Metric):
+    """Monotonic counter."""
+
+    kind = "counter"
+    _child = _Value
+
+    def _lines(self, key, child):
+        return [f"{self.name}{self._label_str(key)} {child.get():g}"]
+
+
+class GaugeMetric(CounterMetric):
+    """Value that can go up and down (or be computed at scrape time)."""
+
+    kind = "gauge"
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)           # son kova: +Inf
+        self.sum = 0.0
+
+    def observe(self, v):
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v
+
+    def observe_ns(self, ns):
+        self.observe(ns * 1e-9)
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("h", "t")
+
+    def __init__(self, h):
+        self.h = h
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.h.observe(time.perf_counter() - self.t)
+
+
+class HistogramMetric(_Metric):
+    """Fixed-bucket histogram (non-cumulative counts, cumulated on scrape)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=TIME_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, doc, labels)
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def _lines(self, key, child):
+        out, acc = [], 0
+        counts = list(child.counts)
+        for le, n in zip(self.buckets + ("+Inf",), counts):
+            acc += n
+            le = 'le="%s"' % le
+            out.append(f"{self.name}_bucket{self._label_str(key, le)} {acc}")
+        out.append(f"{self.name}_sum{self._label_str(key)} {child.sum:g}")
+        out.append(f"{self.name}_count{self._label_str(key)} {acc}")
+        return out
+
+
+REGISTRY: dict = {}                    # ad → ölçüm (aynı adla ikinci kayıt mevcut olanı döndürür)
+
+
+def _register(cls, name, doc, labels=(), **kw):
+    m = REGISTRY.get(name)
+    if m is None:
+        m = REGISTRY[name] = cls(name, doc, labels, **kw)
+    return m
+
+
+def counter(name, doc, labels=()):
+    return _register(CounterMetric, name, doc, labels)
+
+
+def gauge(name, doc, labels=()):
+    return _register(GaugeMetric, name, doc, labels)
+
+
+def histogram(name, doc, labels=(), buckets=TIME_BUCKETS):
+    return _register(HistogramMetric, name, doc, labels, buckets=buckets)
+
+
+def render() -> str:
+    lines = []
+    for m in list(REGISTRY.values()):
+        lines += m.expose()
+    return "\n".join(lines) + "\n"
+
+
+# ........................ önbellekler ve oturumlar
+_CACHES: dict = {}                     # ad → TTLCache
+_SESSIONS = weakref.WeakSet()          # canlı RenderScheduler’lar
+
+CACHE_HITS = counter("cache_hits_total", "TTL cache fresh lookups", ("cache",))
+CACHE_MISSES = counter("cache_misses_total", "TTL cache misses and stale lookups", ("cache",))
+CACHE_HIT_RATIO = gauge("cache_hit_ratio", "Fresh lookups / all lookups", ("cache",))
+SESSIONS = gauge("panel_sessions", "Live Panel sessions (render schedulers)")
+SESSION_RATE = histogram("panel_session_updates_per_second",
+                         "Per-session model updates per second, sampled every 10 s",
+                         buckets=(0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+LOOP_LAG = histogram("event_loop_lag_seconds", "Oversleep of a periodic loop timer")
+SESSIONS.set_function(lambda: len(_SESSIONS))
+
+
+def watch_cache(name: str, cache):
+    """TTLCache’in hits/misses sayaçlarını kazıma anında yayınla."""
+    _CACHES[name] = cache
+    CACHE_HITS.labels(name).set_function(lambda: cache.hits)
+    CACHE_MISSES.labels(name).set_function(lambda: cache.misses)
+    CACHE_HIT_RATIO.labels(name).set_function(
+        lambda: cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0)
+
+
+def watch_session(render):
+    _SESSIONS.add(render)
+
+
+def sessions():
+    return list(_SESSIONS)
+
+
+async def _monitor():
+    last_rate = time.monotonic()
+    sent = weakref.WeakKeyDictionary()
+    while True:
+        t = time.monotonic()
+        await asyncio.sleep(LAG_EVERY)
+        now = time.monotonic()
+        LOOP_LAG.observe(max(0.0, now - t - LAG_EVERY))
+        if now - last_rate >= RATE_EVERY:
+            for r in sessions():
+                SESSION_RATE.observe((r.sent - sent.get(r, r.sent)) / (now - last_rate))
+                sent[r] = r.sent
+            last_rate = now
+
+
+# ........................ örnekleyici profil
+class Sampler:
+    """Samples one thread's Python stack at `hz`; collapsed-stack output."""
+
+    lock = threading.Lock()            # aynı anda tek profil
+
+    def __init__(self, thread_id=None, hz: float = 100):
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.every = 1 / hz
+        self.stacks = _Tally()
+        self.samples = 0
+
+    def _stack(self, frame):
+        out = []
+        while frame is not None:
+            code = frame.f_code
+            out.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(out))
+
+    def run(self, seconds: float):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._stack(frame)] += 1
+                self.samples += 1
+            time.sleep(self.every)
+        return self
+
+    def collapsed(self) -> str:
+        return "".join(f"{s} {n}\n" for s, n in self.stacks.most_common())
+
+
+# ........................ HTTP uç
+_SERVER = None
+_STARTED = False                       # başarısız bağlanma da hatırlanır (tekrar denenmez)
+
+
+def _process_port():
+    """Çatallanmış worker’larda METRICS_PORT + task_id; tek süreçte METRICS_PORT."""
+    from tornado.process import task_id
+    return PORT + (task_id() or 0)
+
+
+def start(port=None):
+    """`/metrics` (ve açıksa `/profile`) sunucusunu ve döngü izleyicisini kur.
+    Süreç başına yalnızca ilk çağrı iş yapar; sonrakiler ilk sonucu döndürür."""
+    global _SERVER, _STARTED
+    if _STARTED:
+        return _SERVER
+    _STARTED = True
+    if port is None:
+        port = None if PORT is None else _process_port()
+    if port is None:
+        return None
+    import tornado.web
+    from tornado.ioloop import IOLoop
+
+    class MetricsHandler(tornado.web.RequestHandler):
+        def get(self):
+            self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.write(render())
+
+    class ProfileHandler(tornado.web.RequestHandler):
+        async def get(self):
+            if not PROFILE:
+                raise tornado.web.HTTPError(404)
+            seconds = min(float(self.get_argument("seconds", "10")), 120)
+            hz = min(float(self.get_argument("hz", "100")), 1_000)
+            if not Sampler.lock.acquire(blocking=False):
+                raise tornado.web.HTTPError(409, "profile already running")
+            try:
+                s = Sampler(threading.get_ident(), hz)    # bu uç döngü iş parçacığında
+                await asyncio.get_running_loop().run_in_executor(None, s.run, seconds)
+            finally:
+                Sampler.lock.release()
+            self.set_header("Content-Type", "text/plain; charset=utf-8")
+            self.write(f"# {s.samples} samples, {seconds:g}s @ {hz:g} Hz\n" + s.collapsed())
+
+    app = tornado.web.Application([(r"/metrics", MetricsHandler),
+                                   (r"/profile", ProfileHandler)])
+    try:
+        _SERVER = app.listen(port)
+    except OSError as e:
+        print(f"[WARN] metrics port {port}: {e} (ölçümler bu süreçte yayınlanmıyor)")
+        return None
+    IOLoop.current().add_callback(lambda: asyncio.ensure_future(_monitor()))
+    print(f"[METRICS] http://localhost:{port}/metrics"
+          + ("  (profile: /profile?seconds=10)" if PROFILE else ""))
+    return _SERVER
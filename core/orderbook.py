@@ -0,0 +1,275 @@
+# core/orderbook.py
+"""
+Artımlı L2 emir defteri motoru.
+• Her taraf sıralı fiyat listesi + fiyat → miktar sözlüğüdür. Miktar değişimi
+  O(1) (sözlük); yeni/silinen seviye bisect ile bulunur, list.insert/del ile
+  O(n) kaydırılır – 1000 seviyede bu tek bir memmove’dur (µs altı) ve bir
+  ağaç yapısının Python düzeyindeki sabit maliyetinden ucuzdur. Alışlar
+  negatif fiyatla saklanır, böylece iki tarafta da indeks 0 en iyi seviyedir.
+• Diff akışları core.ws_mux’un "book" kanalından gelir:
+    Binance  <sym>@depth@100ms  + REST snapshot (lastUpdateId, U/u/pu zinciri)
+    Bybit    orderbook.200.<sym> (snapshot + delta)
+    OKX      books:<instId>      (snapshot + update, prevSeqId/seqId zinciri)
+• Zincir koparsa (ya da soket yeniden bağlanırsa) defter yeniden eşitlenir:
+  Binance’te REST snapshot + tamponlanmış olaylar, diğerlerinde yeniden abonelik.
+• Fiyat gruplaması (tick katları) `grouped()` ile en iyi seviyeden başlayarak
+  sadece gereken kadar seviye gezilerek yapılır.
+˓→  book = open_book(exchange, symbol); book.subscribe(cb); close_book(book)
+"""
+
+import asyncio, math
+from bisect import bisect_left
+
+from core import rest, ws_mux
+
+DEPTH_URL = "https://fapi.binance.com/fapi/v1/depth"
+
+
+# ........................ çözücüler → (tür, ilk id, son id, önceki id, bids, asks)
+def _levels(rows):
+    return [(float(r[0]), float(r[1])) for r in rows]
+
+def book_binance(m):
+    d = m.get("data", m)
+    if d.get("e") != "depthUpdate":
+        return None
+    return "delta", d["U"], d["u"], d.get("pu"), _levels(d["b"]), _levels(d["a"])
+
+def book_bybit(m):
+    if not m.get("topic", "").startswith("orderbook."):
+        return None
+    d = m["data"]
+    kind = "snapshot" if m.get("type") == "snapshot" or d.get("u") == 1 else "delta"
+    return kind, d["u"], d["u"], None, _levels(d["b"]), _levels(d["a"])
+
+def book_okx(m):
+    if m.get("arg", {}).get("channel") != "books" or "data" not in m:
+        return None
+    d = m["data"][0]
+    kind = "snapshot" if m.get("action") == "snapshot" else "delta"
+    prev = d.get("prevSeqId", -1)
+    return (kind, d["seqId"], d["seqId"], None if prev == -1 else prev,
+            _levels(d["bids"]), _levels(d["asks"]))
+
+ws_mux.CHANNELS["book"] = {
+    "Binance": (lambda s: f"{s.lower()}@depth@100ms", book_binance, None),
+    "Bybit":   (lambda s: f"orderbook.200.{s}",       book_bybit,   None),
+    "OKX":     (lambda s: f"books:{s}",               book_okx,     None),
+}
+REST_SNAPSHOT = {"Binance"}          # ilk durum REST’ten, akış yalnızca diff
+
+
+# ........................ defter
+class _Side:
+    """One side of the book: sorted keys + level map (O(n) level insert/delete)."""
+
+    __slots__ = ("sign", "keys", "qty")
+
+    def __init__(self, sign: int):
+        self.sign = sign                 # asks +1, bids -1 (anahtar = sign × fiyat)
+        self.keys: list = []
+        self.qty: dict = {}
+
+    def clear(self):
+        self.keys.clear()
+        self.qty.clear()
+
+    def set(self, price: float, qty: float):
+        k = self.sign * price
+        if qty == 0:
+            if self.qty.pop(k, None) is not None:
+                del self.keys[bisect_left(self.keys, k)]
+        else:
+            if k not in self.qty:
+                self.keys.insert(bisect_left(self.keys, k), k)
+            self.qty[k] = qty
+
+    def best(self):
+        return (self.sign * self.keys[0], self.qty[self.keys[0]]) if self.keys else None
+
+    def top(self, n: int):
+        return [(self.sign * k, self.qty[k]) for k in self.keys[:n]]
+
+    def grouped(self, step: float, n: int):
+        """En iyi seviyeden başlayarak `step` kovalarına toplanmış ilk `n` kova."""
+        out = []
+        rnd = max(0, -math.floor(math.log10(step))) + 2
+        edge = math.floor if self.sign < 0 else math.ceil
+        for k in self.keys:
+            p = self.sign * k
+            b = round(edge(p / step - 1e-9 * self.sign) * step, rnd)
+            if out and out[-1][0] == b:
+                out[-1][1] += self.qty[k]
+            elif len(out) == n:
+                break
+            else:
+                out.append([b, self.qty[k]])
+        return out
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class L2Book:
+    """Price-level order book with dict-speed size updates and cheap top-N."""
+
+    def __init__(self):
+        self.bids, self.asks = _Side(-1), _Side(1)
+        self.last_id = None
+
+    def load(self, bids, asks, last_id=None):
+        self.bids.clear()
+        self.asks.clear()
+        self.apply(bids, asks)
+        self.last_id = last_id
+
+    def apply(self, bids, asks):
+        for p, q in bids:
+            self.bids.set(p, q)
+        for p, q in asks:
+            self.asks.set(p, q)
+
+    def mid(self):
+        b, a = self.bids.best(), self.asks.best()
+        return (b[0] + a[0]) / 2 if b and a else None
+
+
+class BookFeed:
+    """Keeps one exchange/symbol L2Book in sync and notifies subscribers."""
+
+    def __init__(self, exchange: str, symbol: str, buffer: int = 1_000):
+        self.exchange, self.symbol = exchange, symbol
+        self.book = L2Book()
+        self.synced = False
+        self.refs = 0
+        self.updates = self.resyncs = 0
+        self._buf: list = []             # snapshot beklenirken gelen diff’ler
+        self._buf_max = buffer
+        self._snap_id = None             # REST snapshot sonrası ilk olay kontrolü
+        self._snap_task = None
+        self._subs: list = []
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol
+
+    # ........................ yaşam döngüsü
+    def start(self):
+        if self.exchange not in ws_mux.CHANNELS["book"]:
+            raise ValueError(f"No order book stream for exchange: {self.exchange}")
+        ws_mux.subscribe(self.exchange, self.symbol, self.on_msg, channel="book",
+                         on_gap=self.on_gap)
+        if self.exchange in REST_SNAPSHOT:
+            self._start_snapshot()
+
+    def stop(self):
+        ws_mux.unsubscribe(self.exchange, self.symbol, self.on_msg, channel="book",
+                           on_gap=self.on_gap)
+        if self._snap_task is not None:
+            self._snap_task.cancel()
+
+    def subscribe(self, cb):
+        self._subs.append(cb)
+
+    def unsubscribe(self, cb):
+        if cb in self._subs:
+            self._subs.remove(cb)
+
+    def _notify(self):
+        for cb in self._subs:
+            try:
+                cb()
+            except Exception as e:
+                print("[WARN] book subscriber:", e)
+
+    # ........................ eşitleme
+    def on_gap(self, since=None):
+        self.resync()
+
+    def resync(self):
+        self.synced = False
+        self.resyncs += 1
+        self._buf.clear()
+        if self.exchange in REST_SNAPSHOT:
+            self._start_snapshot()
+        else:
+            ws_mux.resubscribe(self.exchange, self.symbol, channel="book")
+
+    def _start_snapshot(self):
+        if self._snap_task is None or self._snap_task.done():
+            self._snap_task = asyncio.create_task(self._snapshot())
+
+    async def _snapshot(self):
+        await asyncio.sleep(0.3)                       # önce birkaç diff tamponlansın
+        try:
+            js = await rest.get_json(DEPTH_URL, params={"symbol": self.symbol, "limit": 1000},
+                                     timeout=5)
+        except Exception as e:
+            print(f"[WARN] depth snapshot fail {self.key} → {e}")
+            await asyncio.sleep(5)
+            self._snap_task = None
+            self._start_snapshot()
+            return
+        self.book.load(_levels(js["bids"]), _levels(js["asks"]), js["lastUpdateId"])
+        self._snap_id = js["lastUpdateId"]
+        self.synced = True
+        self._snap_task = None                         # tampondaki boşluk yeni snapshot açabilsin
+        buf, self._buf = self._buf, []
+        for ev in buf:
+            if not self._apply(*ev):
+                return
+        self._notify()
+
+    def on_msg(self, kind, first, last, prev, bids, asks):
+        if kind == "snapshot":
+            self.book.load(bids, asks, last)
+            self._snap_id, self.synced = None, True
+            self._notify()
+            return
+        if not self.synced:
+            if self.exchange in REST_SNAPSHOT and len(self._buf) < self._buf_max:
+                self._buf.append((first, last, prev, bids, asks))
+            return
+        if self._apply(first, last, prev, bids, asks):
+            self._notify()
+
+    def _apply(self, first, last, prev, bids, asks) -> bool:
+        if self._snap_id is not None:                  # snapshot sonrası ilk diff
+            if last < self._snap_id:
+                return True                            # snapshot’ta zaten var
+            if first > self._snap_id:                  # fapi: U <= lastUpdateId <= u olmalı
+                self.resync()
+                return False
+            self._snap_id = None
+        elif prev is not None and self.book.last_id is not None and prev != self.book.last_id:
+            self.resync()                              # zincir koptu
+            return False
+        self.book.apply(bids, asks)
+        self.book.last_id = last
+        self.updates += 1
+        return True
+
+
+_BOOKS: dict = {}                    # {(exchange, symbol): BookFeed}
+
+
+def supports(exchange: str) -> bool:
+    return exchange in ws_mux.CHANNELS["book"]
+
+
+def open_book(exchange: str, symbol: str) -> BookFeed:
+    """(exchange, symbol) defterine abone ol; yoksa oluşturup başlat."""
+    feed = _BOOKS.get((exchange, symbol))
+    if feed is None:
+        feed = BookFeed(exchange, symbol)
+        feed.start()
+        _BOOKS[feed.key] = feed
+    feed.refs += 1
+    return feed
+
+
+def close_book(feed: BookFeed):
+    feed.refs -= 1
+    if feed.refs <= 0 and _BOOKS.get(feed.key) is feed:
+        feed.stop()
+        del _BOOKS[feed.key]
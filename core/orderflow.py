@@ -0,0 +1,152 @@
+# core/orderflow.py
+"""
+Akışkan order-flow (footprint) toplayıcısı.
+• Her trade tek geçişte tüm zaman dilimlerine (CANDLES ile aynı epoch
+  hizası) işlenir: bar başına fiyat kovası → alış / satış hacmi, bar deltası,
+  kümülatif hacim deltası (CVD). Güncelleme O(zaman dilimi sayısı).
+• Kapanan barlar sıkıştırılarak saklanır: sıralı kova indeksleri (int32) +
+  alış/satış (float32) dizileri; zaman dilimi değiştirmek ham tick taraması
+  gerektirmez.
+• Kova boyu sembol başına ilk fiyattan seçilir (1/2/5 × 10^k).
+˓→  of = open_orderflow(exchange, symbol); of.subscribe(cb); of.agg.bars(tf, n)
+"""
+
+from collections import deque
+
+import numpy as np
+
+from core.candles import TF_SECONDS
+from core.data_streams import open_feed, close_feed
+from core.depthmap import nice_step
+
+
+class FootprintBar:
+    """Closed (compact) or running footprint bar."""
+
+    __slots__ = ("t0", "keys", "buy", "sell", "delta", "vol", "cvd")
+
+    def __init__(self, t0, keys, buy, sell, delta, vol, cvd):
+        self.t0, self.keys, self.buy, self.sell = t0, keys, buy, sell
+        self.delta, self.vol, self.cvd = delta, vol, cvd
+
+
+class FootprintAggregator:
+    """Per-timeframe volume-at-price with delta and CVD, updated per trade."""
+
+    def __init__(self, step: float | None = None, timeframes=tuple(TF_SECONDS),
+                 keep: int = 300):
+        self.step = step
+        self.cvd = 0.0
+        self._cur = {tf: None for tf in timeframes}       # [t0, {k: [buy, sell]}, delta, vol]
+        self.closed = {tf: deque(maxlen=keep) for tf in timeframes}
+
+    def add(self, ts, px, qty, side):
+        if self.step is None:
+            self.step = nice_step(px, 1e-4)
+        k = int(px // self.step)
+        signed = qty if side > 0 else -qty if side < 0 else 0.0
+        if not signed:
+            return
+        col = 0 if signed > 0 else 1
+        for tf, bar in self._cur.items():
+            sec = TF_SECONDS[tf]
+            t0 = ts - ts % sec
+            if bar is None or t0 > bar[0]:
+                if bar is not None:
+                    self._close(tf)
+                bar = self._cur[tf] = [t0, {}, 0.0, 0.0]
+            elif t0 < bar[0]:
+                continue                                  # geç gelen trade: kapanmış bar
+            cell = bar[1].get(k)
+            if cell is None:
+                cell = bar[1][k] = [0.0, 0.0]
+            cell[col] += qty
+            bar[2] += signed
+            bar[3] += qty
+        self.cvd += signed                                # barlar kapandıktan sonra
+
+    def add_batch(self, ts, px, qty, side):
+        add = self.add
+        for t, p, q, s in zip(ts, px, qty, side):
+            add(t, p, q, s)
+
+    def _compact(self, bar) -> FootprintBar:
+        t0, cells, delta, vol = bar
+        keys = np.array(sorted(cells), np.int32)
+        vals = np.array([cells[k] for k in keys.tolist()], np.float32).reshape(-1, 2)
+        return FootprintBar(t0, keys, vals[:, 0], vals[:, 1], delta, vol, self.cvd)
+
+    def _close(self, tf):
+        self.closed[tf].append(self._compact(self._cur[tf]))
+        self._cur[tf] = None
+
+    def bars(self, tf: str, n: int) -> list:
+        """Son `n` bar (kapanmış + oluşan), eski → yeni."""
+        out = list(self.closed[tf])[-n:]
+        if self._cur[tf] is not None:
+            out = (out + [self._compact(self._cur[tf])])[-n:]
+        return out
+
+
+class OrderFlow:
+    """Shared footprint aggregator fed by one market Feed."""
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange, self.symbol = exchange, symbol
+        self.agg = FootprintAggregator()
+        self.feed = None
+        self.refs = 0
+        self._subs: list = []
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol
+
+    def start(self):
+        self.feed = open_feed(self.exchange, self.symbol)
+        t = self.feed.ticks                                   # tamponda olanlarla başla
+        if t:
+            self.agg.add_batch(t.view("ts").tolist(), t.view("price").tolist(),
+                               t.view("qty").tolist(), t.view("side").tolist())
+        self.feed.subscribe(on_tick=self._on_trades)
+
+    def stop(self):
+        if self.feed is not None:
+            self.feed.unsubscribe(on_tick=self._on_trades)
+            close_feed(self.feed)
+            self.feed = None
+
+    def subscribe(self, cb):
+        self._subs.append(cb)
+
+    def unsubscribe(self, cb):
+        if cb in self._subs:
+            self._subs.remove(cb)
+
+    def _on_trades(self, ts, px, qty, side):
+        self.agg.add_batch(ts, px, qty, side)
+        for cb in self._subs:
+            try:
+                cb()
+            except Exception as e:
+                print("[WARN] orderflow subscriber:", e)
+
+
+_FLOWS: dict = {}
+
+
+def open_orderflow(exchange: str, symbol: str) -> OrderFlow:
+    of = _FLOWS.get((exchange, symbol))
+    if of is None:
+        of = OrderFlow(exchange, symbol)
+        of.start()
+        _FLOWS[of.key] = of
+    of.refs += 1
+    return of
+
+
+def close_orderflow(of: OrderFlow):
+    of.refs -= 1
+    if of.refs <= 0 and _FLOWS.get(of.key) is of:
+        of.stop()
+        del _FLOWS[of.key]
@@ -0,0 +1,50 @@
+# core/reconnect.py
+"""
+Ortak yeniden bağlanma gözetmeni.
+• Jitter’lı üstel geri çekilme: 0.5 s, 1 s, 2 s … en fazla 30 s; her bekleme
+  [d/2, d] aralığında rastgele (aynı anda kopan soketler sürü halinde
+  geri dönmesin).
+• Bağlantı `stable_after` saniyeden uzun yaşadıysa sayaç sıfırlanır.
+˓→  await supervise(run_once, name, keep_going=lambda: True)
+"""
+
+import asyncio, random, time
+
+
+class Backoff:
+    """Exponential backoff with 'equal jitter'."""
+
+    def __init__(self, base: float = 0.5, cap: float = 30.0, factor: float = 2.0):
+        self.base, self.cap, self.factor = base, cap, factor
+        self.attempt = 0
+
+    def next(self) -> float:
+        d = min(self.cap, self.base * self.factor ** self.attempt)
+        self.attempt += 1
+        return random.uniform(d / 2, d)
+
+    def reset(self):
+        self.attempt = 0
+
+
+async def supervise(run_once, name: str, keep_going=lambda: True,
+                    backoff: Backoff | None = None, stable_after: float = 30):
+    """`run_once()` bir bağlantı ömrü boyunca çalışır; döndüğünde ya da hata
+    verdiğinde geri çekilip yeniden çağrılır. `keep_going()` False olunca biter."""
+    backoff = backoff or Backoff()
+    while keep_going():
+        t0 = time.monotonic()
+        try:
+            await run_once()
+            err = "connection closed"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            err = e
+        if not keep_going():
+            return
+        if time.monotonic() - t0 > stable_after:
+            backoff.reset()
+        delay = backoff.next()
+        print(f"[WS] {name} reconnect in {delay:.1f}s:", err)
+        await asyncio.sleep(delay)
@@ -0,0 +1,152 @@
+# core/render.py
+"""
+Oturum başına birleştirici, hız sınırlı arayüz güncelleme zamanlayıcısı.
+• `set(obj, attr, value)` bekleyen güncellemeyi kaydeder; son gönderilenle
+  aynıysa hiçbir şey yapılmaz (fark yoksa Bokeh yaması da yok).
+• `schedule(fn)` değeri kare anında hesaplayacak üreticiyi sıraya alır; aynı
+  karede kaç kez istenirse istensin bir kez çalışır.
+• Kare başına tüm değişiklikler tek `hold()` altında uygulanır → tek yama.
+• Sekme gizliyken (Page Visibility) ya da oturum `idle_after` sn’dir
+  etkileşimsizse kare aralığı `interval`dan `slow_interval`a çıkar.
+˓→  render = RenderScheduler();  render.set(pane, "object", md);  render.watcher
+"""
+
+import time
+
+import panel as pn
+import param
+from panel.io import hold
+from panel.reactive import ReactiveHTML
+
+from core import metrics
+
+_MISSING = object()
+
+FLUSH_SECONDS = metrics.histogram("render_flush_seconds", "Render jobs + held document patch per frame")
+UPDATES = metrics.counter("render_updates_total", "Model attribute updates sent to browsers")
+SKIPPED = metrics.counter("render_updates_skipped_total", "Updates dropped because unchanged")
+metrics.gauge("render_queue_depth", "Pending updates and jobs across sessions").set_function(
+    lambda: sum(len(r._pending) + len(r._jobs) for r in metrics.sessions()))
+
+
+class PageWatcher(ReactiveHTML):
+    """Reports tab visibility and (throttled) user activity from the browser."""
+
+    hidden = param.Boolean(default=False)
+    active = param.Number(default=0)      # son etkileşimin (tarayıcı) zamanı, sn
+
+    _template = '<div id="probe" style="display:none"></div>'
+
+    _scripts = {
+        "render": """
+          const sync = () => { data.hidden = document.hidden; };
+          let last = 0;
+          const poke = () => {
+            const now = Date.now() / 1000;
+            if (now - last > 15) { last = now; data.active = now; }
+          };
+          state.handlers = [["visibilitychange", sync], ["pointerdown", poke],
+                            ["keydown", poke], ["wheel", poke]];
+          for (const [ev, fn] of state.handlers) document.addEventListener(ev, fn, {passive: true});
+          sync(); poke();
+        """,
+        "remove": """
+          for (const [ev, fn] of state.handlers) document.removeEventListener(ev, fn);
+        """,
+    }
+
+
+class RenderScheduler:
+    """Batches pane/model updates into at most one held document patch per frame."""
+
+    def __init__(self, doc=None, interval: float = 0.25, slow_interval: float = 2.0,
+                 idle_after: float = 300):
+        self.doc = doc if doc is not None else pn.state.curdoc
+        self.interval, self.slow_interval, self.idle_after = interval, slow_interval, idle_after
+        self.watcher = PageWatcher(width=0, height=0, margin=0)
+        self.watcher.param.watch(self._on_page, ["hidden", "active"])
+        self._jobs: dict = {}                 # fn → None (sıralı küme)
+        self._pending: dict = {}              # (id(obj), attr) → (obj, attr, value)
+        self._last: dict = {}                 # (id(obj), attr) → son gönderilen
+        self._timer = None
+        self._last_flush = 0.0
+        self._last_touch = time.monotonic()
+        self.frames = self.sent = self.skipped = 0
+        metrics.watch_session(self)
+
+    # ........................ durum
+    @property
+    def slow(self) -> bool:
+        return (self.watcher.hidden
+                or time.monotonic() - self._last_touch > self.idle_after)
+
+    def touch(self):
+        """Kullanıcı etkileşimi: tam hıza dön."""
+        was_slow = self.slow
+        self._last_touch = time.monotonic()
+        if was_slow and (self._jobs or self._pending):
+            self._reschedule()
+
+    def _on_page(self, event):
+        if event.name == "active" or not event.new:   # etkileşim ya da sekme göründü
+            self.touch()
+
+    # ........................ kuyruk
+    def set(self, obj, attr: str, value):
+        key = (id(obj), attr)
+        if self._last.get(key, _MISSING) == value:
+            self._pending.pop(key, None)
+            self.skipped += 1
+            SKIPPED.inc()
+            return
+        self._pending[key] = (obj, attr, value)
+        self._arm()
+
+    def schedule(self, fn):
+        self._jobs[fn] = None
+        self._arm()
+
+    def forget(self, obj):
+        """Nesne için tutulan son değerleri bırak (yeniden gönderilecek)."""
+        for key in [k for k in self._last if k[0] == id(obj)]:
+            del self._last[key]
+
+    # ........................ kare
+    def _delay(self) -> float:
+        step = self.slow_interval if self.slow else self.interval
+        return max(0.0, self._last_flush + step - time.monotonic())
+
+    def _arm(self):
+        if self._timer is not None or self.doc is None:
+            return
+        self._timer = self.doc.add_timeout_callback(self._flush, int(self._delay() * 1000))
+
+    def _reschedule(self):
+        if self._timer is not None:
+            try:
+                self.doc.remove_timeout_callback(self._timer)
+            except ValueError:
+                pass
+            self._timer = None
+        self._arm()
+
+    def _flush(self):
+        self._timer = None
+        self._last_flush = t0 = time.monotonic()
+        jobs, self._jobs = self._jobs, {}
+        for fn in jobs:
+            try:
+                fn()
+            except Exception as e:
+                print("[WARN] render job:", e)
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.frames += 1
+        with hold(self.doc):
+            for key, (obj, attr, value) in pending.items():
+                setattr(obj, attr, value)
+                self._last[key] = value
+        self.sent += len(pending)
+        UPDATES.inc(len(pending))
+        FLUSH_SECONDS.observe(time.monotonic() - t0)
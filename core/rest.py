@@ -0,0 +1,128 @@
+# core/rest.py
+"""
+Ortak, bloklamayan (async) HTTP katmanı.
+• Host başına tek bir httpx.AsyncClient → keep-alive bağlantı havuzu
+• Host başına eşzamanlılık sınırı (semaphore)
+• Zaman aşımı + 429/5xx/ağ hatalarında üstel geri çekilmeli tekrar
+Tüm REST çağrıları (geçmiş mumlar, sembol listeleri, başlık verisi, KuCoin
+poll) buradan geçer; olay döngüsü hiçbir zaman `requests.get` ile durmaz.
+˓→  await get_json(url, params=None, headers=None, timeout=8, retries=2)
+"""
+
+import asyncio, time
+from urllib.parse import urlsplit
+
+import httpx
+import anyio, h11, httpcore   # noqa: F401 – httpx bunları ilk istekte yükler;
+                              # içe aktarma maliyeti olay döngüsüne binmesin
+
+from core import metrics
+
+# host → aynı anda en fazla kaç istek (varsayılan: DEFAULT_CONCURRENCY)
+HOST_CONCURRENCY = {
+    "fapi.binance.com":        8,
+    "api.bybit.com":           8,
+    "www.okx.com":             4,
+    "api.bitget.com":          4,
+    "api.hbdm.com":            4,
+    "api-futures.kucoin.com":  4,
+    "api.kucoin.com":          4,
+    "pro-api.coinmarketcap.com": 2,
+    "api.coingecko.com":       2,
+}
+DEFAULT_CONCURRENCY = 4
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}
+
+REST_SECONDS = metrics.histogram("rest_request_seconds",
+                                 "REST attempt latency incl. host semaphore wait", ("host",))
+REST_ERRORS = metrics.counter("rest_errors_total", "Failed REST attempts (retried or raised)",
+                              ("host",))
+
+_CLIENTS: dict = {}      # host → (loop, AsyncClient, Semaphore)
+_SSL = httpx.create_ssl_context()   # bir kez kurulur; istemci başına ~100 ms’lik
+                                    # sertifika yüklemesi döngüyü bloklamasın
+
+
+class RateLimiter:
+    """Token bucket: saniyede `rate` istek, en fazla `burst` birikimli."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._t = time.monotonic()
+
+    async def acquire(self, n: float = 1):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate)
+            self._t = now
+            if self._tokens >= n:
+                self._tokens -= n
+                return
+            await asyncio.sleep((n - self._tokens) / self.rate)
+
+
+class RetryableStatus(Exception):
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code} {response.url}")
+        self.response = response
+
+
+def _client(host: str):
+    loop = asyncio.get_running_loop()
+    entry = _CLIENTS.get(host)
+    if entry is None or entry[0] is not loop:        # döngü değiştiyse yeniden kur
+        n = HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=n, max_keepalive_connections=n,
+                                keepalive_expiry=60),
+            headers={"User-Agent": "crypto-dashboard"},
+            verify=_SSL,
+        )
+        entry = _CLIENTS[host] = (loop, client, asyncio.Semaphore(n))
+    return entry[1], entry[2]
+
+
+async def request(method: str, url: str, *, params=None, headers=None, json=None,
+                  timeout: float = 8, retries: int = 2, backoff: float = 0.5):
+    """Havuzlu istek; tekrar edilebilir hatalarda `retries` kez yeniden dener."""
+    host = urlsplit(url).hostname
+    client, sem = _client(host)
+    took = REST_SECONDS.labels(host)
+    for attempt in range(retries + 1):
+        t = time.perf_counter()
+        try:
+            async with sem:
+                r = await client.request(method, url, params=params, headers=headers,
+                                         json=json, timeout=timeout)
+            took.observe(time.perf_counter() - t)
+            if r.status_code in RETRY_STATUS:
+                raise RetryableStatus(r)
+            r.raise_for_status()
+            return r
+        except (httpx.HTTPError, RetryableStatus) as e:
+            REST_ERRORS.labels(host).inc()
+            if not isinstance(e, (httpx.TransportError, RetryableStatus)):
+                raise
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            if isinstance(e, RetryableStatus):
+                delay = max(delay, float(e.response.headers.get("Retry-After", 0) or 0))
+            await asyncio.sleep(delay)
+
+
+async def get_json(url: str, **kw):
+    return (await request("GET", url, **kw)).json()
+
+
+async def post_json(url: str, **kw):
+    return (await request("POST", url, **kw)).json()
+
+
+async def aclose():
+    """Tüm havuzları kapat (uygulama kapanışı / testler)."""
+    for _, client, _ in list(_CLIENTS.values()):
+        await client.aclose()
+    _CLIENTS.clear()
@@ -0,0 +1,136 @@
+# core/ringbuffer.py
+"""
+Sabit kapasiteli, sütun bazlı (columnar) halka tampon.
+• Her sütun ayrı bir NumPy dizisi; yazma imleci tek bir tamsayı.
+• Diziler 2×kapasite uzunluğunda tutulur ve her satır iki kez yazılır
+  (i ve i+kapasite). Böylece son N satır her zaman bitişik bir dilimdir
+  → kopyasız (zero-copy) görünüm döner.
+• deque API’sinin kullanılan kısmı (append / extend / [-1] / len / clear)
+  eski tuple tabanlı kod için korunur.
+"""
+
+import numpy as np
+
+TICK_COLUMNS   = (("ts", "i8"), ("price", "f8"), ("qty", "f8"), ("side", "i1"))
+CANDLE_COLUMNS = (("epoch", "i8"), ("open", "f8"), ("high", "f8"),
+                  ("low", "f8"), ("close", "f8"), ("vol", "f8"))
+
+SIDE_CODE = {"buy": 1, "sell": -1, "": 0}
+SIDE_NAME = {1: "buy", -1: "sell", 0: ""}
+
+
+class RingBuffer:
+    """Columnar ring buffer with zero-copy views of the most recent rows."""
+
+    def __init__(self, capacity: int, columns=CANDLE_COLUMNS):
+        self.capacity = int(capacity)
+        self.columns  = tuple(name for name, _ in columns)
+        self._cols    = {name: np.zeros(2 * self.capacity, dtype)
+                         for name, dtype in columns}
+        self._arrs    = tuple(self._cols[n] for n in self.columns)
+        self._pos     = 0          # bir sonraki yazma indeksi  [0, capacity)
+        self._len     = 0
+        self.total    = 0          # şimdiye dek yazılan satır sayısı (monoton, clear sıfırlamaz)
+        self.cleared  = 0          # son clear() anındaki total
+
+    # ........................ yazma
+    def append(self, row):
+        i, j = self._pos, self._pos + self.capacity
+        for arr, v in zip(self._arrs, self._encode(row)):
+            arr[i] = arr[j] = v
+        self._pos = (i + 1) % self.capacity
+        self.total += 1
+        if self._len < self.capacity:
+            self._len += 1
+
+    def extend(self, rows):
+        rows = list(rows)
+        if rows:
+            self.extend_columns(*zip(*(self._encode(r) for r in rows)))
+
+    def extend_columns(self, *cols):
+        """Bir grup satırı sütun dizileri olarak tek seferde yaz."""
+        n = len(cols[0])
+        if n == 0:
+            return
+        self.total += n
+        if n > self.capacity:                      # sadece kuyruk sığar
+            cols, n = [c[-self.capacity:] for c in cols], self.capacity
+        cap, pos = self.capacity, self._pos
+        first = min(n, cap - pos)
+        for arr, c in zip(self._arrs, cols):
+            c = np.asarray(c, dtype=arr.dtype)
+            arr[pos:pos + first] = c[:first]
+            arr[pos + cap:pos + cap + first] = c[:first]
+            if first < n:
+                arr[:n - first] = c[first:]
+                arr[cap:cap + n - first] = c[first:]
+        self._pos = (pos + n) % cap
+        self._len = min(cap, self._len + n)
+
+    def clear(self):
+        """Satırları at. `total` bilerek sıfırlanmaz (araçlar onu toplam yazım
+        sayacı olarak okur); `mark < cleared` olan tüketici baştan yüklemeli."""
+        self._pos = self._len = 0
+        self.cleared = self.total
+
+    # ........................ okuma
+    def view(self, name: str, n: int | None = None) -> np.ndarray:
+        """Son `n` satırın `name` sütunu (kopyasız, eski → yeni)."""
+        n = self._len if n is None else min(n, self._len)
+        end = self._pos + self.capacity
+        return self._cols[name][end - n:end]
+
+    def last(self, n: int | None = None) -> dict:
+        """Son `n` satır için {sütun: görünüm} sözlüğü."""
+        return {name: self.view(name, n) for name in self.columns}
+
+    def pending(self, mark: int) -> int:
+        """`mark` (eski bir `total` değeri) sonrasında yazılıp hâlâ tamponda
+        duran satır sayısı – tüketiciler tamponu boşaltmadan okur.
+        Arada clear() olduysa (`mark < cleared`) yalnızca clear sonrası
+        satırlar sayılır; önceki satırlar gittiği için tüketicinin elindeki
+        kopya artık geçersizdir, baştan okumalıdır."""
+        return min(self.total - max(mark, self.cleared), self._len)
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("ring buffer index out of range")
+        k = self._pos + self.capacity - self._len + i
+        return self._decode(tuple(arr[k].item() for arr in self._arrs))
+
+    def __iter__(self):
+        rows = zip(*(self.view(n).tolist() for n in self.columns))
+        return (self._decode(r) for r in rows)
+
+    # ........................ satır dönüşümleri (alt sınıflar için)
+    def _encode(self, row):
+        return row
+
+    def _decode(self, row):
+        return row
+
+
+class TickBuffer(RingBuffer):
+    """(ts, price, qty, side) tick’leri; side int8 olarak saklanır."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity, TICK_COLUMNS)
+
+    def _encode(self, row):
+        ts, px, qty, side = row
+        return ts, px, qty, SIDE_CODE.get(side, 0)
+
+    def _decode(self, row):
+        ts, px, qty, side = row
+        return ts, px, qty, SIDE_NAME[side]
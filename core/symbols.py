@@ -0,0 +1,162 @@
+# core/symbols.py
+"""
+Önbellekli enstrüman (perpetual sözleşme) kaydı.
+• Borsa başına TTL; süresi dolan liste hemen (bayat) döner, arka planda
+  yenilenir (stale-while-revalidate). Aynı anda tek yükleme yapılır.
+• Son listeler data/symbols.json’a yazılır; açılışta oradan okunur,
+  böylece ilk sayfa ağı beklemez.
+• Borsalar arası normalizasyon önceden hesaplanır:
+  BTCUSDT (Binance) ↔ BTC-USDT-SWAP (OKX) ↔ XBTUSDTM (KuCoin) → "BTC/USDT"
+˓→  await fetch_symbols(exchange) → list[str]      (cached_symbols: ağsız)
+˓→  canonical(exchange, native) / native(exchange, canonical)
+"""
+
+import asyncio, json, os, pathlib
+
+from core import metrics, rest
+from core.cache import TTLCache
+
+TTL = {"Binance": 3_600, "Bybit": 3_600, "OKX": 3_600,
+       "Bitget": 3_600, "HTX": 3_600, "KuCoin": 3_600}
+DEFAULT_TTL = 1_800
+SNAPSHOT = pathlib.Path(os.getenv(
+    "SYMBOL_SNAPSHOT",
+    pathlib.Path(__file__).resolve().parent.parent / "data" / "symbols.json"))
+
+_ALIASES = {"XBT": "BTC"}                       # KuCoin vb. farklı adlandırmalar
+
+_CACHE = TTLCache(maxsize=16, ttl=DEFAULT_TTL)  # exchange → Instruments
+metrics.watch_cache("symbols", _CACHE)
+_LOADING: dict = {}                             # exchange → Task
+
+
+class Instruments:
+    """Bir borsanın sözleşme listesi + önceden hesaplanmış eşlemeler."""
+
+    __slots__ = ("symbols", "to_canon", "to_native")
+
+    def __init__(self, rows):
+        # rows: [(native, base, quote), …] – borsanın döndürdüğü sırayla
+        self.symbols   = [n for n, _, _ in rows]
+        self.to_canon  = {n: f"{_ALIASES.get(b, b)}/{q}" for n, b, q in rows}
+        self.to_native = {c: n for n, c in reversed(self.to_canon.items())}
+
+    def rows(self):
+        return [(n, *self.to_canon[n].split("/")) for n in self.symbols]
+
+
+# ........................ borsa listeleri  (native, base, quote)
+async def _binance():
+    js = await rest.get_json("https://fapi.binance.com/fapi/v1/exchangeInfo", timeout=5)
+    return [(s["symbol"], s["baseAsset"], s["quoteAsset"]) for s in js["symbols"]
+            if s.get("contractType") == "PERPETUAL"]
+
+async def _bybit():
+    js = await rest.get_json("https://api.bybit.com/v5/market/instruments-info",
+                             params={"category": "linear", "limit": 1000}, timeout=5)
+    return [(i["symbol"], i["baseCoin"], i["quoteCoin"]) for i in js["result"]["list"]
+            if i.get("status") == "Trading"]
+
+async def _okx():
+    # OKX SWAP enstrümanları; instId = BASE-QUOTE-SWAP
+    js = await rest.get_json("https://www.okx.com/api/v5/public/instruments",
+                             params={"instType": "SWAP"}, timeout=5)
+    return [(i["instId"], *i["instId"].split("-")[:2]) for i in js.get("data", [])]
+
+async def _bitget():
+    js = await rest.get_json("https://api.bitget.com/api/v2/mix/market/contracts",
+                             params={"productType": "usdt-futures"}, timeout=5)
+    return [(i["symbol"], i["baseCoin"], i["quoteCoin"]) for i in js["data"]
+            if i.get("symbolStatus", i.get("status")) == "normal"]
+
+async def _htx():
+    js = await rest.get_json("https://api.hbdm.com/linear-swap-api/v1/swap_contract_info",
+                             params={"contract_type": "swap"}, timeout=5)
+    return [(i["contract_code"].upper(), *i["contract_code"].upper().split("-")[:2])
+            for i in js["data"]]
+
+async def _kucoin():
+    js = await rest.get_json("https://api-futures.kucoin.com/api/v1/contracts/active", timeout=5)
+    return [(i["symbol"], i["baseCurrency"], i["quoteCurrency"]) for i in js["data"]
+            if i["type"] in ("FFWCSX", "PERPETUAL") and i["quoteCurrency"] == "USDT"]
+
+_FETCHERS = {"Binance": _binance, "Bybit": _bybit, "OKX": _okx,
+             "Bitget": _bitget, "HTX": _htx, "Huobi": _htx, "KuCoin": _kucoin}
+
+
+# ........................ disk anlık görüntüsü
+def _load_snapshot():
+    try:
+        raw = json.loads(SNAPSHOT.read_text())
+    except (OSError, ValueError):
+        return
+    for ex, (stored_at, rows) in raw.items():
+        _CACHE.set(ex, Instruments(rows), TTL.get(ex, DEFAULT_TTL), stored_at)
+
+def _write_snapshot(data):
+    SNAPSHOT.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SNAPSHOT.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, SNAPSHOT)
+
+_load_snapshot()
+
+
+# ........................ kayıt
+async def _load(exchange):
+    inst = Instruments(await _FETCHERS[exchange]())
+    _CACHE.set(exchange, inst, TTL.get(exchange, DEFAULT_TTL))
+    data = {ex: (stored, v.rows()) for ex, stored, v in _CACHE.items()}
+    try:
+        await asyncio.to_thread(_write_snapshot, data)
+    except OSError as e:
+        print("[WARN] symbol snapshot:", e)
+    return inst
+
+def _start_load(exchange):
+    task = _LOADING.get(exchange)
+    if task is None or task.done():
+        task = _LOADING[exchange] = asyncio.create_task(_load(exchange))
+        task.add_done_callback(_log_failure)
+    return task
+
+def _log_failure(task):
+    if not task.cancelled() and task.exception() is not None:
+        print("[WARN] Symbol refresh failed:", task.exception())
+
+async def instruments(exchange: str):
+    inst, fresh = _CACHE.lookup(exchange)
+    if inst is not None:
+        if not fresh:
+            _start_load(exchange)                     # bayatı dön, arkada yenile
+        return inst
+    if exchange not in _FETCHERS:
+        return None
+    return await _start_load(exchange)
+
+async def fetch_symbols(exchange: str):
+    """
+    Seçilen borsanın perpetual (swap) sözleşme listesini döndürür.
+    Önbellekten gelir; hata olursa boş liste.
+    """
+    try:
+        inst = await instruments(exchange)
+        return list(inst.symbols) if inst else []
+    except Exception as e:
+        print(f"[WARN] Symbol fetch failed for {exchange}: {e}")
+        return []
+
+def cached_symbols(exchange: str):
+    """Ağa çıkmadan (bayat olsa da) önbellekteki liste – ilk çizim için."""
+    inst = _CACHE.peek(exchange)
+    return list(inst.symbols) if inst else []
+
+def canonical(exchange: str, symbol: str):
+    """Borsaya özgü sembol → "BASE/QUOTE" (önbellekte yoksa None)."""
+    inst = _CACHE.peek(exchange)
+    return inst.to_canon.get(symbol) if inst else None
+
+def native(exchange: str, canon: str):
+    """"BASE/QUOTE" → borsaya özgü sembol (önbellekte yoksa None)."""
+    inst = _CACHE.peek(exchange)
+    return inst.to_native.get(canon) if inst else None
@@ -0,0 +1,348 @@
+# core/ws_mux.py
+"""
+Borsa başına çoklanmış (multiplexed) WebSocket bağlantı yöneticisi.
+• Bir borsadaki tüm semboller birkaç soket üzerinden taşınır: Binance
+  combined stream (SUBSCRIBE), Bybit/OKX/Bitget/HTX çok argümanlı subscribe.
+• Bağlantı başına konu (topic) sınırına ulaşılınca yeni soket açılır (shard).
+• Gelen çerçeve konusuna göre yönlendirilir → o konunun çözücüsü → abonelerin
+  `sink(ts, px, qty, side)` fonksiyonları.
+• Kanal türü (trades, …) tarif içinde tanımlıdır; başka modüller kendi
+  kanallarını `CHANNELS`e ekleyerek aynı soketleri paylaşabilir.
+• Kopmalar core.reconnect ile jitter’lı üstel geri çekilmeyle toparlanır.
+  Konu başına son trade kimliği tutulur: yeniden abonelikte tekrar gelen
+  çerçeveler atılır; yeniden bağlanınca ya da ardışık kimliklerde boşluk
+  görülünce `on_gap(since)` çağrılır (since = son verinin duvar saati).
+˓→  subscribe(exchange, symbol, sink, channel="trades", on_gap=None) / unsubscribe(...)
+˓→  connected(exchange, symbol) → bool   (fallback kararları için)
+˓→  resubscribe(exchange, symbol, channel) (yeni snapshot istemek için)
+"""
+
+import asyncio, itertools, time
+from time import perf_counter_ns as perf_ns
+import websockets
+
+from core import metrics, rest
+from core.decode import loads, dumps, gunzip, DECODERS, SEQ, CONTIGUOUS
+from core.reconnect import supervise
+
+_ids = itertools.count(1)
+
+WS_MESSAGES = metrics.counter("ws_messages_total", "WebSocket frames received", ("exchange",))
+WS_TRADES = metrics.counter("ws_trades_total", "Trades decoded on the trades channel", ("exchange",))
+WS_EVENTS = metrics.counter("ws_events_total", "Decoded frames per channel (trades, book, …)",
+                            ("exchange", "channel"))
+WS_DECODE = metrics.histogram("ws_decode_seconds", "JSON parse + decoder time per routed frame",
+                              ("exchange",))
+WS_SINK = metrics.histogram("ws_sink_seconds",
+                            "Subscriber time per frame (Feed.on_trades → candle aggregation)",
+                            ("exchange",))
+WS_QUEUE = metrics.gauge("ws_queue_depth", "Frames received but not yet dispatched", ("exchange",))
+
+
+# ........................ borsa tarifleri
+def _binance_sub(op):
+    return lambda topics: [dumps({"method": op, "params": topics[i:i + 100], "id": next(_ids)})
+                           for i in range(0, len(topics), 100)]
+
+def _args_sub(op, chunk, arg):
+    return lambda topics: [dumps({"op": op, "args": [arg(t) for t in topics[i:i + chunk]]})
+                           for i in range(0, len(topics), chunk)]
+
+_OKX_INST_TYPES = {"SWAP", "FUTURES", "SPOT", "MARGIN", "OPTION"}
+
+def _okx_arg(topic):
+    channel, inst = topic.split(":", 1)
+    # borsa geneli kanallar (liquidation-orders …) instType ile abone olunur
+    return {"channel": channel, ("instType" if inst in _OKX_INST_TYPES else "instId"): inst}
+
+def _okx_route(m):
+    if "data" not in m:
+        return None
+    arg = m["arg"]
+    return f'{arg["channel"]}:{arg.get("instId") or arg.get("instType")}'
+
+def _bitget_arg(topic):
+    channel, inst = topic.split(":", 1)
+    return {"instType": "USDT-FUTURES", "channel": channel, "instId": inst}
+
+def _htx_sub(op):
+    return lambda topics: [dumps({op: t, "id": next(_ids)}) for t in topics]
+
+def _htx_control(m):
+    return dumps({"pong": m["ping"]}) if "ping" in m else None
+
+def _kucoin_sub(op):
+    return lambda topics: [dumps({"id": next(_ids), "type": op, "topic": t, "response": True})
+                           for t in topics]
+
+async def _kucoin_uri():
+    """Her bağlantıda yeni token: POST bullet-public → endpoint?token=…"""
+    js = await rest.post_json("https://api-futures.kucoin.com/api/v1/bullet-public",
+                              timeout=5)
+    d = js["data"]
+    return f'{d["instanceServers"][0]["endpoint"]}?token={d["token"]}&connectId={next(_ids)}'
+
+
+SPECS = {
+    "Binance": dict(
+        uri="wss://fstream.binance.com/stream", cap=200,
+        sub=_binance_sub("SUBSCRIBE"), unsub=_binance_sub("UNSUBSCRIBE"),
+        route=lambda m: m.get("stream")),
+    "Bybit": dict(
+        uri="wss://stream.bybit.com/v5/public/linear", cap=200, ping=dumps({"op": "ping"}),
+        sub=_args_sub("subscribe", 10, str), unsub=_args_sub("unsubscribe", 10, str),
+        route=lambda m: m.get("topic")),
+    "OKX": dict(
+        uri="wss://ws.okx.com:8443/ws/v5/public", cap=100, ping="ping",
+        sub=_args_sub("subscribe", 20, _okx_arg), unsub=_args_sub("unsubscribe", 20, _okx_arg),
+        route=_okx_route),
+    "Bitget": dict(
+        uri="wss://ws.bitget.com/v2/ws/public", cap=50, ping="ping",
+        sub=_args_sub("subscribe", 20, _bitget_arg), unsub=_args_sub("unsubscribe", 20, _bitget_arg),
+        route=lambda m: "data" in m and f'{m["arg"]["channel"]}:{m["arg"]["instId"]}'),
+    "HTX": dict(
+        uri="wss://api.hbdm.com/linear-swap-ws", cap=100, gzip=True,
+        sub=_htx_sub("sub"), unsub=_htx_sub("unsub"), control=_htx_control,
+        route=lambda m: m.get("ch")),
+    "KuCoin": dict(
+        uri=_kucoin_uri, cap=100, ping=lambda: dumps({"id": next(_ids), "type": "ping"}),
+        ping_every=18, sub=_kucoin_sub("subscribe"), unsub=_kucoin_sub("unsubscribe"),
+        route=lambda m: m.get("type") == "message" and m.get("topic")),
+}
+
+# kanal → borsa → (konu(symbol), çözücü, kimlik aralığı ya da None)
+CHANNELS = {
+    "trades": {
+        "Binance": (lambda s: f"{s.lower()}@aggTrade", DECODERS["Binance"], SEQ["Binance"]),
+        "Bybit":   (lambda s: f"publicTrade.{s}",      DECODERS["Bybit"],   SEQ["Bybit"]),
+        "OKX":     (lambda s: f"trades:{s}",           DECODERS["OKX"],     SEQ["OKX"]),
+        "Bitget":  (lambda s: f"trade:{s}",            DECODERS["Bitget"],  SEQ["Bitget"]),
+        "HTX":     (lambda s: f"market.{s.upper()}.trade.detail", DECODERS["HTX"], SEQ["HTX"]),
+        "KuCoin":  (lambda s: f"/contractMarket/execution:{s}", DECODERS["KuCoin"], SEQ["KuCoin"]),
+    },
+}
+
+
+class _Route:
+    """Bir konunun çözücüsü, aboneleri ve kimlik takibi."""
+
+    __slots__ = ("decoder", "seq", "sinks", "gap_cbs", "conn", "last_id", "last_ts",
+                 "events", "trades")
+
+    def __init__(self, decoder, seq, conn, events, trades=None):
+        self.decoder, self.seq, self.conn = decoder, seq, conn
+        self.events, self.trades = events, trades       # ölçüm sayaçları (trades: sadece trade kanalı)
+        self.sinks, self.gap_cbs = [], []
+        self.last_id = None
+        self.last_ts = time.time()
+
+    def gap(self, since):
+        for cb in self.gap_cbs:
+            try:
+                cb(since)
+            except Exception as e:
+                print("[WARN] gap callback:", e)
+
+
+class _Conn:
+    """Tek bir soket: konu kümesi + okuma döngüsü."""
+
+    def __init__(self, mux):
+        self.mux = mux
+        self.topics: set = set()
+        self.ws = None
+        self.task = None
+        self.sessions = 0                               # başarılı bağlantı sayısı
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def send(self, msgs):
+        if self.ws is not None:
+            for m in msgs:
+                await self.ws.send(m)
+
+    async def _ping(self, ws, text, every=20):
+        while True:
+            await asyncio.sleep(every)
+            await ws.send(text() if callable(text) else text)
+
+    async def _run(self):
+        await supervise(self._session, self.mux.exchange,
+                        keep_going=lambda: bool(self.topics))
+
+    async def _session(self):
+        """Tek bağlantı ömrü: bağlan, tüm konulara abone ol, çerçeveleri dağıt."""
+        spec = self.mux.spec
+        pinger = None
+        uri = spec["uri"]
+        if callable(uri):                               # token’lı uç nokta
+            uri = await uri()
+        try:
+            async with websockets.connect(uri, ping_interval=20,
+                                          max_size=None) as ws:
+                self.ws = ws
+                await self.send(spec["sub"](sorted(self.topics)))
+                if self.sessions:
+                    self.mux.reconnected(self)          # kopukluk boyunca kaçanlar
+                self.sessions += 1
+                if spec.get("ping"):
+                    pinger = asyncio.create_task(
+                        self._ping(ws, spec["ping"], spec.get("ping_every", 20)))
+                async for raw in ws:
+                    reply = self.mux.dispatch(raw)
+                    if reply:
+                        await ws.send(reply)
+        finally:
+            self.ws = None
+            if pinger is not None:
+                pinger.cancel()
+
+
+class ExchangeMux:
+    """Bir borsanın tüm konularını birkaç soket üzerine dağıtır."""
+
+    def __init__(self, exchange: str):
+        self.exchange = exchange
+        self.spec = SPECS[exchange]
+        self.conns: list = []
+        self._routes: dict = {}          # topic → _Route
+        self._m_msgs, self._m_trades = WS_MESSAGES.labels(exchange), WS_TRADES.labels(exchange)
+        self._m_decode, self._m_sink = WS_DECODE.labels(exchange), WS_SINK.labels(exchange)
+        WS_QUEUE.labels(exchange).set_function(
+            lambda: sum(len(getattr(c.ws, "messages", ()) or ()) for c in self.conns))
+
+    # ........................ abonelik
+    def add(self, topic, decoder, sink, seq=None, on_gap=None, channel="trades"):
+        route = self._routes.get(topic)
+        if route is not None:
+            route.sinks.append(sink)
+            if on_gap: route.gap_cbs.append(on_gap)
+            return
+        conn = next((c for c in self.conns if len(c.topics) < self.spec["cap"]), None)
+        fresh = conn is None
+        if fresh:                                      # yeni shard
+            conn = _Conn(self)
+            self.conns.append(conn)
+        conn.topics.add(topic)
+        route = self._routes[topic] = _Route(
+            decoder, seq, conn, WS_EVENTS.labels(self.exchange, channel),
+            self._m_trades if channel == "trades" else None)
+        route.sinks.append(sink)
+        if on_gap: route.gap_cbs.append(on_gap)
+        if fresh:
+            conn.start()                               # bağlanınca tüm konular gönderilir
+        else:
+            asyncio.create_task(conn.send(self.spec["sub"]([topic])))
+
+    def remove(self, topic, sink, on_gap=None):
+        route = self._routes.get(topic)
+        if route is None:
+            return
+        if sink in route.sinks:
+            route.sinks.remove(sink)
+        if on_gap in route.gap_cbs:
+            route.gap_cbs.remove(on_gap)
+        if route.sinks:
+            return
+        conn = route.conn
+        del self._routes[topic]
+        conn.topics.discard(topic)
+        if conn.topics:
+            asyncio.create_task(conn.send(self.spec["unsub"]([topic])))
+        else:
+            conn.task.cancel()
+            self.conns.remove(conn)
+
+    # ........................ yönlendirme
+    def dispatch(self, raw):
+        """Çerçeveyi çöz, konusunun abonelerine ilet; gerekirse cevap döndür."""
+        self._m_msgs.value += 1
+        t0 = perf_ns()
+        if isinstance(raw, bytes) and self.spec.get("gzip"):
+            raw = gunzip(raw)
+        if raw == "pong":
+            return None
+        m = loads(raw)
+        control = self.spec.get("control")
+        if control is not None:
+            reply = control(m)
+            if reply:
+                return reply
+        route = self._routes.get(self.spec["route"](m))
+        if route is None:
+            return None
+        batch = route.decoder(m)
+        if not batch:
+            return None
+        t1 = perf_ns()
+        self._m_decode.observe_ns(t1 - t0)
+        route.events.value += 1
+        if route.trades is not None:
+            route.trades.value += len(batch[0])
+        ids = route.seq(m) if route.seq is not None else None
+        if ids is not None:
+            last = route.last_id
+            if last is not None:
+                if ids[1] <= last:                       # yeniden abonelikte tekrar
+                    return None
+                if self.exchange in CONTIGUOUS and ids[0] > last + 1:
+                    route.gap(route.last_ts)
+            route.last_id = ids[1]
+        route.last_ts = time.time()
+        for sink in route.sinks:
+            try:
+                sink(*batch)
+            except Exception as e:
+                print(f"[WARN] {self.exchange} sink:", e)
+        self._m_sink.observe_ns(perf_ns() - t1)
+        return None
+
+    def resend(self, topic):
+        """Konuya aynı soketten yeniden abone ol (borsa yeni snapshot gönderir)."""
+        route = self._routes.get(topic)
+        if route is not None:
+            asyncio.create_task(route.conn.send(self.spec["unsub"]([topic]) +
+                                                self.spec["sub"]([topic])))
+
+    def reconnected(self, conn):
+        for topic in list(conn.topics):
+            route = self._routes.get(topic)
+            if route is not None:
+                route.gap(route.last_ts)
+
+
+_MUXES: dict = {}
+
+
+def subscribe(exchange: str, symbol: str, sink, channel: str = "trades", on_gap=None):
+    """`symbol`ün `channel` akışını `sink`e bağla (soketler paylaşılır).
+    `on_gap(since)` veri kaçırılmış olabilecek her durumda çağrılır."""
+    topic, decoder, seq = CHANNELS[channel][exchange]
+    mux = _MUXES.get(exchange)
+    if mux is None:
+        mux = _MUXES[exchange] = ExchangeMux(exchange)
+    mux.add(topic(symbol), decoder, sink, seq, on_gap, channel)
+
+
+def unsubscribe(exchange: str, symbol: str, sink, channel: str = "trades", on_gap=None):
+    mux = _MUXES.get(exchange)
+    if mux is not None:
+        mux.remove(CHANNELS[channel][exchange][0](symbol), sink, on_gap)
+
+
+def resubscribe(exchange: str, symbol: str, channel: str = "trades"):
+    mux = _MUXES.get(exchange)
+    if mux is not None:
+        mux.resend(CHANNELS[channel][exchange][0](symbol))
+
+
+def connected(exchange: str, symbol: str, channel: str = "trades") -> bool:
+    """Konunun soketi şu an açık mı?"""
+    mux = _MUXES.get(exchange)
+    route = mux and mux._routes.get(CHANNELS[channel][exchange][0](symbol))
+    return bool(route) and route.conn.ws is not None
+
+
+def supports(exchange: str, channel: str = "trades") -> bool:
+    return exchange in CHANNELS.get(channel, {})
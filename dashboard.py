@@ -1,15 +1,31 @@
+import os
 import sys
+import time
+import asyncio
 import pathlib
 import importlib
-import time
-import requests
+import inspect
 import json
 
+_T0 = time.perf_counter()  # oturum betiğinin başlangıcı (başlangıç raporu için)
+
 import panel as pn
 
-from core.data_streams import restart_stream, TICKS, CANDLES
-from core.helpers_header import header_row, update_header
-import views.chart as chart_view  # grafik modülü
+from core import bus, metrics
+from core.data_streams import open_feed, close_feed
+from core.symbols import fetch_symbols, cached_symbols, canonical, native
+from core.helpers_header import HeaderView
+from core.render import RenderScheduler
+from views.chart import ChartView  # grafik modülü
+from views.session import Session
+
+# Çok süreçli kurulum: borsa soketleri ingest.py’de, veri Redis’ten gelir
+if os.getenv("MARKET_BUS"):
+    bus.enable(os.getenv("MARKET_BUS"))
+
+# Prometheus /metrics (METRICS_PORT + worker no.); betik her oturumda çalışır,
+# start() yalnızca sürecin ilk oturumunda kurar (başarısız bağlanma dahil)
+metrics.start()
 
 # ─── TICKER TAPE CONFIGURATION ───────────────────────────────────────
 TICKER_SYMBOLS = [
@@ -41,7 +57,7 @@ def generate_ticker_pane(symbols):
 """
     srcdoc = embed.replace("'", "&#39;").replace("\n", "")
     iframe = (
-        f"<iframe srcdoc='{srcdoc}' "
+        f"<iframe loading='lazy' srcdoc='{srcdoc}' "
         "style='width:100%;height:60px;border:none;'></iframe>"
     )
     return pn.pane.HTML(iframe, sizing_mode="stretch_width")
@@ -112,7 +128,7 @@ def generate_market_overview_pane(config):
 """
     srcdoc = embed.replace("'", "&#39;").replace("\n", "")
     iframe = (
-        f"<iframe srcdoc='{srcdoc}' "
+        f"<iframe loading='lazy' srcdoc='{srcdoc}' "
         "style='width:100%;height:750px;border:none;'></iframe>"
     )
     return pn.pane.HTML(iframe, sizing_mode="fixed", width=400)
@@ -126,64 +142,6 @@ if str(ROOT) not in sys.path:
 
 pn.extension(sizing_mode="stretch_width")
 
-# ─── SYMBOL FETCHER ────────────────────────────────────────────────
-def fetch_symbols(exchange: str):
-    """
-    Seçilen borsanın USDT-margined perpetual (swap) sözleşme listesini döndürür.
-    Spot veya coin-m sözleşmeler filtrelenmez.
-    """
-    try:
-        if exchange == "Binance":                                        # hâlâ dursun
-            r = requests.get("https://fapi.binance.com/fapi/v1/exchangeInfo", timeout=5)
-            r.raise_for_status()
-            return [s["symbol"] for s in r.json()["symbols"]
-                    if s.get("contractType") == "PERPETUAL"]
-
-        elif exchange == "Bybit":                                       # hâlâ dursun
-            r = requests.get("https://api.bybit.com/v5/market/instruments-info",
-                             params={"category": "linear"}, timeout=5)
-            r.raise_for_status()
-            return [i["symbol"] for i in r.json()["result"]["list"]
-                    if i.get("status") == "Trading"]
-
-        elif exchange == "OKX":
-              # OKX SWAP enstrümanları döner, zaten hepsi USDT-margined
-             r = requests.get(
-                 "https://www.okx.com/api/v5/public/instruments",
-                 params={"instType": "SWAP"},
-                 timeout=5
-             )
-             r.raise_for_status()
-             data = r.json().get("data", [])
-                 # instId’leri al
-             return [item["instId"] for item in data]
-
-        elif exchange == "Bitget":
-            r = requests.get("https://api.bitget.com/api/v2/mix/market/contracts",
-                             params={"productType": "usdt-futures"}, timeout=5)
-            r.raise_for_status()
-            return [i["symbol"] for i in r.json()["data"]
-                    if i.get("status") == "normal"]
-
-        elif exchange in ("HTX", "Huobi"):
-            r = requests.get("https://api.hbdm.com/linear-swap-api/v1/swap_contract_info",
-                             params={"contract_type": "swap"}, timeout=5)
-            r.raise_for_status()
-            return [i["contract_code"].upper() for i in r.json()["data"]]
-
-        elif exchange == "KuCoin":
-            r = requests.get("https://api.kucoin.com/api/v1/contracts/active", timeout=5)
-            r.raise_for_status()
-            return [i["symbol"] for i in r.json()["data"]
-                    if i["type"] == "PERPETUAL" and i["quoteCurrency"] == "USDT"]
-
-        else:
-            return []
-
-    except Exception as e:
-        print(f"[WARN] Symbol fetch failed for {exchange}: {e}")
-        return []
-
 # ─── LEFT PANEL WIDGETS ───────────────────────────────────────────
 price_pane  = pn.pane.Markdown("**0.00**", styles={"font-size":"24pt","text-align":"center"})
 close_pane  = pn.pane.Markdown("*Kapanış ?*", styles={"font-size":"16pt","text-align":"center"})
@@ -192,55 +150,81 @@ delta_pane  = pn.pane.Markdown("", styles={"font-size":"14pt","text-align":"cent
 exch_dd  = pn.widgets.Select(name="Exchange",
              options=["Binance","Bybit","OKX", "Bitget", "HTX", "KuCoin"], value="Binance", width=150)
 sym_dd   = pn.widgets.Select(name="Symbol",
-             options=fetch_symbols("Binance"), value="BTCUSDT", width=150)
+             options=cached_symbols("Binance") or ["BTCUSDT"], value="BTCUSDT", width=150)
 analyze_btn = pn.widgets.Button(name="Analiz Yap",
                 button_type="success", width=150)
 
 # ─── PRICE UPDATER ────────────────────────────────────────────────
 UTC_OFFSET = 3 * 3600  # +03:00
 
+FEED = None  # bu oturumun izlediği ortak akış (core.data_streams.Feed)
+RENDER = RenderScheduler()  # pane güncellemeleri: fark + kare başına tek yama
+
+# Dinamik ondalık hassasiyet
+def fmt(v):
+    if   v >= 1      : return f"{v:,.2f}"
+    elif v >= 0.01   : return f"{v:,.4f}"
+    elif v >= 0.0001 : return f"{v:,.6f}"
+    else              : return f"{v:.8f}"
+
 def _update_prices():
-    if not TICKS:
+    if FEED is None or not FEED.ticks:
         return
 
-    live = TICKS[-1][1]
+    live = FEED.ticks[-1][1]
 
-    # 1) Günlük kapanışı UTC+3 00:00 mumundan al, yoksa live
-    try:
-        daily = next(
-            c[4] for c in CANDLES["1m"]
-            if time.gmtime(c[0] + UTC_OFFSET).tm_hour == 0
-               and time.gmtime(c[0] + UTC_OFFSET).tm_min == 0
-        )
-    except StopIteration:
+    # 1) Günlük kapanış: UTC+3 00:00 mumu (feed’de gün başına bir kez bulunur), yoksa live
+    daily = FEED.day_close(UTC_OFFSET)
+    if daily is None:
         daily = live
 
-    # 2) Dinamik ondalık hassasiyet
-    def fmt(v):
-        if   v >= 1      : return f"{v:,.2f}"
-        elif v >= 0.01   : return f"{v:,.4f}"
-        elif v >= 0.0001 : return f"{v:,.6f}"
-        else              : return f"{v:.8f}"
-
-    price_pane.object = f"**{fmt(live)}**"
-    close_pane.object = f"*Kapanış {fmt(daily)}*"
-
-    # 3) Yüzde değişim
+    # 2) Yüzde değişim
     pct   = (live - daily) / daily * 100 if daily else 0
     color = "#29cf82" if pct >= 0 else "#ef5350"
     sign  = "+" if pct >= 0 else ""
-    delta_pane.object = f"<span style='color:{color}'>{sign}{pct:,.2f}%</span>"
 
-pn.state.add_periodic_callback(_update_prices, 200)
+    # değişmeyen pane’ler zamanlayıcıda elenir
+    RENDER.set(price_pane, "object", f"**{fmt(live)}**")
+    RENDER.set(close_pane, "object", f"*Kapanış {fmt(daily)}*")
+    RENDER.set(delta_pane, "object", f"<span style='color:{color}'>{sign}{pct:,.2f}%</span>")
+
+# Tick geldiğinde (olay güdümlü) güncelle; bir karedeki tüm tick’ler tek
+# hesaplama ve tek doküman yamasında birleşir.
+def _on_tick(*_):
+    RENDER.schedule(_update_prices)
+
+def _switch_feed(exchange, symbol):
+    """Oturumu yeni (borsa, sembol) akışına taşı; eskisini bırak."""
+    global FEED
+    new = open_feed(exchange, symbol)
+    if FEED is not None:
+        FEED.unsubscribe(on_tick=_on_tick)
+        close_feed(FEED)
+    FEED = new
+    FEED.subscribe(on_tick=_on_tick)
+
+def _on_session_destroyed(ctx):
+    chart_view.close()
+    SESSION.destroy()
+    if FEED is not None:
+        FEED.unsubscribe(on_tick=_on_tick)
+        close_feed(FEED)
+
+pn.state.on_session_destroyed(_on_session_destroyed)
 
 # ─── PANEL YÜKLEYİCİ ─────────────────────────────────────────────
+chart_view = ChartView(RENDER)  # oturuma özel; veriyi FEED’den sunucu tarafında alır
+header = HeaderView(RENDER)     # oturuma özel başlık pane’leri
+SESSION = Session(RENDER)       # görünümlerin izlediği borsa/sembol
+
 def load_panel(name: str):
     if name == "Chart":
-        return chart_view.panel()
+        return chart_view
     module_name = name.lower().replace(" ", "")
     try:
         mod = importlib.import_module(f"views.{module_name}")
-        return mod.panel()
+        # bağlam isteyen görünümler: panel(session)
+        return mod.panel(SESSION) if inspect.signature(mod.panel).parameters else mod.panel()
     except ModuleNotFoundError:
         return pn.pane.Markdown(f"**{name} view is not available.**", styles={"color":"red"})
 
@@ -249,40 +233,106 @@ MENU = [
     "Liquidations","Open Interest","Funding rate",
     "Crypto Coins Heatmap","Stock Heatmap Widget"
 ]
-tabs = pn.Tabs(*( (n, load_panel(n)) for n in MENU ), active=0, sizing_mode="stretch_both")
+# Sekmeler ilk açıldıklarında kurulur; o zamana dek hafif bir yer tutucu durur.
+def _placeholder(name):
+    return pn.pane.Markdown(f"*{name} yükleniyor…*", styles={"color": "#888"})
+
+tabs = pn.Tabs(*((n, _placeholder(n)) for n in MENU), active=0,
+               dynamic=True, sizing_mode="stretch_both")
+_built = set()
+
+def _build_tab(i):
+    name = MENU[i]
+    if name in _built:
+        return
+    _built.add(name)
+    t = time.perf_counter()
+    tabs[i] = (name, load_panel(name))
+    STARTUP[f"tab:{name}"] = (time.perf_counter() - t) * 1000
+
+tabs.param.watch(lambda evt: _build_tab(evt.new), "active")
 
 # ─── CALLBACKS ─────────────────────────────────────────────────────
-def _refresh():
-    restart_stream(exch_dd.value, sym_dd.value)
-    update_header(sym_dd.value)
-    if hasattr(chart_view, "update_chart"):
-        chart_view.update_chart(exch_dd.value, sym_dd.value)
-
-def _on_exchange(evt):
-    new_opts = fetch_symbols(evt.new)
+_REFRESH = 0  # son başlatılan _refresh’in sırası; eskiler await sonrası sonuç bırakır
+
+async def _refresh():
+    global _REFRESH
+    _REFRESH += 1
+    gen = _REFRESH
+    exchange, symbol = exch_dd.value, sym_dd.value
+    if FEED is None or FEED.key != (exchange, symbol):
+        _switch_feed(exchange, symbol)
+    feed = FEED                      # await sonrası global FEED başka bir akış olabilir
+    await feed.ready.wait()
+    if gen != _REFRESH:              # arada yeni piyasa seçildi; görünümler onun
+        return
+    _update_prices()
+    chart_view.set_feed(feed)
+    SESSION.param.update(exchange=exchange, symbol=symbol)
+    await header.update(symbol, exchange)
+
+async def _on_exchange(evt):
+    RENDER.touch()
+    new_opts = await fetch_symbols(evt.new)
+    # aynı coin yeni borsada da varsa onu seç (BTCUSDT → BTC-USDT-SWAP …)
+    same = native(evt.new, canonical(evt.old, sym_dd.value) or "")
     sym_dd.options = new_opts
-    if new_opts:
-        sym_dd.value = new_opts[0]
-    _refresh()
+    pick = same or (new_opts[0] if new_opts else None)
+    if pick and sym_dd.value != pick:
+        sym_dd.value = pick              # sembol watcher’ı _refresh’i çağırır
+    else:
+        await _refresh()
+
+async def _on_symbol(evt):
+    RENDER.touch()
+    await _refresh()
 
 exch_dd.param.watch(_on_exchange, "value")
-sym_dd.param.watch(lambda e: _refresh(), "value")
+sym_dd.param.watch(_on_symbol, "value")
 
 # ─── LAYOUT & SERVE ───────────────────────────────────────────────
 left_panel = pn.Column(
     price_pane, close_pane, delta_pane,
     exch_dd, sym_dd,
     pn.Spacer(height=10), analyze_btn,
+    RENDER.watcher,
     width=200
 )
 
 layout = pn.Column(
     ticker_pane,
-    header_row,
+    header.row,
     pn.Row(left_panel, tabs, market_overview_pane, sizing_mode="stretch_width")
 )
 
 layout.servable(title="Kripto Analiz Tahtası")
 
+# ─── BAŞLANGIÇ RAPORU ─────────────────────────────────────────────
+# Oturum başına ms cinsinden: betik kurulumu, tarayıcının bağlanması (onload),
+# ilk veri (feed hazır + fiyat), sekme kurulumları.
+STARTUP = {"build": (time.perf_counter() - _T0) * 1000}
+
+def _report():
+    print("[STARTUP] " + "  ".join(f"{k}={v:.0f}ms" for k, v in STARTUP.items()))
+
 # ─── İLK ÇAĞRI ────────────────────────────────────────────────────
-_refresh()
+# Sayfa, veri beklenmeden hemen gönderilir; fiyat/grafik yer tutucu
+# (loading) ile açılır, veri onload’da arka planda yüklenir.
+left_panel.loading = chart_view.chart.loading = True
+
+async def _load_symbols():
+    opts = await fetch_symbols(exch_dd.value)
+    if opts:
+        sym_dd.options = opts
+
+async def _initial_load():
+    STARTUP["onload"] = (time.perf_counter() - _T0) * 1000
+    _build_tab(tabs.active)
+    try:
+        await asyncio.gather(_load_symbols(), _refresh())
+    finally:
+        left_panel.loading = chart_view.chart.loading = False
+    STARTUP["data"] = (time.perf_counter() - _T0) * 1000
+    _report()
+
+pn.state.onload(_initial_load)
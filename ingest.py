@@ -0,0 +1,37 @@
+# ingest.py
+"""
+Borsa akışlarının sahibi olan ayrı süreç (core.bus).
+Dashboard worker’ları MARKET_BUS ile aynı Redis’e bağlanır ve istedikleri
+akışları buradan okur; böylece birden çok Panel süreci tek bir soket kümesi
+paylaşır.
+
+    MARKET_BUS=redis://localhost:6379/0 python ingest.py
+    MARKET_BUS=redis://localhost:6379/0 panel serve dashboard.py --num-procs 4 …
+
+Ölçümler INGEST_METRICS_PORT’ta (varsayılan 5099; METRICS_PORT=off kapatır)
+/metrics olarak yayınlanır – dashboard worker’larının METRICS_PORT + i
+portlarıyla çakışmaz.
+"""
+
+import asyncio, os, sys
+
+from core import bus, metrics
+
+
+async def _run(url):
+    if metrics.PORT is not None:
+        metrics.start(int(os.getenv("INGEST_METRICS_PORT", "5099")))
+    await bus.ingest(bus.connect(url))
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else os.getenv("MARKET_BUS", "redis://localhost:6379/0")
+    print(f"[BUS] ingest → {url}")
+    try:
+        asyncio.run(_run(url))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# tools/bench_decode.py
+"""
+WebSocket çözümleme benchmark’ı.
+Kaydedilmiş çerçeveleri (JSONL: {"ex": "Binance", "raw": "...", "b64": false})
+ya da verilmezse borsa formatında üretilmiş örnek çerçeveleri tekrar oynatır.
+Her borsa ve JSON arka ucu için saniyedeki mesaj / trade sayısını raporlar;
+--sink ile trade’ler bir Feed’in sütun tamponlarına da yazılır (tam yol).
+
+    python -m tools.bench_decode [--frames kayit.jsonl] [--n 50000] [--sink]
+"""
+
+import argparse, base64, gzip, json, random, sys, time
+from collections import defaultdict
+
+from core import decode
+
+
+def _synthetic(n_per_ex=20_000, per_frame=3):
+    """Borsaların gerçek çerçeve şekillerinde rastgele trade’ler."""
+    rnd = random.Random(7)
+    t0 = 1_700_000_000_000
+    frames = defaultdict(list)
+    for i in range(n_per_ex):
+        ts = t0 + i * 50
+        px = lambda: f"{60_000 + rnd.random() * 100:.1f}"
+        qty = lambda: f"{rnd.random():.3f}"
+        frames["Binance"].append(json.dumps({"stream": "btcusdt@aggTrade", "data": {
+            "e": "aggTrade", "E": ts, "s": "BTCUSDT", "a": i, "p": px(), "q": qty(),
+            "f": i, "l": i, "T": ts, "m": rnd.random() < .5}}))
+        frames["Bybit"].append(json.dumps({"topic": "publicTrade.BTCUSDT", "type": "snapshot",
+            "ts": ts, "data": [{"T": ts, "s": "BTCUSDT", "S": rnd.choice(("Buy", "Sell")),
+                                "v": qty(), "p": px(), "L": "PlusTick", "i": str(i), "BT": False}
+                               for _ in range(per_frame)]}))
+        frames["OKX"].append(json.dumps({"arg": {"channel": "trades", "instId": "BTC-USDT-SWAP"},
+            "data": [{"instId": "BTC-USDT-SWAP", "tradeId": str(i), "px": px(), "sz": qty(),
+                      "side": rnd.choice(("buy", "sell")), "ts": str(ts)}
+                     for _ in range(per_frame)]}))
+        frames["Bitget"].append(json.dumps({"action": "update",
+            "arg": {"instType": "USDT-FUTURES", "channel": "trade", "instId": "BTCUSDT"},
+            "data": [{"ts": str(ts), "price": px(), "size": qty(),
+                      "side": rnd.choice(("buy", "sell")), "tradeId": str(i)}
+                     for _ in range(per_frame)], "ts": ts}))
+        frames["HTX"].append(gzip.compress(json.dumps({"ch": "market.BTC-USDT.trade.detail",
+            "ts": ts, "tick": {"id": i, "ts": ts, "data": [
+                {"amount": 2, "quantity": float(qty()), "ts": ts, "id": i, "price": float(px()),
+                 "direction": rnd.choice(("buy", "sell"))} for _ in range(per_frame)]}}).encode()))
+    return frames
+
+
+def _load(path):
+    frames = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            rec = json.loads(line)
+            if rec.get("kind", "ws") != "ws":            # tools.replay kaydındaki REST/meta satırları
+                continue
+            raw = base64.b64decode(rec["raw"]) if rec.get("b64") else rec["raw"]
+            frames[rec["ex"]].append(raw)
+    return frames
+
+
+def _run(ex, raws, loads, sink=None):
+    dec = decode.DECODERS.get(ex)
+    if dec is None:
+        return None
+    trades = 0
+    t0 = time.perf_counter()
+    for raw in raws:
+        if isinstance(raw, bytes) and raw[:2] == b"\x1f\x8b":
+            raw = decode.gunzip(raw)
+        batch = dec(loads(raw))
+        if batch:
+            trades += len(batch[0])
+            if sink is not None:
+                sink(*batch)
+    took = time.perf_counter() - t0
+    return len(raws) / took, trades / took
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="WS çözümleme benchmark’ı")
+    ap.add_argument("--frames", help="kaydedilmiş çerçeveler (JSONL)")
+    ap.add_argument("--n", type=int, default=20_000, help="borsa başına örnek çerçeve")
+    ap.add_argument("--sink", action="store_true", help="trade’leri Feed tamponlarına da yaz")
+    a = ap.parse_args(argv)
+
+    frames = _load(a.frames) if a.frames else _synthetic(a.n)
+    backends = {"json": json.loads}
+    try:
+        import orjson
+        backends["orjson"] = orjson.loads
+    except ImportError:
+        pass
+
+    print(f"{'borsa':8} {'backend':7} {'mesaj/s':>12} {'trade/s':>12}")
+    for ex, raws in frames.items():
+        for name, loads in backends.items():
+            sink = None
+            if a.sink:
+                from core.data_streams import Feed
+                sink = Feed(ex, "BENCH").on_trades
+            res = _run(ex, raws, loads, sink)
+            if res:
+                print(f"{ex:8} {name:7} {res[0]:>12,.0f} {res[1]:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
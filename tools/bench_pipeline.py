@@ -0,0 +1,160 @@
+# tools/bench_pipeline.py
+"""
+Veri hattı benchmark paketi (tools.replay üzerinde, ağsız).
+Kayıt (tools.replay record) ya da sentetik çerçeveler ws_mux → Feed →
+CandleAggregator hattına beslenir ve şunlar raporlanır:
+  • ingest   : mesaj/s, trade/s (en yüksek hız)
+  • latency  : çerçeve başına tick → mum süresi (çözme + tampon + toplayıcı +
+               aboneler) p50/p90/p99/max µs; --speed verilirse planlanan zamana
+               göre gecikme yüzdelikleri de
+  • alloc    : mesaj başına tepe (geçici) bayt ve kalıcı blok sayısı
+               (tracemalloc + sys.getallocatedblocks; CPython kümülatif tahsis
+               sayacı sunmadığından bu ikisi birlikte raporlanır)
+  • memory   : sembol başına Feed belleği (tamponlar dolu iken)
+  • df       : df_candles(tf, partial=True) çağrı süresi
+--json ile sonuçlar dosyaya yazılır; --baseline verilirse ingest ve p99
+`--tolerance` oranından fazla kötüleşince çıkış kodu 1 olur (CI için).
+
+    python -m tools.bench_pipeline [--rec rec.jsonl] [--speed 100] [--json out.json]
+        [--baseline base.json --tolerance 0.25]
+"""
+
+import argparse, asyncio, gc, json, sys, time, tracemalloc
+
+import numpy as np
+
+from tools.replay import Recording, offline, play, start_feeds, stop_feeds
+from core.data_streams import Feed
+from core.candles import TF_SECONDS
+
+
+def _pct(ns, qs=(50, 90, 99)):
+    us = np.asarray(ns) / 1_000
+    return {**{f"p{q}": float(np.percentile(us, q)) for q in qs}, "max": float(us.max())}
+
+
+async def bench_ingest(rec, speed=None):
+    with offline(rec):
+        feeds = await start_feeds(rec.feeds)
+        t0 = time.perf_counter()
+        work, lag = await play(rec, speed)
+        took = time.perf_counter() - t0
+        trades = sum(f.ticks.total for f in feeds.values())
+        df = {}
+        for tf in TF_SECONDS:
+            f = next(iter(feeds.values()))
+            t = time.perf_counter()
+            for _ in range(20):
+                f.df_candles(tf, partial=True)
+            df[tf] = (time.perf_counter() - t) / 20 * 1_000
+        stop_feeds(feeds)
+    out = {"frames": len(work), "trades": trades, "seconds": took,
+           "msg_per_s": len(work) / took, "trades_per_s": trades / took,
+           "tick_to_candle_us": _pct(work), "df_candles_ms": df}
+    if speed:
+        out["lag_us"] = _pct(lag)
+    return out
+
+
+async def bench_alloc(rec, n=20_000):
+    frames = rec.frames[:n]
+    with offline(rec):
+        feeds = await start_feeds(rec.feeds)
+        await play(rec, None, frames[:1_000])            # ısınma (ilk tahsisler)
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await play(rec, None, frames[1_000:])
+        cur, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.collect()
+        retained = sys.getallocatedblocks() - blocks
+        stop_feeds(feeds)
+    msgs = max(1, len(frames) - 1_000)
+    return {"messages": msgs, "peak_bytes_per_msg": (peak - base) / msgs,
+            "retained_bytes_per_msg": (cur - base) / msgs,
+            "retained_blocks_per_msg": retained / msgs}
+
+
+def bench_memory(symbols=10, trades=20_000):
+    """Tamponları dolu `symbols` Feed’in toplam belleği / sembol."""
+    rnd = np.random.default_rng(1)
+    ts = (1_700_000_000 + np.arange(trades) // 10).tolist()
+    px = (60_000 + rnd.normal(0, 5, trades).cumsum()).tolist()
+    qty = rnd.random(trades).tolist()
+    side = rnd.choice([1, -1], trades).tolist()
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    feeds = []
+    for i in range(symbols):
+        f = Feed("Bench", f"SYM{i}")
+        for j in range(0, trades, 100):
+            f.on_trades(ts[j:j + 100], px[j:j + 100], qty[j:j + 100], side[j:j + 100])
+        feeds.append(f)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return {"symbols": symbols, "bytes_per_symbol": used / symbols}
+
+
+def _report(res):
+    ing = res["ingest"]
+    print(f"ingest   {ing['frames']:,} msgs / {ing['trades']:,} trades in {ing['seconds']:.2f}s"
+          f"  →  {ing['msg_per_s']:,.0f} msg/s, {ing['trades_per_s']:,.0f} trade/s")
+    lat = ing["tick_to_candle_us"]
+    print("latency  tick→candle µs  " + "  ".join(f"{k}={v:,.1f}" for k, v in lat.items()))
+    if "lag_us" in ing:
+        print("         lag µs          " + "  ".join(f"{k}={v:,.1f}" for k, v in ing["lag_us"].items()))
+    al = res["alloc"]
+    print(f"alloc    peak {al['peak_bytes_per_msg']:,.0f} B/msg, retained "
+          f"{al['retained_bytes_per_msg']:,.1f} B/msg, {al['retained_blocks_per_msg']:.3f} blocks/msg")
+    print(f"memory   {res['memory']['bytes_per_symbol'] / 1024:,.0f} KiB/symbol")
+    print("df       " + "  ".join(f"{tf}={ms:.2f}ms" for tf, ms in ing["df_candles_ms"].items()))
+
+
+def _regressions(res, base, tol):
+    bad = []
+    a, b = res["ingest"], base["ingest"]
+    if a["msg_per_s"] < b["msg_per_s"] * (1 - tol):
+        bad.append(f"msg/s {a['msg_per_s']:,.0f} < {b['msg_per_s']:,.0f}")
+    if a["tick_to_candle_us"]["p99"] > b["tick_to_candle_us"]["p99"] * (1 + tol):
+        bad.append(f"p99 {a['tick_to_candle_us']['p99']:.1f}µs > "
+                   f"{b['tick_to_candle_us']['p99']:.1f}µs")
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rec", help="tools.replay kaydı (JSONL); yoksa sentetik")
+    ap.add_argument("--n", type=int, default=20_000, help="sentetik: borsa başına çerçeve")
+    ap.add_argument("--speed", type=float, default=None, help="1, 100 … (boş: en yüksek)")
+    ap.add_argument("--symbols", type=int, default=10, help="bellek ölçümü için Feed sayısı")
+    ap.add_argument("--json", help="sonuçları yaz")
+    ap.add_argument("--baseline", help="önceki --json çıktısı")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    a = ap.parse_args(argv)
+
+    rec = Recording.load(a.rec) if a.rec else Recording.synthetic(a.n)
+    res = {"recording": a.rec or "synthetic", "speed": a.speed,
+           "ingest": asyncio.run(bench_ingest(rec, a.speed)),
+           "alloc": asyncio.run(bench_alloc(rec)),
+           "memory": bench_memory(a.symbols)}
+    _report(res)
+    if a.json:
+        with open(a.json, "w") as f:
+            json.dump(res, f, indent=1)
+    if a.baseline:
+        with open(a.baseline) as f:
+            bad = _regressions(res, json.load(f), a.tolerance)
+        for line in bad:
+            print("REGRESSION", line)
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# tools/fake_ws.py
+"""
+Yeniden bağlanma + boşluk doldurma deneme düzeneği.
+Yerel sahte bir Binance combined-stream sunucusu aggTrade çerçeveleri üretir;
+belirli aralıklarla bağlantıyı koparır (kopukken üretilen trade’ler gönderilmez)
+ve bağlıyken ara sıra çerçeve atlar (kimlik boşluğu). Feed ws_mux üzerinden
+bu sunucuya bağlanır, REST kline’ları sunucunun "gerçek" trade listesinden
+hesaplanır. Sonunda kapanmış 1m mumlar gerçekle karşılaştırılır.
+
+Zaman hızlandırılmıştır: 1 gerçek saniye = `--speed` simülasyon saniyesi.
+
+    python -m tools.fake_ws [--seconds 25] [--drop-every 4] [--down 1.5] [--speed 60]
+"""
+
+import argparse, asyncio, json, os, random, sys, time, types
+
+import numpy as np
+import websockets
+
+os.environ["CANDLE_STORE_DIR"] = "off"              # diske yazma
+
+from core import history, ws_mux
+from core.candles import resample
+from core.data_streams import Feed
+
+T0 = 1_700_000_000
+
+
+class Clock:
+    def __init__(self, speed):
+        self.speed, self.m0 = speed, time.monotonic()
+
+    def time(self):
+        return T0 + (time.monotonic() - self.m0) * self.speed
+
+
+class FakeExchange:
+    """Trade üretir, gerçeği saklar, bağlı istemcilere (kopmalarla) yayınlar."""
+
+    def __init__(self, clock, rate=50, skip_prob=0.01):
+        self.clock, self.rate, self.skip_prob = clock, rate, skip_prob
+        self.truth = []                                # (ts, px, qty)
+        self.clients = set()
+        self.up = True
+        self.drops = self.skips = 0
+        self._rnd = random.Random(1)
+        self._px = 60_000.0
+
+    async def handler(self, ws):
+        await ws.recv()                                # SUBSCRIBE
+        if not self.up:
+            await ws.close()
+            return
+        self.clients.add(ws)
+        try:
+            await ws.wait_closed()
+        finally:
+            self.clients.discard(ws)
+
+    async def produce(self):
+        i = 0
+        while True:
+            await asyncio.sleep(1 / self.rate)
+            ts = self.clock.time()
+            self._px += self._rnd.gauss(0, 5)
+            qty = round(self._rnd.random(), 3)
+            self.truth.append((ts, self._px, qty))
+            frame = json.dumps({"stream": "btcusdt@aggTrade", "data": {
+                "e": "aggTrade", "E": int(ts * 1000), "s": "BTCUSDT", "a": i,
+                "p": f"{self._px:.2f}", "q": f"{qty}", "T": int(ts * 1000),
+                "m": self._rnd.random() < .5}})
+            i += 1
+            if not self.up or not self.clients:
+                continue
+            if self._rnd.random() < self.skip_prob:      # bağlıyken çerçeve kaybı
+                self.skips += 1
+                continue
+            for ws in list(self.clients):
+                try:
+                    await ws.send(frame)
+                except websockets.ConnectionClosed:
+                    pass
+
+    async def flap(self, every, down):
+        while True:
+            await asyncio.sleep(every)
+            self.up = False
+            self.drops += 1
+            for ws in list(self.clients):
+                await ws.close()
+            await asyncio.sleep(down)
+            self.up = True
+
+    def klines(self, start, end=None):
+        """Gerçek trade’lerden [start, end) 1m barları."""
+        if not self.truth:
+            return history._empty()
+        ts, px, qty = (np.array(c) for c in zip(*self.truth))
+        ts = ts.astype(np.int64)
+        m = (ts >= start) & (ts < (end if end is not None else ts[-1] + 60))
+        if not m.any():
+            return history._empty()
+        return resample(ts[m], px[m], px[m], px[m], px[m], qty[m], 60)
+
+
+async def main(a):
+    clock = Clock(a.speed)
+    ex = FakeExchange(clock)
+    fills = []
+
+    async def fake_fetch(exchange, symbol, tf="1m", start=None, end=None, bars=None):
+        fills.append(start)
+        return ex.klines(start if start is not None else 0,
+                         None if end is None else end + 1)
+
+    history.fetch_klines = fake_fetch
+    ws_mux.time = types.SimpleNamespace(time=clock.time)   # since = simülasyon saati
+
+    async with websockets.serve(ex.handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        ws_mux.SPECS["Binance"]["uri"] = f"ws://127.0.0.1:{port}"
+        tasks = [asyncio.create_task(ex.produce()),
+                 asyncio.create_task(ex.flap(a.drop_every, a.down))]
+        feed = Feed("Binance", "BTCUSDT")
+        feed.start()
+        await asyncio.sleep(a.seconds)
+        ex.up = False                                  # son dolumlar bitsin
+        await asyncio.sleep(2)
+        conns = list(ws_mux._MUXES["Binance"].conns)
+        feed.stop()
+        for t in tasks:
+            t.cancel()
+
+    sessions = sum(c.sessions for c in conns)
+    got = feed.candles["1m"].last()
+    want = ex.klines(int(got["epoch"][0]) if len(got["epoch"]) else T0)
+    want = {int(e): row for e, *row in zip(*want)}
+    bad = [int(e) for e, o, h, l, c, v in zip(*(got[k] for k in got))
+           if not np.allclose(want.get(int(e), (np.nan,) * 5), (o, h, l, c, v))]
+    first, last = int(got["epoch"][0]), int(got["epoch"][-1])
+    missing = [e for e in range(first, last + 1, 60) if e not in set(got["epoch"].tolist())]
+
+    print(f"drops={ex.drops}  skipped frames={ex.skips}  gap fills={len(fills) - 1}"
+          f"  sessions={sessions}")
+    print(f"closed 1m bars={len(got['epoch'])}  missing={len(missing)}  mismatched={len(bad)}")
+    ok = not missing and not bad and len(got["epoch"]) > 0
+    print("OK" if ok else f"FAIL missing={missing[:5]} bad={bad[:5]}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--seconds", type=float, default=25)
+    p.add_argument("--drop-every", type=float, default=4)
+    p.add_argument("--down", type=float, default=1.5)
+    p.add_argument("--speed", type=float, default=60)
+    sys.exit(asyncio.run(main(p.parse_args())))
@@ -0,0 +1,81 @@
+# tools/loop_block_check.py
+"""
+core.rest için yerel stub-sunucu düzeneği.
+Yavaş cevap veren (gecikmeli) bir HTTP sunucusu başlatır, üzerine çok sayıda
+eşzamanlı `rest.get_json` isteği gönderir ve bu sırada olay döngüsünün ne
+kadar geciktiğini ölçer. En büyük gecikme bütçeyi aşarsa çıkış kodu 1’dir.
+
+    python -m tools.loop_block_check --requests 200 --delay 0.3 --budget 0.05
+"""
+
+import argparse, asyncio, json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import rest
+
+REST_DELAY = 0.3
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"                     # keep-alive
+
+    def do_GET(self):
+        time.sleep(REST_DELAY)                        # yavaş borsa taklidi
+        body = json.dumps({"data": [[i, 1.0, 2.0] for i in range(500)]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+async def _lag_monitor(stop: asyncio.Event, tick=0.01):
+    worst = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(tick)
+        worst = max(worst, loop.time() - t0 - tick)
+    return worst
+
+
+async def _run(n, url):
+    await rest.get_json(url)                          # ısınma: havuz + tembel importlar
+    stop = asyncio.Event()
+    mon = asyncio.create_task(_lag_monitor(stop))
+    t0 = time.perf_counter()
+    res = await asyncio.gather(*(rest.get_json(url, params={"i": i}) for i in range(n)),
+                               return_exceptions=True)
+    took = time.perf_counter() - t0
+    stop.set()
+    worst = await mon
+    await rest.aclose()
+    errors = sum(isinstance(r, Exception) for r in res)
+    return took, worst, errors
+
+
+def main(argv=None):
+    global REST_DELAY
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--delay", type=float, default=0.3, help="stub cevap gecikmesi (s)")
+    ap.add_argument("--budget", type=float, default=0.05, help="izin verilen en büyük döngü gecikmesi (s)")
+    a = ap.parse_args(argv)
+    REST_DELAY = a.delay
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_address[1]}/klines"
+
+    took, worst, errors = asyncio.run(_run(a.requests, url))
+    srv.shutdown()
+    print(f"{a.requests} istek  {took:.2f}s  hata={errors}  "
+          f"en büyük döngü gecikmesi={worst*1000:.1f} ms  (bütçe {a.budget*1000:.0f} ms)")
+    return 0 if worst <= a.budget and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
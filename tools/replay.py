@@ -0,0 +1,217 @@
+# tools/replay.py
+"""
+Kayıt / tekrar oynatma düzeneği (canlı borsa gerektirmeden ölçüm için).
+• record: gerçek Feed’ler açılır; ws_mux’a gelen ham çerçeveler ve core.rest
+  cevapları zaman damgasıyla JSONL’e yazılır. WS satırları bench_decode
+  biçimindedir ({"ex", "raw", "b64"} + "t"), REST satırları "kind": "rest".
+• replay: kayıt aynı hatta geri beslenir – ws_mux.ExchangeMux.dispatch →
+  çözücü → Feed.on_trades → CandleAggregator; REST istekleri (geçmiş mumlar)
+  kayıttan cevaplanır, soket açılmaz. Hız 1×, 100× … ya da en yüksek (None).
+  Kayıt verilmezse bench_decode’un sentetik çerçeveleri kullanılır.
+
+    python -m tools.replay record --feed Binance:BTCUSDT --feed OKX:BTC-USDT-SWAP \\
+        --seconds 120 --out rec.jsonl
+    python -m tools.replay play rec.jsonl [--speed 100]
+"""
+
+import argparse, asyncio, base64, contextlib, json, os, sys, time
+from collections import defaultdict, deque
+
+import numpy as np
+
+os.environ.setdefault("CANDLE_STORE_DIR", "off")    # ölçümler diske yazmasın / okumasın
+
+from core import data_streams, decode, rest, ws_mux
+from core.data_streams import Feed
+
+SYNTH_SYMBOLS = {"Binance": "BTCUSDT", "Bybit": "BTCUSDT", "OKX": "BTC-USDT-SWAP",
+                 "Bitget": "BTCUSDT", "HTX": "BTC-USDT"}
+
+
+# ........................ kayıt
+class Recording:
+    """Frames (t, exchange, raw) and REST bodies per URL, in recorded order."""
+
+    def __init__(self, feeds, frames, rest_bodies=None):
+        self.feeds = feeds                                # [(exchange, symbol)]
+        self.frames = frames                              # [(t, exchange, raw)] – t’ye göre sıralı
+        self.rest = rest_bodies or {}                     # url → [gövde, …]
+
+    @classmethod
+    def load(cls, path):
+        feeds, frames, bodies = [], [], defaultdict(list)
+        with open(path) as f:
+            for line in f:
+                rec = json.loads(line)
+                kind = rec.get("kind", "ws")
+                if kind == "meta":
+                    feeds = [tuple(x) for x in rec["feeds"]]
+                elif kind == "rest":
+                    bodies[rec["url"]].append(rec["body"])
+                else:
+                    raw = base64.b64decode(rec["raw"]) if rec.get("b64") else rec["raw"]
+                    frames.append((rec.get("t", 0.0), rec["ex"], raw))
+        frames.sort(key=lambda x: x[0])
+        return cls(feeds, frames, bodies)
+
+    @classmethod
+    def synthetic(cls, n_per_ex=20_000):
+        from tools.bench_decode import _synthetic
+        frames = []
+        for ex, raws in _synthetic(n_per_ex).items():
+            frames += [(i * 0.05, ex, raw) for i, raw in enumerate(raws)]   # 20 çerçeve/sn
+        frames.sort(key=lambda x: x[0])
+        return cls(list(SYNTH_SYMBOLS.items()), frames)
+
+    @property
+    def duration(self):
+        return self.frames[-1][0] if self.frames else 0.0
+
+
+async def record(feeds, seconds, out):
+    """Gerçek akışları `seconds` boyunca kaydet."""
+    t0 = time.monotonic()
+    f = open(out, "w")
+    f.write(json.dumps({"kind": "meta", "t0": time.time(), "feeds": feeds}) + "\n")
+    counts = defaultdict(int)
+    dispatch, request = ws_mux.ExchangeMux.dispatch, rest.request
+
+    def rec_dispatch(self, raw):
+        b64 = isinstance(raw, bytes)
+        f.write(json.dumps({"t": round(time.monotonic() - t0, 6), "ex": self.exchange,
+                            "raw": base64.b64encode(raw).decode() if b64 else raw,
+                            "b64": b64}) + "\n")
+        counts[self.exchange] += 1
+        return dispatch(self, raw)
+
+    async def rec_request(method, url, **kw):
+        r = await request(method, url, **kw)
+        f.write(json.dumps({"t": round(time.monotonic() - t0, 6), "kind": "rest",
+                            "method": method, "url": url, "params": kw.get("params"),
+                            "body": r.text}) + "\n")
+        counts["rest"] += 1
+        return r
+
+    ws_mux.ExchangeMux.dispatch, rest.request = rec_dispatch, rec_request
+    try:
+        opened = [data_streams.open_feed(ex, sym) for ex, sym in feeds]
+        await asyncio.sleep(seconds)
+        for feed in opened:
+            data_streams.close_feed(feed)
+    finally:
+        ws_mux.ExchangeMux.dispatch, rest.request = dispatch, request
+        f.close()
+    return dict(counts)
+
+
+# ........................ tekrar oynatma
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return decode.loads(self.text)
+
+
+@contextlib.contextmanager
+def offline(recording):
+    """Soket açılmaz, REST kayıttan gelir (URL başına kayıt sırasıyla)."""
+    queues = {url: deque(bodies) for url, bodies in recording.rest.items()}
+
+    async def request(method, url, **kw):
+        q = queues.get(url)
+        if not q:
+            raise ConnectionError(f"replay: no recorded response for {url}")
+        return _Response(q.popleft() if len(q) > 1 else q[0])
+
+    def no_socket(conn):                                  # kapatılabilir boş görev
+        conn.task = asyncio.get_running_loop().create_future()
+
+    saved = rest.request, ws_mux._Conn.start, data_streams._POLLERS
+    rest.request = request
+    ws_mux._Conn.start = no_socket
+    data_streams._POLLERS = {}
+    try:
+        yield
+    finally:
+        rest.request, ws_mux._Conn.start, data_streams._POLLERS = saved
+
+
+async def start_feeds(feeds):
+    out = {}
+    for ex, sym in feeds:
+        feed = out[(ex, sym)] = Feed(ex, sym)
+        feed.start()
+    await asyncio.gather(*(f.ready.wait() for f in out.values()))
+    await asyncio.sleep(0)                                # abonelikler yerleşsin
+    return out
+
+
+def stop_feeds(feeds):
+    for feed in feeds.values():
+        feed.stop()
+
+
+async def play(recording, speed=None, frames=None):
+    """Çerçeveleri ws_mux’a besle. Çerçeve başına işlem süresi (ns) ve – hız
+    verildiyse – planlanan zamana göre gecikme (ns) dizilerini döndür."""
+    frames = recording.frames if frames is None else frames
+    muxes = ws_mux._MUXES
+    work = np.empty(len(frames), np.int64)
+    lag = np.zeros(len(frames), np.int64)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    clock = time.perf_counter_ns
+    for i, (t, ex, raw) in enumerate(frames):
+        if speed:
+            delay = start + t / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag[i] = max(0.0, loop.time() - start - t / speed) * 1e9
+        elif i % 1_000 == 0:
+            await asyncio.sleep(0)
+        t0 = clock()
+        muxes[ex].dispatch(raw)
+        work[i] = clock() - t0
+    return work, lag
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("record")
+    r.add_argument("--feed", action="append", required=True, help="Borsa:SEMBOL")
+    r.add_argument("--seconds", type=float, default=60)
+    r.add_argument("--out", required=True)
+    p = sub.add_parser("play")
+    p.add_argument("recording", nargs="?")
+    p.add_argument("--speed", type=float, default=None, help="1, 100 … (boş: en yüksek)")
+    a = ap.parse_args(argv)
+
+    if a.cmd == "record":
+        feeds = [tuple(x.split(":", 1)) for x in a.feed]
+        counts = asyncio.run(record(feeds, a.seconds, a.out))
+        print(f"recorded → {a.out}: {counts}")
+        return 0
+
+    rec = Recording.load(a.recording) if a.recording else Recording.synthetic()
+
+    async def run():
+        with offline(rec):
+            feeds = await start_feeds(rec.feeds)
+            t0 = time.perf_counter()
+            work, _ = await play(rec, a.speed)
+            took = time.perf_counter() - t0
+            for (ex, sym), feed in feeds.items():
+                df = feed.df_candles("1m", partial=True)
+                print(f"{ex:8} {sym:16} trades={feed.ticks.total:>8,}  1m bars={len(df):>5}")
+            stop_feeds(feeds)
+        print(f"{len(work):,} frames in {took:.2f}s  "
+              f"(recording spans {rec.duration:.0f}s, speed {a.speed or 'max'})")
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
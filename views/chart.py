@@ -1,16 +1,192 @@
 # views/chart.py
+"""
+Sunucu beslemeli Lightweight Charts grafiği.
+• Veri tarayıcıdan borsaya değil, oturumun Feed’inden (core.data_streams)
+  Panel/Bokeh oturum soketi üzerinden gelir: N izleyici = tek borsa akışı.
+• İlk yükleme sütunlu ve zaman farkı kodlu (`history`), sonrası yalnızca
+  değişen barlar (`patch`: [t, o, h, l, c] dizileri).
+• Feed tamponu 1440 × 1m’den kurulur; üst dilimlerde (4h’de 6, 1d’de 1–2 bar)
+  yetmediği için daha eski barlar arka planda core.lwc_history’den (disk
+  deposu + REST) alınıp tamponun önüne eklenir; canlı kısım yine Feed’den.
+• Sunucuda güncellemeler oturumun RenderScheduler karesinde (gizli/boşta
+  sekmede seyrek), tarayıcıda animasyon karesinde (requestAnimationFrame)
+  birleştirilir.
+˓→  ChartView(render).set_feed(feed)   /   panel() → ChartView
+"""
 
+import asyncio
+
+import numpy as np
 import panel as pn
+import param
+from panel.reactive import ReactiveHTML
+from panel.viewable import Viewer
+
+from core import lwc_history
+from core.data_streams import TIMEFRAMES
+from core.candles import TF_SECONDS
+from core.render import RenderScheduler
 
 pn.extension()
 
-def panel():
-    html = """
-    <iframe
-      src="/public/lightweight_chart.html"
-      sandbox="allow-scripts allow-same-origin"
-      width="100%" height="600"
-      style="border:none;"
-    ></iframe>
-    """
-    return pn.pane.HTML(html, sizing_mode="stretch_width", height=600)
+LWC_JS = "https://unpkg.com/lightweight-charts@4.2.0/dist/lightweight-charts.standalone.production.js"
+HISTORY_BARS = 1_000                   # tampon bundan kısaysa eski barlar REST’ten tamamlanır
+
+
+class LiveChart(ReactiveHTML):
+    """Candlestick series fed by `history` (full reload) and `patch` (deltas)."""
+
+    history = param.Dict(default={})
+    patch   = param.List(default=[])
+
+    _template = '<div id="chart" style="width:100%;height:100%;"></div>'
+
+    __javascript__ = [LWC_JS]
+
+    _scripts = {
+        "render": """
+          state.chart = LightweightCharts.createChart(chart, {
+            autoSize: true,
+            layout: {background: {color: '#fff'}, textColor: '#333'},
+            grid:   {vertLines: {color: '#eee'}, horzLines: {color: '#eee'}},
+            rightPriceScale: {borderVisible: false},
+            timeScale: {borderVisible: false, timeVisible: true},
+          });
+          state.series = state.chart.addCandlestickSeries();
+          state.pending = new Map();
+          state.frame = null;
+          state.flush = () => {
+            state.frame = null;
+            const keys = [...state.pending.keys()].sort((a, b) => a - b);
+            for (const t of keys) {
+              const [, o, h, l, c] = state.pending.get(t);
+              state.series.update({time: t, open: o, high: h, low: l, close: c});
+            }
+            state.pending.clear();
+          };
+          self.history();
+        """,
+        "history": """
+          const h = data.history;
+          state.pending.clear();
+          if (!h.o || !h.o.length) { state.series.setData([]); return; }
+          const bars = new Array(h.o.length);
+          let t = h.t0;
+          for (let i = 0; i < h.o.length; i++) {
+            if (i) t += h.dt[i - 1] * h.step;
+            bars[i] = {time: t, open: h.o[i], high: h.h[i], low: h.l[i], close: h.c[i]};
+          }
+          state.series.setData(bars);
+        """,
+        "patch": """
+          for (const bar of data.patch) state.pending.set(bar[0], bar);
+          if (state.frame === null) state.frame = requestAnimationFrame(state.flush);
+        """,
+        "remove": """
+          if (state.frame !== null) cancelAnimationFrame(state.frame);
+          state.chart.remove();
+        """,
+    }
+
+
+def _encode_history(cols, sec):
+    """(epoch, o, h, l, c) → {t0, step, dt, o, h, l, c}; zamanlar `sec` katı farklar."""
+    epoch = cols[0]
+    if not len(epoch):
+        return {}
+    return {"t0": int(epoch[0]), "step": sec,
+            "dt": (np.diff(epoch) // sec).tolist(),
+            "o": cols[1].tolist(), "h": cols[2].tolist(),
+            "l": cols[3].tolist(), "c": cols[4].tolist()}
+
+
+class ChartView(Viewer):
+    """Per-session chart: timeframe picker + LiveChart bound to a shared Feed."""
+
+    def __init__(self, render: RenderScheduler | None = None, **params):
+        super().__init__(**params)
+        self.render = render if render is not None else RenderScheduler()
+        self.tf_sel = pn.widgets.RadioButtonGroup(options=list(TIMEFRAMES), value="1m",
+                                                  button_type="light")
+        self.chart = LiveChart(sizing_mode="stretch_width", height=600)
+        self.feed = None
+        self._mark = 0                 # candles[tf].total – gönderilen son kapanmış bar
+        self._version = -1             # feed.version – yeniden kurulumda tam yükleme
+        self._sent = None              # son gönderilen kısmi bar
+        self._older: dict = {}         # (feed.key, tf) → tampondan eski barlar (() = yok/yükleniyor)
+        self.tf_sel.param.watch(lambda e: self._reload(), "value")
+        self._layout = pn.Column(self.tf_sel, self.chart, sizing_mode="stretch_width")
+
+    def __panel__(self):
+        return self._layout
+
+    # ........................ feed bağlantısı
+    def set_feed(self, feed):
+        if feed is self.feed:
+            return
+        self.close()
+        self.feed = feed
+        self._older.clear()
+        feed.subscribe(on_tick=self._on_update, on_bar=self._on_update)
+        self._reload()
+
+    def close(self):
+        if self.feed is not None:
+            self.feed.unsubscribe(on_tick=self._on_update, on_bar=self._on_update)
+            self.feed = None
+
+    # ........................ gönderim
+    def _reload(self):
+        """Seçili zaman diliminin tamponunu (+ kısmi barı) baştan gönder."""
+        feed, tf = self.feed, self.tf_sel.value
+        if feed is None:
+            return
+        buf = feed.candles[tf]
+        cols = [buf.view(n) for n in buf.columns]
+        bar = feed.agg.partial(tf)
+        if bar is not None:
+            cols = [np.append(c, x) for c, x in zip(cols, bar)]
+        older = self._older.get((feed.key, tf))
+        if older is None and len(buf) < HISTORY_BARS:
+            self._older[(feed.key, tf)] = ()
+            asyncio.create_task(self._load_older(feed, tf))
+        elif older:
+            keep = older[0] < (cols[0][0] if len(cols[0]) else np.inf)
+            cols = [np.concatenate([o[keep], c]) for o, c in zip(older, cols)]
+        self._mark, self._version, self._sent = buf.total, feed.version, bar
+        self.render.forget(self.chart)
+        self.render.set(self.chart, "history", _encode_history(cols, TF_SECONDS[tf]))
+
+    async def _load_older(self, feed, tf):
+        cols = await lwc_history.get_history(feed.exchange, feed.symbol, tf, bars=HISTORY_BARS)
+        if self.feed is not feed or not len(cols[0]):
+            return
+        # kopya: oturum boyunca tutulur; depo memmap’ini kilitlemesin / bayatlamasın
+        self._older[(feed.key, tf)] = tuple(np.array(c) for c in cols)
+        if self.tf_sel.value == tf:
+            self._reload()
+
+    def _on_update(self, *_):
+        self.render.schedule(self._flush)              # kare başına bir kez
+
+    def _flush(self):
+        feed, tf = self.feed, self.tf_sel.value
+        if feed is None:
+            return
+        buf = feed.candles[tf]
+        if feed.version != self._version or self._mark < buf.cleared:
+            self._reload()                             # gap dolumu, yeniden kurulum → tam yükleme
+            return
+        n = buf.pending(self._mark)
+        self._mark = buf.total
+        rows = list(zip(*(buf.view(c, n).tolist() for c in buf.columns))) if n else []
+        bar = feed.agg.partial(tf)
+        if bar is not None and bar != self._sent:
+            rows.append(bar)
+        self._sent = bar
+        if rows:
+            self.render.set(self.chart, "patch", [list(r[:5]) for r in rows])
+
+
+def panel(render: RenderScheduler | None = None):
+    return ChartView(render)
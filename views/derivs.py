@@ -0,0 +1,133 @@
+# views/derivs.py
+"""
+Open Interest / Funding rate görünümlerinin ortak gövdesi.
+• Veri core.derivs’in paylaşılan deposundan okunur (tek zamanlayıcı, tüm
+  oturumlar); görünüm yalnızca izlediği sembolü öne aldırır (watch).
+• Seçili sembolün zaman serisi + aynı coinin diğer borsalardaki son değeri
+  (core.symbols canonical/native) + borsanın sıralaması.
+• Her tur sonrası çizim oturumun RenderScheduler karesine bırakılır.
+"""
+
+import numpy as np
+import panel as pn
+from panel.viewable import Viewer
+from bokeh.models import ColumnDataSource, DatetimeTickFormatter
+from bokeh.plotting import figure
+
+from core.derivs import open_derivs, close_derivs
+from core.symbols import canonical, native
+
+pn.extension()
+
+RED, GREEN = "#ef5350", "#29cf82"
+
+
+def _usd(v: float) -> str:
+    for div, unit in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(v) >= div:
+            return f"${v / div:,.2f}{unit}"
+    return f"${v:,.0f}"
+
+
+def _pct(v: float) -> str:
+    return f"{v * 100:+.4f}%"
+
+
+def _table(title, rows, fmt) -> str:
+    body = "".join(f"<tr><td style='text-align:left'>{a}</td><td>{fmt(v)}</td></tr>"
+                   for a, v in rows if v == v)
+    return ("<table style='width:100%;font-family:monospace;font-size:12px;"
+            "border-collapse:collapse;text-align:right'>"
+            f"<tr style='color:#888'><th colspan=2 style='text-align:left'>{title}</th></tr>"
+            + (body or "<tr><td colspan=2 style='color:#888'>–</td></tr>") + "</table>")
+
+
+class DerivView(Viewer):
+    """OI or funding history for the session's market plus cross-exchange tables."""
+
+    field = "oi"                                       # "oi" | "funding"
+    title = "Open Interest"
+
+    def __init__(self, session, **params):
+        super().__init__(**params)
+        self.session, self.render = session, session.render
+        self.src = ColumnDataSource(dict(t=[], v=[], color=[]))
+        fig = figure(height=360, sizing_mode="stretch_width", x_axis_type="datetime",
+                     tools="pan,wheel_zoom,reset", toolbar_location="above", title=self.title)
+        fig.xaxis.formatter = DatetimeTickFormatter(minutes="%H:%M", hours="%H:%M")
+        self._glyph(fig)
+        self.note = pn.pane.Markdown("")
+        self.cross = pn.pane.HTML("", sizing_mode="stretch_width")
+        self.ranks = pn.pane.HTML("", sizing_mode="stretch_width")
+        self.derivs = open_derivs()
+        self.derivs.subscribe(self._on_round)
+        self._watched = None
+        session.param.watch(self._on_market, ["exchange", "symbol"])
+        session.on_destroy(self.close)
+        self._layout = pn.Column(self.note, pn.pane.Bokeh(fig),
+                                 pn.Row(self.cross, self.ranks, sizing_mode="stretch_width"),
+                                 sizing_mode="stretch_width")
+        self._on_market()
+
+    def __panel__(self):
+        return self._layout
+
+    def _glyph(self, fig):
+        fig.line("t", "v", source=self.src, color="#2962ff", line_width=2)
+
+    def _values(self, oi, funding):
+        return oi
+
+    def _on_market(self, *_):
+        if self._watched is not None:
+            self.derivs.unwatch(*self._watched)
+        self._watched = self.session.exchange, self.session.symbol
+        self.derivs.watch(*self._watched)
+        self._redraw()
+
+    def close(self):
+        if self.derivs is not None:
+            if self._watched is not None:
+                self.derivs.unwatch(*self._watched)
+            self.derivs.unsubscribe(self._on_round)
+            close_derivs(self.derivs)
+            self.derivs = None
+
+    def _on_round(self):
+        self.render.schedule(self._redraw)
+
+    def _redraw(self):
+        if self.derivs is None:
+            return
+        ex, sym = self.session.exchange, self.session.symbol
+        fmt = _usd if self.field == "oi" else _pct
+        store = self.derivs.store(ex)
+        series = store.series(sym) if store is not None else None
+        if series is None:
+            self.render.set(self.note, "object", f"*{ex} {sym} için veri bekleniyor…*")
+            data = dict(t=[], v=[], color=[])
+        else:
+            t, oi, funding = series
+            v = self._values(oi, funding)
+            ok = np.isfinite(v)
+            v = v[ok].astype(float)
+            data = dict(t=(t[ok] * 1000).tolist(), v=v.tolist(),
+                        color=[GREEN if x >= 0 else RED for x in v.tolist()])
+            self.render.set(self.note, "object", "")
+        self.render.set(self.src, "data", data)
+
+        coin = canonical(ex, sym)
+        rows = []
+        for other, st in self.derivs.stores.items():
+            s = native(other, coin) if coin else (sym if other == ex else None)
+            if s is not None:
+                oi, fr = st.latest(s)
+                val = oi if self.field == "oi" else fr
+                if val is not None:
+                    rows.append((other, val))
+        self.render.set(self.cross, "object", _table(f"{coin or sym} · borsalar", rows, fmt))
+        if store is not None:
+            self.render.set(self.ranks, "object", self._ranks(ex, store, fmt))
+
+    def _ranks(self, ex, store, fmt):
+        return _table(f"{ex} · en yüksek", store.ranked(self.field, 10), fmt)
@@ -0,0 +1,29 @@
+# views/fundingrate.py
+"""
+Funding rate: seçili sembolün geçmişi (çubuk, işarete göre renkli), borsalar
+arası karşılaştırma, borsadaki en yüksek / en düşük oranlar.
+Veri core.derivs’in ortak deposundan (views.derivs).
+"""
+
+from views.derivs import DerivView, _table
+
+
+class FundingRateView(DerivView):
+    """Funding rate history and cross-exchange snapshot."""
+
+    field = "funding"
+    title = "Funding rate"
+
+    def _glyph(self, fig):
+        fig.vbar("t", top="v", width=45_000, color="color", source=self.src)
+
+    def _values(self, oi, funding):
+        return funding
+
+    def _ranks(self, ex, store, fmt):
+        return (_table(f"{ex} · en yüksek", store.ranked("funding", 10), fmt)
+                + _table(f"{ex} · en düşük", store.ranked("funding", 10, reverse=False), fmt))
+
+
+def panel(session):
+    return FundingRateView(session)
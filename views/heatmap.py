@@ -0,0 +1,110 @@
+# views/heatmap.py
+"""
+Emir defteri likidite ısı haritası (datashader).
+• Arka plan core.depthmap’in (zaman × fiyat kovası) halka dizisidir; sunucuda
+  datashader ile sabit boyutlu görüntüye çevrilir – tarayıcıya glif değil raster gider.
+• Yakınlaştırma/kaydırmada HoloViews RangeXY akışı görünen aralığı yeniden
+  toplatır (rasterize, dynamic=True).
+• Üstte oturumun Feed’indeki trade’ler (TickBuffer) alış/satış ayrı
+  katmanlarda miktar toplamıyla rasterize edilir.
+• Yeni kesit geldiğinde güncelleme oturumun RenderScheduler karesine bırakılır.
+"""
+
+import numpy as np
+import panel as pn
+import holoviews as hv
+import datashader as ds
+from holoviews.operation.datashader import rasterize, dynspread
+from bokeh.models import DatetimeTickFormatter
+
+from core.data_streams import open_feed, close_feed
+from core.decode import BUY, SELL
+from core.depthmap import open_depthmap, close_depthmap
+from core.orderbook import supports
+
+hv.extension("bokeh")
+pn.extension()
+
+Tick = hv.streams.Stream.define("Tick", n=0)
+
+
+class HeatmapView:
+    """Per-session liquidity heatmap bound to the session's exchange/symbol."""
+
+    def __init__(self, session):
+        self.session, self.render = session, session.render
+        self.dm = self.feed = None
+        self.tick = Tick()
+        self._n = 0
+        self.pane = pn.pane.HoloViews(self._plot(), sizing_mode="stretch_width", height=600)
+        self.note = pn.pane.Markdown("")
+        self.layout = pn.Column(self.note, self.pane, sizing_mode="stretch_width")
+        session.param.watch(self._on_market, ["exchange", "symbol"])
+        session.on_destroy(self.close)
+        self._on_market()
+
+    # ........................ veri
+    def _image(self, n=0):
+        dm = self.dm
+        if dm is None or dm.count < 2:
+            return hv.QuadMesh(([0, 1], [0, 1], np.zeros((2, 2))),
+                               kdims=["time", "price"], vdims=["depth"])
+        t, prices, grid = dm.frame()          # zaman ekseni boşluklu olabilir → QuadMesh
+        return hv.QuadMesh((t, prices + dm.step / 2, grid.T), kdims=["time", "price"],
+                           vdims=["depth"])
+
+    def _trades(self, side):
+        def cb(n=0):
+            feed, dm = self.feed, self.dm
+            if feed is None or dm is None or not feed.ticks or dm.count < 2:
+                return hv.Points([], kdims=["time", "price"], vdims=["qty"])
+            t0 = dm.times[(dm.pos - dm.count) % dm.slices] / 1000
+            ts = feed.ticks.view("ts")
+            i = int(np.searchsorted(ts, t0))
+            m = feed.ticks.view("side")[i:] == side
+            return hv.Points((ts[i:][m] * 1000, feed.ticks.view("price")[i:][m],
+                              feed.ticks.view("qty")[i:][m]),
+                             kdims=["time", "price"], vdims=["qty"])
+        return cb
+
+    def _plot(self):
+        image = rasterize(hv.DynamicMap(self._image, streams=[self.tick]),
+                          aggregator=ds.mean("depth"))
+        buys, sells = (dynspread(rasterize(hv.DynamicMap(self._trades(s), streams=[self.tick]),
+                                           aggregator=ds.sum("qty")), threshold=0.6, max_px=3)
+                       for s in (BUY, SELL))
+        fmt = DatetimeTickFormatter(minutes="%H:%M", hours="%H:%M", seconds="%H:%M:%S")
+        return (image.opts(cmap="fire", cnorm="eq_hist", colorbar=False, tools=["hover"],
+                           xformatter=fmt, responsive=True, height=600)
+                * buys.opts(cmap=["#7fffb0", "#29cf82"], cnorm="log", alpha=0.9)
+                * sells.opts(cmap=["#ffb0b0", "#ef5350"], cnorm="log", alpha=0.9))
+
+    # ........................ bağlantı
+    def _on_market(self, *_):
+        self.close()
+        ex, sym = self.session.exchange, self.session.symbol
+        if not supports(ex):
+            self.render.set(self.note, "object", f"*{ex} için emir defteri akışı yok.*")
+            return
+        self.render.set(self.note, "object", "")
+        self.dm = open_depthmap(ex, sym)
+        self.feed = open_feed(ex, sym)
+        self.dm.subscribe(self._on_sample)
+
+    def close(self):
+        if self.dm is not None:
+            self.dm.unsubscribe(self._on_sample)
+            close_depthmap(self.dm)
+            close_feed(self.feed)
+            self.dm = self.feed = None
+
+    def _on_sample(self):
+        self.render.schedule(self._refresh)
+
+    def _refresh(self):
+        self._n += 1
+        self.tick.event(n=self._n)
+
+
+def panel(session):
+    return HeatmapView(session).layout
@@ -0,0 +1,113 @@
+# views/liquidations.py
+"""
+Likidasyonlar.
+• Veri core.liquidations’tan: (borsa, sembol) başına tek akış, tüm oturumlar paylaşır.
+• Pencere tablosu (1m/5m/1h long/short notional, adet, en büyük likidasyon)
+  hazır toplamlardan okunur – yenilemede ham olaylar taranmaz; altta son
+  olaylar tamponun kuyruğundan (kopyasız görünüm) listelenir.
+• Olay patlamalarında her olay sadece bir yeniden çizim isteği bırakır;
+  çizim oturumun RenderScheduler karesinde yapılır.
+"""
+
+import time
+
+import panel as pn
+from panel.viewable import Viewer
+
+from core.liquidations import LONG, open_liquidations, close_liquidations, supports
+
+pn.extension()
+
+RED, GREEN = "239,83,80", "41,207,130"           # long likidasyonu = zorunlu satış
+
+
+def _usd(v: float) -> str:
+    for div, unit in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if v >= div:
+            return f"${v / div:,.2f}{unit}"
+    return f"${v:,.0f}"
+
+
+def _windows(stats) -> str:
+    rows = []
+    for w, s in stats.items():
+        tot = s["long"] + s["short"]
+        lw = s["long"] / tot * 100 if tot else 50
+        peak = s["peak"]
+        big = (f"<span style='color:rgb({RED if peak[1] == LONG else GREEN})'>"
+               f"{_usd(peak[0])} @ {peak[2]:,.6g}</span>" if peak else "–")
+        rows.append(
+            f"<tr><td>{w}</td>"
+            f"<td style='color:rgb({RED})'>{_usd(s['long'])} ({s['n_long']})</td>"
+            f"<td style='color:rgb({GREEN})'>{_usd(s['short'])} ({s['n_short']})</td>"
+            f"<td style='width:30%'><div style='height:8px;background:linear-gradient("
+            f"to right,rgb({RED}) {lw:.1f}%,rgb({GREEN}) {lw:.1f}%)'></div></td>"
+            f"<td>{big}</td></tr>")
+    return ("<table style='width:100%;font-family:monospace;font-size:12px;"
+            "border-collapse:collapse;text-align:right'>"
+            "<tr style='color:#888'><th>Pencere</th><th>Long</th><th>Short</th>"
+            "<th></th><th>En büyük</th></tr>" + "".join(rows) + "</table>")
+
+
+def _recent(events, n=30) -> str:
+    cols = events.last(n)
+    if not len(events):
+        return "<i>Henüz likidasyon yok.</i>"
+    rows = [f"<tr style='color:rgb({RED if s == LONG else GREEN})'>"
+            f"<td>{time.strftime('%H:%M:%S', time.localtime(t))}</td>"
+            f"<td>{'Long' if s == LONG else 'Short'}</td><td>{p:,.6g}</td>"
+            f"<td>{q:,.4f}</td><td>{_usd(v)}</td></tr>"
+            for t, p, q, v, s in reversed(list(zip(*(cols[c].tolist() for c in events.columns))))]
+    return ("<table style='width:100%;font-family:monospace;font-size:12px;"
+            "border-collapse:collapse;text-align:right'>"
+            "<tr style='color:#888'><th>Saat</th><th>Pozisyon</th><th>Fiyat</th>"
+            "<th>Miktar</th><th>Notional</th></tr>" + "".join(rows) + "</table>")
+
+
+class LiquidationsView(Viewer):
+    """Windowed liquidation totals and recent prints for the session's market."""
+
+    def __init__(self, session, **params):
+        super().__init__(**params)
+        self.session, self.render = session, session.render
+        self.summary = pn.pane.HTML("", sizing_mode="stretch_width")
+        self.recent = pn.pane.HTML("", sizing_mode="stretch_width")
+        self.feed = None
+        session.param.watch(self._on_market, ["exchange", "symbol"])
+        session.on_destroy(self.close)
+        self._layout = pn.Column(self.summary, self.recent, sizing_mode="stretch_width")
+        self._on_market()
+
+    def __panel__(self):
+        return self._layout
+
+    def _on_market(self, *_):
+        self.close()
+        ex, sym = self.session.exchange, self.session.symbol
+        if not supports(ex):
+            self.render.set(self.summary, "object", f"<i>{ex} için likidasyon akışı yok.</i>")
+            self.render.set(self.recent, "object", "")
+            return
+        self.feed = open_liquidations(ex, sym)
+        self.feed.subscribe(self._on_liq)
+        self._redraw()
+
+    def close(self):
+        if self.feed is not None:
+            self.feed.unsubscribe(self._on_liq)
+            close_liquidations(self.feed)
+            self.feed = None
+
+    def _on_liq(self):
+        self.render.schedule(self._redraw)
+
+    def _redraw(self):
+        feed = self.feed
+        if feed is None:
+            return
+        self.render.set(self.summary, "object", _windows(feed.stats()))
+        self.render.set(self.recent, "object", _recent(feed.events))
+
+
+def panel(session):
+    return LiquidationsView(session)
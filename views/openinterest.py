@@ -0,0 +1,18 @@
+# views/openinterest.py
+"""
+Open Interest (USD): seçili sembolün geçmişi, borsalar arası karşılaştırma,
+borsadaki en yüksek OI’ler. Veri core.derivs’in ortak deposundan (views.derivs).
+"""
+
+from views.derivs import DerivView
+
+
+class OpenInterestView(DerivView):
+    """Open interest history and cross-exchange snapshot."""
+
+    field = "oi"
+    title = "Open Interest (USD)"
+
+
+def panel(session):
+    return OpenInterestView(session)
@@ -0,0 +1,136 @@
+# views/orderbook.py
+"""
+Emir defteri (L2) merdiveni.
+• Veri core.orderbook’tan: (borsa, sembol) başına tek defter, tüm oturumlar paylaşır.
+• Her defter güncellemesi sadece bir yeniden çizim isteği bırakır; çizim
+  oturumun RenderScheduler karesinde (≈4/sn, gizli sekmede seyrek) yapılır
+  ve değişmeyen HTML gönderilmez.
+• Fiyat gruplaması tick katlarıyla (tick, defterin en iyi seviyelerinden
+  tahmin edilir), kümülatif derinlik çubuklarıyla.
+"""
+
+import math
+
+import panel as pn
+from panel.viewable import Viewer
+
+from core.orderbook import open_book, close_book, supports
+
+pn.extension()
+
+MULTIPLES = (1, 2, 5, 10, 25, 50, 100, 250, 1_000)
+
+
+def _decimals(step: float) -> int:
+    return max(0, -math.floor(math.log10(step) + 1e-9))
+
+
+def _tick(side, n=25):
+    """En iyi seviyeler arasındaki en küçük fiyat farkı ≈ tick boyutu."""
+    px = [p for p, _ in side.top(n)]
+    diffs = [abs(a - b) for a, b in zip(px, px[1:]) if a != b]
+    if not diffs:
+        return None
+    d = min(diffs)
+    return round(d, max(0, -math.floor(math.log10(d))) + 1)
+
+
+def _ladder(bids, asks, step):
+    dec = _decimals(step)
+    cum_b, cum_a, s = [], [], 0.0
+    for _, q in bids:
+        s += q
+        cum_b.append(s)
+    s = 0.0
+    for _, q in asks:
+        s += q
+        cum_a.append(s)
+    top = max(cum_b[-1:] + cum_a[-1:] + [1e-12])
+
+    def row(p, q, c, rgb):
+        w = c / top * 100
+        return (f"<tr style='background:linear-gradient(to left,rgba({rgb},.18) {w:.1f}%,"
+                f"transparent {w:.1f}%)'><td style='color:rgb({rgb})'>{p:,.{dec}f}</td>"
+                f"<td>{q:,.4f}</td><td>{c:,.4f}</td></tr>")
+
+    rows = [row(p, q, c, "239,83,80")
+            for (p, q), c in reversed(list(zip(asks, cum_a)))]
+    if bids and asks:
+        spread = asks[0][0] - bids[0][0]
+        rows.append(f"<tr><td colspan=3 style='text-align:center;color:#888'>"
+                    f"spread {spread:,.{dec}f}</td></tr>")
+    rows += [row(p, q, c, "41,207,130") for (p, q), c in zip(bids, cum_b)]
+    return ("<table style='width:100%;font-family:monospace;font-size:12px;"
+            "border-collapse:collapse;text-align:right'>"
+            "<tr style='color:#888'><th>Fiyat</th><th>Miktar</th><th>Toplam</th></tr>"
+            + "".join(rows) + "</table>")
+
+
+class OrderBookView(Viewer):
+    """Throttled, price-grouped L2 ladder following the session's market."""
+
+    def __init__(self, session, **params):
+        super().__init__(**params)
+        self.session, self.render = session, session.render
+        self.group = pn.widgets.Select(name="Gruplama", options=[0.1], width=120)
+        self.depth = pn.widgets.Select(name="Seviye", options=[10, 20, 50], value=20, width=80)
+        self.ladder = pn.pane.HTML("", sizing_mode="stretch_width")
+        self.feed = None
+        self._steps_for = None           # gruplama seçenekleri hangi defter için kuruldu
+        self.group.param.watch(lambda e: self._redraw(), "value")
+        self.depth.param.watch(lambda e: self._redraw(), "value")
+        session.param.watch(self._on_market, ["exchange", "symbol"])
+        session.on_destroy(self.close)
+        self._layout = pn.Column(pn.Row(self.group, self.depth), self.ladder,
+                                 sizing_mode="stretch_width")
+        self._on_market()
+
+    def __panel__(self):
+        return self._layout
+
+    def _on_market(self, *_):
+        self.close()
+        ex, sym = self.session.exchange, self.session.symbol
+        if not supports(ex):
+            self.render.set(self.ladder, "object", f"<i>{ex} için emir defteri akışı yok.</i>")
+            return
+        self.feed = open_book(ex, sym)
+        self.feed.subscribe(self._on_book)
+        self._steps_for = None
+        self._redraw()
+
+    def close(self):
+        if self.feed is not None:
+            self.feed.unsubscribe(self._on_book)
+            close_book(self.feed)
+            self.feed = None
+
+    def _on_book(self):
+        self.render.schedule(self._redraw)
+
+    def _set_steps(self, book):
+        tick = _tick(book.asks) or _tick(book.bids)
+        if tick is None:
+            return
+        self._steps_for = self.feed.key
+        opts = [round(tick * m, _decimals(tick)) for m in MULTIPLES]
+        self.group.options = opts
+        self.group.value = opts[0]
+
+    def _redraw(self):
+        feed = self.feed
+        if feed is None:
+            return
+        if not feed.synced:
+            self.render.set(self.ladder, "object", "<i>Defter eşitleniyor…</i>")
+            return
+        book = feed.book
+        if self._steps_for != feed.key:
+            self._set_steps(book)
+        step, n = self.group.value, self.depth.value
+        self.render.set(self.ladder, "object",
+                        _ladder(book.bids.grouped(step, n), book.asks.grouped(step, n), step))
+
+
+def panel(session):
+    return OrderBookView(session)
@@ -0,0 +1,113 @@
+# views/orderflow.py
+"""
+Order Flow / footprint görünümü.
+• Veri core.orderflow’dan: bar başına fiyat kovası → satış × alış hacmi,
+  hücre rengi kova deltası; altta bar deltası ve CVD.
+• Trade’ler yalnızca yeniden çizim isteği bırakır; çizim oturumun
+  RenderScheduler karesinde, ColumnDataSource’lara tek atamayla yapılır.
+"""
+
+import panel as pn
+from bokeh.models import ColumnDataSource, LinearColorMapper, LinearAxis, Range1d
+from bokeh.plotting import figure
+from bokeh.transform import transform
+
+from core.candles import TF_SECONDS
+from core.orderflow import open_orderflow, close_orderflow
+
+pn.extension()
+
+PALETTE = ["#ef5350", "#f28b89", "#f6c1bf", "#eeeeee", "#b5ecd0", "#6fdca8", "#29cf82"]
+
+
+def _cells(bars, step):
+    data = dict(x=[], y=[], delta=[], label=[])
+    for i, b in enumerate(bars):
+        for k, buy, sell in zip(b.keys.tolist(), b.buy.tolist(), b.sell.tolist()):
+            data["x"].append(i)
+            data["y"].append((k + 0.5) * step)
+            data["delta"].append(buy - sell)
+            data["label"].append(f"{sell:,.2f} × {buy:,.2f}")
+    return data
+
+
+class OrderFlowView:
+    """Per-session footprint chart following the session's exchange/symbol."""
+
+    def __init__(self, session):
+        self.session, self.render = session, session.render
+        self.of = None
+        self.tf = pn.widgets.RadioButtonGroup(options=list(TF_SECONDS), value="1m",
+                                              button_type="light")
+        self.nbars = pn.widgets.Select(name="Bar", options=[6, 12, 24], value=12, width=80)
+        self.cells = ColumnDataSource(dict(x=[], y=[], delta=[], label=[]))
+        self.stats = ColumnDataSource(dict(x=[], delta=[], cvd=[], color=[]))
+        self.cmap = LinearColorMapper(palette=PALETTE, low=-1, high=1)
+
+        fp = figure(height=480, sizing_mode="stretch_width", tools="pan,wheel_zoom,reset",
+                    toolbar_location="above")
+        self._cell = fp.rect("x", "y", width=0.95, height=1, source=self.cells,
+                fill_color=transform("delta", self.cmap), line_color=None)
+        fp.text("x", "y", text="label", source=self.cells, text_font_size="8pt",
+                text_align="center", text_baseline="middle")
+        fp.xaxis.visible = False
+        self._fp = fp
+
+        st = figure(height=140, sizing_mode="stretch_width", x_range=fp.x_range,
+                    tools="", toolbar_location=None)
+        st.vbar("x", top="delta", width=0.8, color="color", source=self.stats)
+        st.extra_y_ranges = {"cvd": Range1d(0, 1)}
+        st.add_layout(LinearAxis(y_range_name="cvd"), "right")
+        st.line("x", "cvd", y_range_name="cvd", source=self.stats, color="#2962ff")
+        self._st = st
+
+        self.tf.param.watch(lambda e: self._redraw(), "value")
+        self.nbars.param.watch(lambda e: self._redraw(), "value")
+        session.param.watch(self._on_market, ["exchange", "symbol"])
+        session.on_destroy(self.close)
+        self.layout = pn.Column(pn.Row(self.tf, self.nbars), pn.pane.Bokeh(fp),
+                                pn.pane.Bokeh(st), sizing_mode="stretch_width")
+        self._on_market()
+
+    def _on_market(self, *_):
+        self.close()
+        self.of = open_orderflow(self.session.exchange, self.session.symbol)
+        self.of.subscribe(self._on_flow)
+        self._redraw()
+
+    def close(self):
+        if self.of is not None:
+            self.of.unsubscribe(self._on_flow)
+            close_orderflow(self.of)
+            self.of = None
+
+    def _on_flow(self):
+        self.render.schedule(self._redraw)
+
+    def _redraw(self):
+        of = self.of
+        if of is None or of.agg.step is None:
+            # önceki piyasanın hücreleri ekranda kalmasın
+            self.render.set(self.cells, "data", dict(x=[], y=[], delta=[], label=[]))
+            self.render.set(self.stats, "data", dict(x=[], delta=[], cvd=[], color=[]))
+            return
+        bars = of.agg.bars(self.tf.value, self.nbars.value)
+        cells = _cells(bars, of.agg.step)
+        top = max(map(abs, cells["delta"]), default=1) or 1
+        self.render.set(self._cell.glyph, "height", of.agg.step)
+        self.render.set(self.cmap, "low", -top)
+        self.render.set(self.cmap, "high", top)
+        cvd = [b.cvd for b in bars]
+        if cvd:
+            pad = (max(cvd) - min(cvd)) * 0.1 or 1
+            rng = self._st.extra_y_ranges["cvd"]
+            self.render.set(rng, "start", min(cvd) - pad)
+            self.render.set(rng, "end", max(cvd) + pad)
+        self.render.set(self.cells, "data", cells)
+        self.render.set(self.stats, "data", dict(
+            x=list(range(len(bars))), delta=[b.delta for b in bars], cvd=cvd,
+            color=["#29cf82" if b.delta >= 0 else "#ef5350" for b in bars]))
+
+
+def panel(session):
+    return OrderFlowView(session).layout
@@ -0,0 +1,31 @@
+# views/session.py
+"""
+Oturum bağlamı: görünümlerin izlediği seçim (borsa/sembol), oturumun
+RenderScheduler’ı ve oturum kapanırken çalışacak temizlik işleri.
+Bağlam alan görünümler `panel(session)` imzasıyla yazılır.
+"""
+
+import param
+
+
+class Session(param.Parameterized):
+    """Per-session selection shared with the views."""
+
+    exchange = param.String(default="Binance")
+    symbol   = param.String(default="BTCUSDT")
+
+    def __init__(self, render, **params):
+        super().__init__(**params)
+        self.render = render
+        self._cleanup = []
+
+    def on_destroy(self, fn):
+        self._cleanup.append(fn)
+
+    def destroy(self):
+        for fn in self._cleanup:
+            try:
+                fn()
+            except Exception as e:
+                print("[WARN] session cleanup:", e)
+        self._cleanup.clear()